@@ -0,0 +1,2 @@
+# benchmarks for golemspi's hot paths, run from the repository root e.g.
+#   python -m benchmarks.pipe_data_received
@@ -0,0 +1,89 @@
+# benchmarks/agreement_cache.py
+"""cost of the agreement.json lookups of cost updates and of the view
+
+adds an activity whose agreement.json is about the size of a real one, then
+times the lookups made on every "Updating cost" line
+(get_coeffs_for_activity) and every frame an exe unit runs
+(get_current_exeunit_info) with the agreement cache and with every lookup
+parsing the file, reporting microseconds per call and the cache's hits and
+misses.
+
+usage: python -m benchmarks.agreement_cache [--calls N] [--size-kb N]
+"""
+
+import argparse
+import copy
+import json
+import os
+import tempfile
+import time
+
+from model import Model
+from model.json_utils import json_loadf
+from .model_mutations import _AGREEMENT, _mutations
+
+
+class _Uncached:
+    # every load parses the file, as before the cache
+    hits = misses = 0
+
+    def load(self, file):
+        return json_loadf(file)
+
+
+def _agreement(size):
+    # the synthetic agreement padded with properties to about size bytes
+    agreement = copy.deepcopy(_AGREEMENT)
+    properties = agreement["demand"]["properties"]
+    index = 0
+    while len(json.dumps(agreement)) < size:
+        properties[f"golem.node.property{index}"] = {"value": index / 2, "x": "x" * 40}
+        index += 1
+    return agreement
+
+
+def _measure(function, arguments, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function(*arguments)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--size-kb", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        agreement_json_file = os.path.join(directory, "agreement.json")
+        with open(agreement_json_file, "w") as file:
+            json.dump(_agreement(args.size_kb << 10), file)
+        model = Model()
+        with model.transaction():
+            # an activity that is still running: added, but neither terminated
+            # nor exited
+            for mutator, arguments in _mutations(model, 1, 0, agreement_json_file):
+                if mutator.__name__.startswith("add_"):
+                    mutator(*arguments)
+        retrievals = model.retrievals
+        activity_hash = f"{0:032x}"
+        cache = retrievals.agreement_cache
+        results = dict()
+        for name, agreement_cache in (("uncached", _Uncached()), ("cached", cache)):
+            retrievals.agreement_cache = agreement_cache
+            for lookup, function, arguments in (
+                ("cost update", retrievals.get_coeffs_for_activity, (activity_hash,)),
+                ("view frame", retrievals.get_current_exeunit_info, ()),
+            ):
+                elapsed = _measure(function, arguments, args.calls)
+                results[name, lookup] = elapsed
+                print(f"{name:>8} {lookup}: {elapsed * 1e6:8.1f} us/call")
+        print(f"cache: {cache.hits} hits, {cache.misses} misses")
+        for lookup in ("cost update", "view frame"):
+            speedup = results["uncached", lookup] / results["cached", lookup]
+            print(f"speedup ({lookup}): {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
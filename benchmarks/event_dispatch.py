@@ -0,0 +1,135 @@
+# benchmarks/event_dispatch.py
+"""per line cost of finding the event a log line describes
+
+parses a synthetic golemsp transcript (where most lines describe no event) into
+LogLines once, then times determine_event_type_and_data over all of them for the
+rule table (event_registry.py) and for the namespace and message startswith
+chains it replaced, reporting nanoseconds per line for both. it then times the
+whole path from the raw line, with and without the may_describe_event prefilter
+in front of parse_log_line.
+
+usage: python -m benchmarks.event_dispatch [--lines N] [--noise-per-event N]
+"""
+
+import argparse
+import time
+
+from controller.events import (
+    determine_event_type_and_data,
+    may_describe_event,
+    parse_log_line,
+)
+from controller.events.log_events import *
+from .transcript import generate_lines
+
+
+def _legacy_determine_event_type_and_data(log_line):
+    # the if/elif chains of event_handler.py and the handlers modules it replaced
+    namespace = log_line.namespace
+    message = log_line.message
+    if namespace == "yagna":
+        handlers = ((YagnaServiceStartedEvent, "Starting yagna service!"),)
+    elif "::driver::" in namespace:
+        handlers = ((InitializedPaymentAccountEvent, "Initialised payment account"),)
+    elif namespace.startswith("ya_provider::provider_agent"):
+        handlers = (
+            (PaymentAccountsEvent, "Payment accounts: ["),
+            (PaymentNetworkEvent, "Using payment network:"),
+            (UsingSubnetEvent, "Using subnet:"),
+        )
+    elif namespace.startswith("ya_provider::hardware"):
+        handlers = ((HardwareResourcesCapEvent, "Hardware resources cap:"),)
+    elif namespace.startswith("ya_provider::market"):
+        handlers = ((NewAgreementEvent, "Got agreement"),)
+    elif namespace.startswith("ya_provider::execution"):
+        handlers = (
+            (NewTaskEvent, "Creating task"),
+            (NewExeUnitLogsDirEvent, "Exeunit log directory"),
+            (NewExeUnitPidEvent, "Exeunit process spawned"),
+            (ExeUnitTerminatedEvent, "ExeUnit for activity terminated"),
+            (ExeUnitExitedEvent, "ExeUnit process exited with status"),
+        )
+    elif namespace.startswith("ya_provider::payments"):
+        handlers = (
+            (NewCostInformationEvent, "Updating cost for activity"),
+            (FinalCostForActivityEvent, "Final cost for activity"),
+        )
+    elif namespace.startswith("ya_identity::service::identity"):
+        handlers = ((IdentityEvent, "identity: "),)
+    else:
+        return None
+    for event_class, prefix in handlers:
+        if message.startswith(prefix) or (
+            event_class is IdentityEvent and prefix in message
+        ):
+            return event_class.from_log_line(log_line)
+    return None
+
+
+def _parse_and_identify(line):
+    log_line = parse_log_line(line)
+    if log_line.namespace is None:
+        return None
+    return determine_event_type_and_data(log_line)
+
+
+def _prefilter_parse_and_identify(line):
+    if not may_describe_event(line):
+        return None
+    return _parse_and_identify(line)
+
+
+def _measure(dispatch, log_lines, repeat):
+    best = None
+    events = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        events = 0
+        for log_line in log_lines:
+            if dispatch(log_line) is not None:
+                events += 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--noise-per-event", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = list(generate_lines(args.lines, noise_per_event=args.noise_per_event))
+    log_lines = [parse_log_line(line) for line in lines]
+    log_lines = [log_line for log_line in log_lines if log_line.namespace is not None]
+    print(f"{len(log_lines)} log lines")
+    results = {}
+    for name, dispatch in (
+        ("table", determine_event_type_and_data),
+        ("chains", _legacy_determine_event_type_and_data),
+    ):
+        elapsed, events = _measure(dispatch, log_lines, args.repeat)
+        results[name] = elapsed
+        print(
+            f"{name:>8}: {elapsed * 1e9 / len(log_lines):8.0f} ns/line"
+            f"  {events} events ({events / len(log_lines):.1%} of lines)"
+        )
+    print(f"speedup: {results['chains'] / results['table']:.2f}x")
+
+    print(f"{len(lines)} raw lines")
+    for name, dispatch in (
+        ("prefilter", _prefilter_parse_and_identify),
+        ("parse", _parse_and_identify),
+    ):
+        elapsed, events = _measure(dispatch, lines, args.repeat)
+        results[name] = elapsed
+        print(
+            f"{name:>9}: {elapsed * 1e9 / len(lines):8.0f} ns/line"
+            f"  {events} events ({events / len(lines):.1%} of lines)"
+        )
+    print(f"speedup: {results['parse'] / results['prefilter']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
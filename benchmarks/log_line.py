@@ -0,0 +1,117 @@
+# benchmarks/log_line.py
+"""time and memory of parsing log lines into LogLines
+
+parses a synthetic golemsp transcript with parse_log_line (the lazy, slotted
+LogLine of events/log_line.py) and with the dataclass that copied every field
+out of the line up front, reporting for both:
+    parse: nanoseconds per line to parse alone
+    identify: nanoseconds per line to parse and read namespace and message (as
+        event identification does)
+    retained: bytes per LogLine kept alive (beyond the raw lines), after reading
+        namespace and message
+
+usage: python -m benchmarks.log_line [--lines N] [--noise-per-event N]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from controller.events import parse_log_line
+from .transcript import generate_lines
+
+
+@dataclass
+class _LegacyLogLine:
+    raw_contents: str
+    timestamp: str
+    loglevel: str
+    namespace: str
+    message: str
+
+
+def _legacy_parse_log_line(log_line: str) -> _LegacyLogLine:
+    # the parse_log_line the lazy LogLine replaced
+    try:
+        close_bracket_index = log_line.index("]")
+        header = log_line[0:close_bracket_index]
+        timestamp, loglevel, namespace = header[1:].split()
+        timestamp = timestamp.strip()
+        loglevel = loglevel.strip()
+        namespace = namespace.strip()
+
+        message_start_index = log_line.find("] ", close_bracket_index) + 1
+        message = log_line[message_start_index:].strip()
+
+    except ValueError:
+        timestamp = None
+        loglevel = None
+        namespace = None
+        message = log_line[log_line.find("]") + 1 :].strip()
+
+    return _LegacyLogLine(log_line, timestamp, loglevel, namespace, message)
+
+
+def _time_parse(parse, lines):
+    start = time.perf_counter()
+    for line in lines:
+        parse(line)
+    return time.perf_counter() - start
+
+
+def _time_identify(parse, lines):
+    start = time.perf_counter()
+    for line in lines:
+        log_line = parse(line)
+        if log_line.namespace is not None:
+            log_line.message
+    return time.perf_counter() - start
+
+
+def _retained_bytes(parse, lines):
+    gc.collect()
+    tracemalloc.start()
+    log_lines = [parse(line) for line in lines]
+    for log_line in log_lines:
+        if log_line.namespace is not None:
+            log_line.message
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # less the list holding them
+    return retained - len(log_lines) * 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--noise-per-event", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = list(generate_lines(args.lines, noise_per_event=args.noise_per_event))
+    print(f"{len(lines)} lines")
+    results = dict()
+    for name, parse in (
+        ("lazy", parse_log_line),
+        ("eager", _legacy_parse_log_line),
+    ):
+        parse_time = min(_time_parse(parse, lines) for _ in range(args.repeat))
+        identify_time = min(_time_identify(parse, lines) for _ in range(args.repeat))
+        retained = _retained_bytes(parse, lines)
+        results[name] = (parse_time, identify_time, retained)
+        print(
+            f"{name:>6}: parse {parse_time * 1e9 / len(lines):6.0f} ns/line"
+            f"  identify {identify_time * 1e9 / len(lines):6.0f} ns/line"
+            f"  retained {retained / len(lines):5.0f} bytes/line"
+        )
+    lazy, eager = results["lazy"], results["eager"]
+    print(
+        f"parse {eager[0] / lazy[0]:.2f}x, identify {eager[1] / lazy[1]:.2f}x,"
+        f" memory {eager[2] / lazy[2]:.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/model_latency.py
+"""model latency as the history grows
+
+applies the mutations of synthetic activities to the model step by step (in
+transactions of --batch mutations, as the controller does) up to --activities
+activities, reporting after each step the mean latency of the step's mutations
+and of the retrievals the view makes every frame. with the schema's indexes
+both stay flat; --drop-indexes measures the schema without them.
+
+usage: python -m benchmarks.model_latency [--activities N] [--step N] [--drop-indexes]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from model import Model
+from .model_mutations import _AGREEMENT, _mutations
+
+
+def _drop_indexes(connection):
+    for (name,) in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    ).fetchall():
+        connection.execute(f"DROP INDEX {name}")
+
+
+def _retrieval_latency(model, activity_hash, repeat=100):
+    # get_activity_id remembers what it found: look up the hash afresh each time
+    retrievals = model.retrievals
+    start = time.perf_counter()
+    for _ in range(repeat):
+        retrievals._activity_ids.clear()
+        retrievals.get_activity_id(activity_hash)
+        retrievals.get_current_exeunit_info()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--activities", type=int, default=100000)
+    parser.add_argument("--step", type=int, default=10000)
+    parser.add_argument("--cost-updates-per-activity", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--drop-indexes", action="store_true")
+    args = parser.parse_args()
+
+    model = Model()
+    if args.drop_indexes:
+        _drop_indexes(model.connection)
+    with tempfile.TemporaryDirectory() as directory:
+        agreement_json_file = os.path.join(directory, "agreement.json")
+        with open(agreement_json_file, "w") as file:
+            json.dump(_AGREEMENT, file)
+        print(f"{'activities':>10} {'us/mutation':>12} {'us/retrieval':>13}")
+        for first in range(0, args.activities, args.step):
+            mutations = _mutations(
+                model,
+                args.step,
+                args.cost_updates_per_activity,
+                agreement_json_file,
+                first=first,
+            )
+            start = time.perf_counter()
+            for begin in range(0, len(mutations), args.batch):
+                with model.transaction():
+                    for mutator, arguments in mutations[begin : begin + args.batch]:
+                        mutator(*arguments)
+            elapsed = time.perf_counter() - start
+            retrieval = _retrieval_latency(model, f"{first:032x}")
+            print(
+                f"{first + args.step:>10} {elapsed * 1e6 / len(mutations):12.1f}"
+                f" {retrieval * 1e6:13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
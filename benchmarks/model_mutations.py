@@ -0,0 +1,224 @@
+# benchmarks/model_mutations.py
+"""model mutations per second, statement by statement and batched
+
+applies the mutations of a run of activities (agreement, task, logs directory,
+pid, cost updates, termination, exit and final cost, with the occasional
+payment accounts) to the model twice: with every insert executed and committed
+on its own, as the model did before, and in one transaction per batch (as the
+controller applies the lines it drains in a frame) with the inserts nothing
+reads back right away buffered and written with executemany.
+
+with --database the model is kept in a (WAL mode) database file, where
+committing each insert costs far more than in memory.
+
+usage: python -m benchmarks.model_mutations [--activities N] [--batch N]
+       [--database PATH]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from model import Model
+from model.database import create_connection
+
+_TABLES = (
+    "agreement",
+    "task",
+    "activity",
+    "activity_logs_directory",
+    "activity_pid",
+    "activity_metric",
+    "activity_termination",
+    "activity_exit",
+    "activity_final_cost",
+    "initialized_payment_accounts",
+    "payment_account",
+)
+
+_AGREEMENT = {
+    "demand": {"properties": {"golem": {"srv": {"comp": {"task_package": "x"}}}}},
+    "offer": {
+        "properties": {
+            "golem": {
+                "com": {
+                    "usage": {
+                        "vector": ["golem.usage.cpu_sec", "golem.usage.duration_sec"]
+                    },
+                    "pricing": {"model": {"linear": {"coeffs": [0.0001, 0.0, 0.0]}}},
+                }
+            }
+        }
+    },
+}
+
+
+class _WriteThrough:
+    # the model before write behind: every insert executed as it is made
+    def __init__(self, connection):
+        self.connection = connection
+        self.errors = dict()
+
+    def insert(self, statement, parameters):
+        self.connection.execute(statement, parameters)
+
+    def insert_many(self, statement, parameter_rows):
+        for parameters in parameter_rows:
+            self.connection.execute(statement, parameters)
+
+    def flush(self):
+        pass
+
+
+def _mutations(model, activities, cost_updates, agreement_json_file, first=0):
+    # (mutator, arguments) of every mutation in the order they are applied
+    additions = model.additions
+    updates = model.updates
+    dt = datetime(2023, 5, 29, 1, 0, 0, tzinfo=timezone(timedelta(hours=-7)))
+    mutations = []
+    for sequence in range(first, first + activities):
+        agreement = f"{sequence:064x}"
+        activity = f"{sequence:032x}"
+        timestamps = iter(
+            (dt + timedelta(seconds=sequence * 60 + step)).strftime(
+                "%Y-%m-%dT%H:%M:%S.000-0700"
+            )
+            for step in range(cost_updates + 8)
+        )
+        work_dir = f"/home/golem/work/{agreement}"
+        if sequence % 100 == 0:
+            account = {"address": "0x33a6", "network": "mumbai", "platform": "erc20"}
+            mutations.append(
+                (additions.add_payment_accounts, (next(timestamps), [account] * 2))
+            )
+        mutations += [
+            (
+                additions.add_agreement,
+                (next(timestamps), agreement, "0x33a6973df17ceae741b2", "vm"),
+            ),
+            (
+                additions.add_task,
+                (
+                    next(timestamps),
+                    agreement,
+                    activity,
+                    work_dir,
+                    work_dir,
+                    agreement_json_file,
+                    f"{work_dir}/{activity}",
+                    f"{work_dir}/deployment.json",
+                ),
+            ),
+            (
+                additions.add_exeunit_logs_dir,
+                (next(timestamps), f"{work_dir}/{activity}/logs", activity),
+            ),
+            (additions.add_exeunit_pid, (next(timestamps), 486619)),
+        ]
+        mutations += [
+            (
+                updates.update_cost_information,
+                (next(timestamps), activity, 0.0001, [2.0 + step, 118.0 + step]),
+            )
+            for step in range(cost_updates)
+        ]
+        mutations += [
+            (updates.update_exeunit_termination, (next(timestamps), activity)),
+            (
+                updates.update_exeunit_exit,
+                (next(timestamps), "Finished", 0, agreement, activity),
+            ),
+            (
+                updates.update_final_cost_for_activity_information,
+                (next(timestamps), activity, 0.000019506929073611),
+            ),
+        ]
+    return mutations
+
+
+def _open(path):
+    if path is None:
+        return Model()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return Model(create_connection(path))
+
+
+def _row_counts(model):
+    model.flush_writes()
+    return [
+        model.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in _TABLES
+    ]
+
+
+def _apply_each(model, mutations, batch):
+    for mutator, arguments in mutations:
+        mutator(*arguments)
+
+
+def _apply_batched(model, mutations, batch):
+    for start in range(0, len(mutations), batch):
+        with model.transaction():
+            for mutator, arguments in mutations[start : start + batch]:
+                mutator(*arguments)
+
+
+def _measure(apply, write_through, args, agreement_json_file):
+    best = None
+    for _ in range(args.repeat):
+        # a fresh model on an empty database, so no activity id is remembered
+        model = _open(args.database)
+        if write_through:
+            model.write_buffer = _WriteThrough(model.connection)
+        mutations = _mutations(
+            model, args.activities, args.cost_updates_per_activity, agreement_json_file
+        )
+        start = time.perf_counter()
+        apply(model, mutations, args.batch)
+        model.flush_writes()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    row_counts = _row_counts(model)
+    model.connection.close()
+    return best, len(mutations), row_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--activities", type=int, default=2000)
+    parser.add_argument("--cost-updates-per-activity", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database", metavar="PATH", help="replaced if it exists")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        agreement_json_file = os.path.join(directory, "agreement.json")
+        with open(agreement_json_file, "w") as file:
+            json.dump(_AGREEMENT, file)
+        results = dict()
+        expected = None
+        for name, apply, write_through in (
+            ("autocommit", _apply_each, True),
+            ("batched", _apply_batched, False),
+        ):
+            elapsed, mutation_count, row_counts = _measure(
+                apply, write_through, args, agreement_json_file
+            )
+            if expected is None:
+                print(f"{mutation_count} mutations, {args.batch} per transaction")
+                expected = row_counts
+            elif row_counts != expected:
+                print(f"{name}: row counts differ")
+            results[name] = elapsed
+            print(f"{name:>10}: {mutation_count / elapsed:10,.0f} mutations/sec")
+    print(f"speedup: {results['autocommit'] / results['batched']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
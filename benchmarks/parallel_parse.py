@@ -0,0 +1,65 @@
+# benchmarks/parallel_parse.py
+"""throughput of golemspi_analyze's parse stage by number of worker processes
+
+writes a synthetic golemsp transcript to a temporary file, then times splitting
+it into chunks and identifying the events in every chunk (as
+golemspi_analyze --jobs N does before applying them to the model) for each
+number of jobs, reporting MB/s and the speedup over one job.
+
+usage: python -m benchmarks.parallel_parse [--size-mb N] [--jobs 1,2,4]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from golemspi_analyze import identify_events_in_chunk, split_into_chunks
+from .transcript import generate_transcript
+
+
+def _measure(path, jobs):
+    start = time.perf_counter()
+    tasks = [(path, begin, end) for begin, end in split_into_chunks(path, jobs * 4)]
+    event_count = 0
+    if jobs == 1:
+        results = map(identify_events_in_chunk, tasks)
+        for _, events in results:
+            event_count += len(events)
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            for _, events in pool.imap(identify_events_in_chunk, tasks):
+                event_count += len(events)
+    return time.perf_counter() - start, event_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--noise-per-event", type=int, default=20)
+    parser.add_argument(
+        "--jobs",
+        default=",".join(
+            str(jobs) for jobs in (1, 2, 4, 8) if jobs <= (os.cpu_count() or 1)
+        ),
+    )
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".log") as log_file:
+        log_file.write(generate_transcript(args.size_mb << 20, args.noise_per_event))
+        log_file.flush()
+        size = os.path.getsize(log_file.name)
+        print(f"{size / (1 << 20):.0f} MiB, {os.cpu_count()} cpus")
+        single = None
+        for jobs in (int(jobs) for jobs in args.jobs.split(",")):
+            elapsed, event_count = _measure(log_file.name, jobs)
+            single = elapsed if single is None else single
+            print(
+                f"{jobs:>3} jobs: {size / (1 << 20) / elapsed:7.1f} MB/s"
+                f"  {event_count} events  speedup {single / elapsed:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/pipe_data_received.py
+"""throughput of ProcessQueue's stream splitter against the original byte loop
+
+feeds a synthetic golemsp transcript (100 MB by default) through
+_MySubprocessProtocol.pipe_data_received in 64 KiB chunks, as the asyncio pipe
+transport delivers them, and reports MB/s for both implementations.
+
+usage: python -m benchmarks.pipe_data_received [--megabytes N]
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from processqueue.processqueue import _MySubprocessProtocol
+from .transcript import generate_transcript
+
+_CHUNK_SIZE = 1 << 16
+
+
+class _CountingQueue:
+    # stand in for the shared queue that only counts lines
+    def __init__(self):
+        self.count = 0
+
+    def put_lines(self, lines):
+        self.count += len(lines)
+
+
+class _LegacySubprocessProtocol(asyncio.SubprocessProtocol):
+    # the byte by byte splitter ProcessQueue used before the chunked rewrite
+    def __init__(self, *args, shared_queue, **kwargs):
+        self._queue = shared_queue
+        self._linebuffer = io.StringIO()
+        super().__init__(*args, **kwargs)
+
+    def pipe_data_received(self, fd, data):
+        lines = []
+        for byte in data:
+            char = chr(byte)
+            if char != "\n":
+                self._linebuffer.write(char)
+            else:
+                lines.append(self._linebuffer.getvalue())
+                self._linebuffer.close()
+                self._linebuffer = io.StringIO()
+        self._queue.put_lines(lines)
+
+
+def _measure(protocol_class, transcript):
+    counter = _CountingQueue()
+    protocol = protocol_class(shared_queue=counter)
+    view = memoryview(transcript)
+    start = time.perf_counter()
+    for offset in range(0, len(transcript), _CHUNK_SIZE):
+        protocol.pipe_data_received(1, bytes(view[offset : offset + _CHUNK_SIZE]))
+    elapsed = time.perf_counter() - start
+    return elapsed, counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=100)
+    args = parser.parse_args()
+
+    transcript = generate_transcript(args.megabytes * 1024 * 1024)
+    megabytes = len(transcript) / (1024 * 1024)
+    print(f"transcript: {megabytes:.1f} MB")
+    results = {}
+    for name, protocol_class in (
+        ("chunked", _MySubprocessProtocol),
+        ("byte loop", _LegacySubprocessProtocol),
+    ):
+        elapsed, count = _measure(protocol_class, transcript)
+        results[name] = elapsed
+        print(
+            f"{name:>10}: {elapsed:8.2f} s  {megabytes / elapsed:9.1f} MB/s  {count} lines"
+        )
+    print(f"speedup: {results['byte loop'] / results['chunked']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/process_log_event.py
+"""per event cost of applying an event to the model
+
+identifies the events of a synthetic golemsp transcript once, then times
+Controller.process_log_event over all of them for the type keyed dispatch table
+(Controller._build_event_dispatch) and for the isinstance chain it replaced,
+which expanded event.asdict() into every mutator call. the mutators are no-ops
+with the model's signatures so only the cost of dispatching is measured.
+
+usage: python -m benchmarks.process_log_event [--lines N] [--noise-per-event N]
+"""
+
+import argparse
+import inspect
+import time
+import types
+
+from controller import Controller
+from controller.events import determine_event_type_and_data, parse_log_line
+from controller.events.log_events import *
+from model import Model
+from .transcript import generate_lines
+
+
+def _no_op_like(function):
+    # a function accepting what function accepts and doing nothing
+    parameters = ", ".join(inspect.signature(function).parameters)
+    namespace = dict()
+    exec(f"def no_op({parameters}): pass", namespace)
+    return namespace["no_op"]
+
+
+def _no_op_model():
+    model = Model()
+    no_op_model = types.SimpleNamespace()
+    for name in ("additions", "updates"):
+        mutators = getattr(model, name)
+        setattr(
+            no_op_model,
+            name,
+            types.SimpleNamespace(
+                **{
+                    attribute: _no_op_like(getattr(mutators, attribute))
+                    for attribute in dir(mutators)
+                    if attribute.startswith(("add_", "update_"))
+                }
+            ),
+        )
+    return no_op_model
+
+
+def _legacy_process_log_event(model):
+    # the isinstance chain of Controller.process_log_event the table replaced
+    def process_log_event(log_event):
+        if isinstance(log_event, YagnaServiceStartedEvent):
+            model.additions.add_version_info(**log_event.asdict())
+        elif isinstance(log_event, InitializedPaymentAccountEvent):
+            model.additions.add_initialized_payment_account_info(**log_event.asdict())
+        elif isinstance(log_event, PaymentAccountsEvent):
+            model.additions.add_payment_accounts(**log_event.asdict())
+        elif isinstance(log_event, PaymentNetworkEvent):
+            model.additions.add_payment_network(**log_event.asdict())
+        elif isinstance(log_event, HardwareResourcesCapEvent):
+            model.additions.add_hardware_cap_info(**log_event.asdict())
+        elif isinstance(log_event, UsingSubnetEvent):
+            model.additions.add_subnet_utilized(**log_event.asdict())
+        elif isinstance(log_event, NewAgreementEvent):
+            model.additions.add_agreement(**log_event.asdict())
+        elif isinstance(log_event, NewTaskEvent):
+            model.additions.add_task(**log_event.asdict())
+        elif isinstance(log_event, NewExeUnitLogsDirEvent):
+            model.additions.add_exeunit_logs_dir(**log_event.asdict())
+        elif isinstance(log_event, NewExeUnitPidEvent):
+            model.additions.add_exeunit_pid(**log_event.asdict())
+        elif isinstance(log_event, NewCostInformationEvent):
+            model.updates.update_cost_information(**log_event.asdict())
+        elif isinstance(log_event, ExeUnitTerminatedEvent):
+            model.updates.update_exeunit_termination(**log_event.asdict())
+        elif isinstance(log_event, ExeUnitExitedEvent):
+            model.updates.update_exeunit_exit(**log_event.asdict())
+        elif isinstance(log_event, FinalCostForActivityEvent):
+            model.updates.update_final_cost_for_activity_information(
+                **log_event.asdict()
+            )
+
+    return process_log_event
+
+
+def _measure(process_log_event, events, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for log_event in events:
+            process_log_event(log_event)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--noise-per-event", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    events = []
+    for line in generate_lines(args.lines, noise_per_event=args.noise_per_event):
+        log_event = determine_event_type_and_data(parse_log_line(line))
+        if log_event is not None and not isinstance(log_event, IdentityEvent):
+            events.append(log_event)
+    print(f"{len(events)} events")
+    model = _no_op_model()
+    controller = Controller(model=model, view=None, log_queue=None)
+    # keep exe unit log directories out of the measurement (there is no queue)
+    controller._event_dispatch[NewExeUnitLogsDirEvent] = NewExeUnitLogsDirEvent.bind(
+        model.additions.add_exeunit_logs_dir
+    )
+    results = {}
+    for name, process_log_event in (
+        ("table", controller.process_log_event),
+        ("chain", _legacy_process_log_event(model)),
+    ):
+        results[name] = _measure(process_log_event, events, args.repeat)
+        print(f"{name:>8}: {results[name] * 1e9 / len(events):8.0f} ns/event")
+    print(f"speedup: {results['chain'] / results['table']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
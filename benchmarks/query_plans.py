@@ -0,0 +1,126 @@
+# benchmarks/query_plans.py
+"""check that no model query scans a whole table
+
+applies the mutations of a few synthetic activities to the model and calls each
+of its retrievals, recording every statement they run. each distinct statement
+(its literals aside) is then explained with EXPLAIN QUERY PLAN and reported
+with the method that ran it; any plan that scans a table (or a whole index) in
+full fails the check, except for the summaries, which read every row by design.
+exits with status 1 if the check fails.
+
+usage: python -m benchmarks.query_plans [--verbose]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+
+from model import Model
+from .model_mutations import _AGREEMENT, _mutations
+
+# totals over the whole history, e.g. for golemspi_analyze's summary
+_SUMMARIES = {
+    "get_history_counts",
+    "get_exit_status_counts",
+    "get_final_cost_totals",
+    "get_earnings_by_requestor",
+}
+_EXPLAINED = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+
+
+def _queries(model):
+    retrievals = model.retrievals
+    return [
+        (retrievals.get_current_exeunit_info, ()),
+        (retrievals.get_payment_account_address_info_on_network, (["mumbai"],)),
+        (retrievals.get_history_counts, ()),
+        (retrievals.get_exit_status_counts, ()),
+        (retrievals.get_final_cost_totals, ()),
+        (retrievals.get_earnings_by_requestor, ()),
+        # the retention policy's roll up, with every metric past the retention
+        (model.updates.roll_up_activity_metrics, (4102444800,)),
+    ]
+
+
+def _record_statements(model, calls):
+    # distinct statement -> (method that ran it, the statement as first run)
+    statements = dict()
+    caller = None
+
+    def trace(statement):
+        if not statement.lstrip().upper().startswith(_EXPLAINED):
+            return
+        key = " ".join(_LITERAL_PATTERN.sub("?", statement).split())
+        statements.setdefault(key, (caller, statement))
+
+    model.connection.set_trace_callback(trace)
+    try:
+        for function, arguments in calls:
+            caller = function.__name__
+            with model.transaction():
+                function(*arguments)
+                caller = "flush"
+    finally:
+        model.connection.set_trace_callback(None)
+    return statements
+
+
+def _full_scans(connection, statement):
+    plan = connection.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+    details = [detail for _, _, _, detail in plan]
+    scans = [
+        detail
+        for detail in details
+        if detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW"
+    ]
+    return details, scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--activities", type=int, default=3)
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    model = Model()
+    with tempfile.TemporaryDirectory() as directory:
+        agreement_json_file = os.path.join(directory, "agreement.json")
+        with open(agreement_json_file, "w") as file:
+            json.dump(_AGREEMENT, file)
+        calls = _mutations(model, args.activities, 1, agreement_json_file)
+        calls.append(
+            (
+                model.additions.add_initialized_payment_account_info,
+                (
+                    "2023-05-29T01:00:00.000-0700",
+                    "send",
+                    "0x33a6",
+                    "erc20",
+                    "mumbai",
+                    "tglm",
+                ),
+            )
+        )
+        calls += _queries(model)
+        statements = _record_statements(model, calls)
+
+    failures = 0
+    for key, (caller, statement) in statements.items():
+        details, scans = _full_scans(model.connection, statement)
+        failed = scans and caller not in _SUMMARIES
+        failures += bool(failed)
+        if failed or args.verbose:
+            status = "FULL SCAN" if failed else ("summary" if scans else "ok")
+            print(f"{status}: {caller}: {key}")
+            for detail in details:
+                print(f"    {detail}")
+    print(f"{len(statements)} statements, {failures} with full table scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
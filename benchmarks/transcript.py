@@ -0,0 +1,70 @@
+# benchmarks/transcript.py
+"""synthetic golemsp transcripts for the benchmarks
+
+the mix mirrors a busy provider: most lines are market negotiation and debug
+chatter that never produce an event, with the occasional agreement, task, cost
+update and termination sequence in between.
+"""
+
+import itertools
+from datetime import datetime, timedelta, timezone
+
+_TZ = timezone(timedelta(hours=-7))
+
+_NOISE_LINES = [
+    "DEBUG ya_market::matcher::resolver] Subscription [f1e2d3c4b5a6978877665544332211000ffeeddccbbaa99887766554433221100-0f1e2d3c4b5a69788776655443322110] matched offer",
+    "INFO  ya_provider::market::provider_market] Processing proposal [R-7f8e9d0c1b2a3948576] from [0x33a6973df17ceae741b26f4372ee101cc81e82dd]",
+    "DEBUG ya_net::hybrid::service] forwarding message to node 0x8f2a7e0c1d3b5a4968778695a4b3c2d1e0f9a8b7",
+    "INFO  ya_provider::market::negotiator::builtin::manifest] Checking manifest of demand",
+    "DEBUG ya_relay_client::client] Session with 0x1d3b5a4968778695a4b3c2d1e0f9a8b78f2a7e0c established",
+    "WARN  ya_provider::market::provider_market] Rejecting proposal: Requestor expiration too short",
+    "INFO  ya_market::negotiation::provider] Proposal [R-2b2a3948576] countered",
+    "DEBUG ya_service_bus::remote_router] bind local handler /public/market",
+]
+
+_EVENT_LINES = [
+    "INFO  ya_provider::market::provider_market] Got agreement [{agreement}] from Requestor [0x33a6973df17ceae741b26f4372ee101cc81e82dd] for subscription [vm].",
+    "INFO  ya_provider::execution::task_runner] Creating task: agreement [{agreement}], activity [{activity}] in directory: [/home/golem/.local/share/ya-provider/exe-unit/work/{agreement}/{activity}].",
+    "INFO  ya_provider::execution::exeunit_instance] Exeunit log directory: /home/golem/.local/share/ya-provider/exe-unit/work/{agreement}/{activity}/logs",
+    "INFO  ya_provider::execution::exeunit_instance] Exeunit process spawned, pid: 486619",
+    "INFO  ya_provider::payments::payments] Updating cost for activity [{activity}]: 0.000177839206922222, usage [2.008308, 118.002688984].",
+    "INFO  ya_provider::execution::task_runner] ExeUnit for activity terminated: [{activity}].",
+    "INFO  ya_provider::execution::task_runner] ExeUnit process exited with status Finished - exit status: 0, agreement [{agreement}], activity [{activity}].",
+    "INFO  ya_provider::payments::payments] Final cost for activity [{activity}]: 0.000019506929073611.",
+]
+
+
+def _timestamp(dt):
+    # golemsp layout: 2023-05-28T08:05:05.879-0700
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}-0700"
+
+
+def generate_lines(count, noise_per_event=20, start=None):
+    """yield count synthetic log lines, noise_per_event noise lines per event line"""
+    if start is None:
+        start = datetime(2023, 5, 29, 1, 0, 0, tzinfo=_TZ)
+    noise = itertools.cycle(_NOISE_LINES)
+    events = itertools.cycle(enumerate(_EVENT_LINES))
+    dt = start
+    sequence = 0
+    for index in range(count):
+        dt += timedelta(milliseconds=37)
+        if index % (noise_per_event + 1) == noise_per_event:
+            position, template = next(events)
+            if position == 0:
+                sequence += 1
+            agreement = f"{sequence:064x}"
+            activity = f"{sequence:032x}"
+            body = template.format(agreement=agreement, activity=activity)
+        else:
+            body = next(noise)
+        yield f"[{_timestamp(dt)} {body}"
+
+
+def generate_transcript(size_bytes, noise_per_event=20):
+    """return a bytes transcript of roughly size_bytes bytes"""
+    block = (
+        "\n".join(generate_lines(10000, noise_per_event=noise_per_event)) + "\n"
+    ).encode("utf-8")
+    repeats = max(1, size_bytes // len(block))
+    return block * repeats
@@ -0,0 +1,74 @@
+# benchmarks/unix_time.py
+"""per timestamp cost of model.time_utils.convert_to_unix_time
+
+takes the timestamps of the event lines of a synthetic golemsp transcript (the
+ones the model converts) and times converting them one by one with the cached
+parser, in one call with convert_to_unix_times, and with the strptime it
+replaced, reporting nanoseconds per timestamp for each.
+
+usage: python -m benchmarks.unix_time [--lines N] [--noise-per-event N]
+"""
+
+import argparse
+import time
+
+from controller.events import determine_event_type_and_data, parse_log_line
+from model import time_utils
+from utils.timestamps import clear_caches
+from .transcript import generate_lines
+
+
+def _convert_each(convert):
+    def convert_all(timestamps):
+        return [convert(timestamp) for timestamp in timestamps]
+
+    return convert_all
+
+
+def _measure(convert_all, timestamps, repeat):
+    best = None
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        unix_times = convert_all(timestamps)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, unix_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--noise-per-event", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    timestamps = []
+    for line in generate_lines(args.lines, noise_per_event=args.noise_per_event):
+        log_event = determine_event_type_and_data(parse_log_line(line))
+        if log_event is not None:
+            timestamps.append(log_event.timestamp)
+    distinct_seconds = len({timestamp[:19] for timestamp in timestamps})
+    print(f"{len(timestamps)} timestamps, {distinct_seconds} distinct seconds")
+    results = dict()
+    expected = None
+    for name, convert_all in (
+        ("cached", _convert_each(time_utils.convert_to_unix_time)),
+        ("batch", time_utils.convert_to_unix_times),
+        ("strptime", _convert_each(time_utils._convert_with_strptime)),
+    ):
+        elapsed, unix_times = _measure(convert_all, timestamps, args.repeat)
+        if expected is None:
+            expected = unix_times
+        elif unix_times != expected:
+            print(f"{name}: unix times differ")
+        results[name] = elapsed
+        print(f"{name:>9}: {elapsed * 1e9 / len(timestamps):8.0f} ns/timestamp")
+    print(
+        f"speedup: {results['strptime'] / results['cached']:.2f}x,"
+        f" batch {results['strptime'] / results['batch']:.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
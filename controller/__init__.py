@@ -1 +1,2 @@
 from .controller import Controller
+from .record_assembler import MultiLineAssembler
@@ -2,15 +2,58 @@
 # golemspi controller
 # interact with the model and the view
 # from utils.colors import Colors
+import collections
 import queue
 import time
-from .events import determine_event_type_and_data
-from .events import parse_log_line
+from .events import identify_log_record
 from .events.log_events import *
 
-from model import Model
+from model import Model, MissingParentError
 from utils.mylogger import console_logger, file_logger
 from .model_queries import perform_view_updates
+from .record_assembler import MultiLineAssembler
+
+
+def _display_text(log_line):
+    # prefix lines merged from several sources with the name of their source
+    source = getattr(log_line, "source", None)
+    if source is None:
+        return log_line
+    return f"{source}| {log_line}"
+
+
+class _FrameStats:
+    # frame (read, apply and refresh) times and, when the log queue can tell it
+    # (see processqueue.ReplayQueue.lag), end to end lag, logged periodically
+    k_report_interval = 10.0  # seconds
+
+    def __init__(self):
+        self._reset(time.perf_counter())
+
+    def _reset(self, now):
+        self.report_time = now
+        self.frame_count = 0
+        self.frame_time_total = 0.0
+        self.frame_time_max = 0.0
+        self.lag_max = None
+
+    def record(self, frame_time, lag=None):
+        self.frame_count += 1
+        self.frame_time_total += frame_time
+        self.frame_time_max = max(self.frame_time_max, frame_time)
+        if lag is not None:
+            self.lag_max = lag if self.lag_max is None else max(self.lag_max, lag)
+        now = time.perf_counter()
+        if now - self.report_time >= self.k_report_interval:
+            message = (
+                f"{self.frame_count} frames,"
+                f" mean {self.frame_time_total / self.frame_count * 1000:.1f}ms,"
+                f" max {self.frame_time_max * 1000:.1f}ms"
+            )
+            if self.lag_max is not None:
+                message += f", max lag {self.lag_max:.3f}s"
+            file_logger.info(message)
+            self._reset(now)
 
 
 class Controller:
@@ -20,91 +63,262 @@ class Controller:
         self.current_message = log_queue
         self.subprocess_start_time = None
         self.queue_read_start_time = None
+        self._pending_lines = collections.deque()
+        self._frame_stats = _FrameStats()
+        # a merged log queue also delivers lines (e.g. of exe units) not to interpret
+        self._from_primary = getattr(log_queue, "from_primary", None)
+        self._event_dispatch = self._build_event_dispatch()
+        # join the lines of multi line log messages before they are interpreted,
+        # one per source so the lines of sources merged (e.g. of several nodes on
+        # a socket) never end up in each other's messages
+        self._assemblers = dict()  # source (None when untagged) -> MultiLineAssembler
+        # while catching up: exe unit log directories to follow once caught up,
+        # those of exe units that were still running (activity hash -> event)
+        self._deferred_exeunit_logs = None
+        # events skipped for referring to an agreement or activity not in the model
+        self.skipped_events = collections.Counter()  # event class name -> count
 
-    def read_next_message(self):
-        try:
-            log_line = self.current_message.get_nowait()
-        except queue.Empty:
-            log_line = None
-        return log_line
+    def _refill_pending_lines(self, max_lines):
+        # drain a batch from the log queue in one transport read when supported
+        get_batch = getattr(self.current_message, "get_batch", None)
+        if get_batch is not None:
+            self._pending_lines.extend(get_batch(max_lines))
+        else:
+            try:
+                self._pending_lines.append(self.current_message.get_nowait())
+            except queue.Empty:
+                pass
+
+    def read_next_message(self, max_lines=1):
+        if not self._pending_lines:
+            self._refill_pending_lines(max_lines)
+        if self._pending_lines:
+            return self._pending_lines.popleft()
+        return None
+
+    def handle_log_line(self, log_line):
+        # interpret a log line once the log message it belongs to is complete
+        if self._from_primary is not None and not self._from_primary(log_line):
+            return
+        source = getattr(log_line, "source", None)
+        assembler = self._assemblers.get(source)
+        if assembler is None:
+            assembler = self._assemblers[source] = MultiLineAssembler(
+                self.handle_log_record
+            )
+        assembler.add_line(log_line)
+
+    def flush_expired_records(self):
+        # a multi line log message is not held back for long
+        for source, assembler in list(self._assemblers.items()):
+            assembler.flush_expired()
+            if not assembler.pending_line_count:
+                # nothing open: forget the source (e.g. a node that disconnected)
+                del self._assemblers[source]
+
+    def _pending_record_line_count(self):
+        return sum(
+            assembler.pending_line_count for assembler in self._assemblers.values()
+        )
+
+    def handle_log_record(self, log_record):
+        # apply any event a (complete) log message describes to the model
+        log_event = self.determine_event_type_and_data(log_record)
+        if log_event is not None:
+            self.process_log_event(log_event)  # add to model
+
+    def follow_exeunit_logs(self, log_event):
+        # merge the exe unit's own logs into the stream when the log queue can
+        add_source_directory = getattr(
+            self.current_message, "add_source_directory", None
+        )
+        if add_source_directory is None:
+            return
+        if self._deferred_exeunit_logs is not None:
+            # a directory of the backlog, most of its exe units are long gone
+            self._deferred_exeunit_logs[log_event.activity_hash] = log_event
+            return
+        add_source_directory(log_event.path_to_logs_dir, log_event.activity_hash[:8])
+
+    def forget_exeunit_logs(self, log_event):
+        # an exe unit of the backlog ended, its logs are not to be followed
+        if self._deferred_exeunit_logs is not None:
+            self._deferred_exeunit_logs.pop(log_event.activity_hash, None)
+
+    def _follow_deferred_exeunit_logs(self):
+        # caught up: follow the logs of the exe units still running
+        deferred, self._deferred_exeunit_logs = self._deferred_exeunit_logs, None
+        for log_event in deferred.values():
+            self.follow_exeunit_logs(log_event)
+
+    def checkpoint(self):
+        # persist how far the log has been processed where the log queue supports it
+        checkpoint = getattr(self.current_message, "checkpoint", None)
+        if checkpoint is not None:
+            checkpoint(
+                unprocessed=len(self._pending_lines)
+                + self._pending_record_line_count()
+            )
+
+    def catch_up(self):
+        """parse the backlog already in the log into the model before going live
+
+        rendering is suspended: lines are parsed in large batches and only the last
+        k_tail_lines of the backlog are handed to the view once the tail reached the
+        end of what the log held when opened. meanwhile the status area shows the
+        progress and the rate in lines per second.
+        """
+        k_catch_up_batch = 20000
+        k_tail_lines = 2000
+        k_progress_interval = 0.25
+        tail = collections.deque(maxlen=k_tail_lines)
+        self._deferred_exeunit_logs = dict()
+        start_time = time.perf_counter()
+        last_progress_time = start_time
+        line_count = 0
+        while True:
+            log_line = self.read_next_message(k_catch_up_batch)
+            if log_line is None:
+                with self.model.transaction():
+                    self.flush_expired_records()
+                if self.current_message.backlog_loaded:
+                    # the tail reached the end of the backlog and it is drained
+                    lines = self.current_message.get_batch(1, max_wait=0.05)
+                    if not lines:
+                        break
+                    self._pending_lines.extend(lines)
+                    continue
+                time.sleep(0.001)
+            else:
+                line_count += 1
+                tail.append(_display_text(log_line))
+                with self.model.transaction():
+                    # the rest of the batch drained goes into the same transaction
+                    self.handle_log_line(log_line)
+                    while self._pending_lines:
+                        log_line = self._pending_lines.popleft()
+                        line_count += 1
+                        tail.append(_display_text(log_line))
+                        self.handle_log_line(log_line)
+            now = time.perf_counter()
+            if now - last_progress_time > k_progress_interval:
+                last_progress_time = now
+                self.view.update_catch_up_progress(
+                    self.current_message.backlog_progress(),
+                    line_count / (now - start_time),
+                )
+                self.view.update()
+                self.checkpoint()
+        self.checkpoint()
+        self.model.apply_retention()
+        self._follow_deferred_exeunit_logs()
+        elapsed = time.perf_counter() - start_time
+        file_logger.debug(
+            f"caught up on {line_count} lines in {elapsed:.2f}s"
+            f" ({line_count / max(elapsed, 1e-9):.0f} lines/sec)"
+        )
+        for display_line in tail:
+            self.view.add_log_line(display_line)
+        self.view.update_catch_up_progress(None)
 
     def determine_event_type_and_data(self, log_line):
         # logic to determine event type and associated data
-        parsed_log_line = parse_log_line(log_line)
-        if parsed_log_line.namespace is None:
-            # later handle non conforming messages
-            log_event = None
-        else:
-            log_event = determine_event_type_and_data(parsed_log_line)
-        return log_event
+        return identify_log_record(log_line)
+
+    def _build_event_dispatch(self):
+        # event class -> callable applying an event of that class to the model
+        additions = self.model.additions
+        updates = self.model.updates
+        dispatch = {
+            YagnaServiceStartedEvent: additions.add_version_info,
+            InitializedPaymentAccountEvent: (
+                additions.add_initialized_payment_account_info
+            ),
+            PaymentAccountsEvent: additions.add_payment_accounts,
+            PaymentNetworkEvent: additions.add_payment_network,
+            HardwareResourcesCapEvent: additions.add_hardware_cap_info,
+            UsingSubnetEvent: additions.add_subnet_utilized,
+            # UsageCoeffsEvent: the model has no mutator for usage coefficients yet
+            NewAgreementEvent: additions.add_agreement,
+            NewTaskEvent: additions.add_task,
+            NewExeUnitPidEvent: additions.add_exeunit_pid,
+            NewCostInformationEvent: updates.update_cost_information,
+            ExeUnitTerminatedEvent: updates.update_exeunit_termination,
+            ExeUnitExitedEvent: updates.update_exeunit_exit,
+            FinalCostForActivityEvent: (
+                updates.update_final_cost_for_activity_information
+            ),
+        }
+        dispatch = {
+            event_class: event_class.bind(mutator)
+            for event_class, mutator in dispatch.items()
+        }
+        add_exeunit_logs_dir = NewExeUnitLogsDirEvent.bind(
+            additions.add_exeunit_logs_dir
+        )
+
+        def on_new_exeunit_logs_dir(log_event):
+            self.follow_exeunit_logs(log_event)
+            add_exeunit_logs_dir(log_event)
+
+        dispatch[NewExeUnitLogsDirEvent] = on_new_exeunit_logs_dir
+        for event_class in (ExeUnitTerminatedEvent, ExeUnitExitedEvent):
+
+            def on_exeunit_end(log_event, apply=dispatch[event_class]):
+                self.forget_exeunit_logs(log_event)
+                apply(log_event)
+
+            dispatch[event_class] = on_exeunit_end
+        dispatch[IdentityEvent] = lambda log_event: file_logger.debug(
+            log_event.asdict()
+        )
+        return dispatch
 
     def process_log_event(self, log_event):
-        if isinstance(log_event, YagnaServiceStartedEvent):
-            self.model.additions.add_version_info(**log_event.asdict())
-        elif isinstance(log_event, InitializedPaymentAccountEvent):
-            self.model.additions.add_initialized_payment_account_info(
-                **log_event.asdict()
-            )
-        elif isinstance(log_event, PaymentAccountsEvent):
-            self.model.additions.add_payment_accounts(**log_event.asdict())
-        elif isinstance(log_event, PaymentNetworkEvent):
-            self.model.additions.add_payment_network(**log_event.asdict())
-        elif isinstance(log_event, HardwareResourcesCapEvent):
-            self.model.additions.add_hardware_cap_info(**log_event.asdict())
-            # file_logger.debug(self.model.hardware_resource_cap_info)
-        elif isinstance(log_event, UsingSubnetEvent):
-            self.model.additions.add_subnet_utilized(**log_event.asdict())
-        elif isinstance(log_event, UsageCoeffsEvent):
-            self.model.additions.update_usage_coeffs(**log_event.as_dict())
-        elif isinstance(log_event, NewAgreementEvent):
-            self.model.additions.add_agreement(**log_event.asdict())
-        elif isinstance(log_event, NewTaskEvent):
-            self.model.additions.add_task(**log_event.asdict())
-        elif isinstance(log_event, NewExeUnitLogsDirEvent):
-            self.model.additions.add_exeunit_logs_dir(**log_event.asdict())
-        elif isinstance(log_event, NewExeUnitPidEvent):
-            self.model.additions.add_exeunit_pid(**log_event.asdict())
-        elif isinstance(log_event, NewCostInformationEvent):
-            self.model.updates.update_cost_information(**log_event.asdict())
-        elif isinstance(log_event, ExeUnitTerminatedEvent):
-            self.model.updates.update_exeunit_termination(**log_event.asdict())
-        elif isinstance(log_event, ExeUnitExitedEvent):
-            self.model.updates.update_exeunit_exit(**log_event.asdict())
-        elif isinstance(log_event, FinalCostForActivityEvent):
-            self.model.updates.update_final_cost_for_activity_information(
-                **log_event.asdict()
-            )
-        elif isinstance(log_event, IdentityEvent):
-            file_logger.debug(log_event.asdict())
+        handler = self._event_dispatch.get(type(log_event))
+        if handler is None:
+            return
+        try:
+            handler(log_event)
+        except MissingParentError as e:
+            # e.g. the log was resumed from a checkpoint after the activity began
+            name = type(log_event).__name__
+            self.skipped_events[name] += 1
+            file_logger.debug(f"skipping {name}: {e}")
 
     def __call__(self):
         # Colors.print_color(
         #     "Controller started, reading log messages", color=Colors.RED_BG
         # )
-        k_log_line_read_limit = 10
+        k_log_line_read_limit = 5000
+        if getattr(self.current_message, "backlog_size", 0):
+            self.catch_up()
         while True:
             # use a performance counter to give time for queue to fill
             if self.queue_read_start_time is None:
                 self.queue_read_start_time = time.perf_counter()
 
             if time.perf_counter() - self.queue_read_start_time > 0.05:
-                log_line = self.read_next_message()
+                frame_start_time = time.perf_counter()
+                last_log_line = None
+                log_line = self.read_next_message(k_log_line_read_limit)
                 log_line_count = 0
-                while log_line is not None and log_line_count < k_log_line_read_limit:
-                    # read a bunch of log lines before processing
-                    log_line_count += 1
-                    # handle multi line log message (always a list)
-                    if log_line.endswith("["):
-                        while not log_line.endswith("]"):
-                            inner_line = self.read_next_message()
-                            if inner_line is not None:
-                                log_line += self.read_next_message()
-                    self.view.add_log_line(log_line)
-                    log_event = self.determine_event_type_and_data(log_line)
-                    if log_event is not None:
-                        self.process_log_event(log_event)  # add to model
-                    if log_line_count < k_log_line_read_limit:
-                        log_line = self.read_next_message()
+                # the lines drained in a frame are applied in one transaction
+                with self.model.transaction():
+                    while (
+                        log_line is not None
+                        and log_line_count < k_log_line_read_limit
+                    ):
+                        # read a bunch of log lines before processing
+                        log_line_count += 1
+                        self.view.add_log_line(_display_text(log_line))
+                        self.handle_log_line(log_line)
+                        last_log_line = log_line
+                        if log_line_count < k_log_line_read_limit:
+                            log_line = self.read_next_message(
+                                k_log_line_read_limit - log_line_count
+                            )
+                    self.flush_expired_records()
 
                 # reset read queue timer
                 self.queue_read_start_time = None
@@ -114,8 +328,15 @@ class Controller:
                 active_flags = self.model.get_active_flags()
                 perform_view_updates(self, active_flags)
                 self.model.reset_view_update_flags()
+                self.checkpoint()
+                self.model.apply_retention()
 
                 # refresh view
                 self.view.update()
 
+                lag = None
+                if last_log_line is not None and hasattr(self.current_message, "lag"):
+                    lag = self.current_message.lag(last_log_line)
+                self._frame_stats.record(time.perf_counter() - frame_start_time, lag)
+
             time.sleep(0.002)
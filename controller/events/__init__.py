@@ -1,2 +1,6 @@
-from .event_handler import determine_event_type_and_data
+from .event_handler import (
+    determine_event_type_and_data,
+    identify_log_record,
+    may_describe_event,
+)
 from .log_line import parse_log_line
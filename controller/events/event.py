@@ -3,9 +3,22 @@ import pprint
 
 
 class Event:
+    # events are slotted: subclasses list the attributes they add in __slots__
+    __slots__ = ("timestamp",)
+    _fields = ("timestamp",)
+
     def __init__(self, timestamp):
         self.timestamp = timestamp  # in the minimum we expect an log message event to parse a timestamp
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # the fields of an event are the slots of its class and of its bases in order
+        cls._fields = tuple(
+            field
+            for klass in reversed(cls.__mro__)
+            for field in klass.__dict__.get("__slots__", ())
+        )
+
     # def __repr__(self):
     #     attributes = self._get_attributes()
     #     return f"{type(self).__name__}({attributes})"
@@ -14,8 +27,15 @@ class Event:
         return self._get_attributes()
 
     def _get_attributes(self):
-        return {
-            attr: getattr(self, attr)
-            for attr in self.__dict__
-            if not attr.startswith("__")
-        }
+        return {field: getattr(self, field) for field in self._fields}
+
+    @classmethod
+    def bind(cls, function):
+        """return a callable that passes an event's fields to function as keywords
+
+        e.g. for fields (timestamp, pid) the callable generated is
+            lambda event: function(timestamp=event.timestamp, pid=event.pid)
+        so applying an event builds no intermediate dict (unlike **event.asdict())
+        """
+        arguments = ", ".join(f"{field}=event.{field}" for field in cls._fields)
+        return eval(f"lambda event: function({arguments})", {"function": function})
@@ -1,37 +1,25 @@
 # events/event_handler.py
 
 from .log_line import LogLine, parse_log_line
-import controller.events.handlers.market_handler as market_handler
-import controller.events.handlers.execution_handler as execution_handler
-import controller.events.handlers.payments_handler as payments_handler
-import controller.events.handlers.yagna_handler as yagna_handler
-import controller.events.handlers.driver_handler as driver_handler
-import controller.events.handlers.provider_agent_handler as provider_agent_handler
-import controller.events.handlers.hardware_handler as hardware_handler
-import controller.events.handlers.identity_handler as identity_handler
+from .event_registry import EventRegistry
+
+_event_registry = EventRegistry()
+# whether a raw log line may describe an event (if not it need not be parsed)
+may_describe_event = _event_registry.may_describe
 
 
 def determine_event_type_and_data(log_line: LogLine):
-    # logic to determine event type and associated data
-    event_class = None
-    if log_line.namespace == "yagna":
-        event_class = yagna_handler.identify_event_class(log_line)
-    elif "::driver::" in log_line.namespace:
-        event_class = driver_handler.identify_event_class(log_line)
-        event_class = driver_handler.identify_event_class(log_line)
-    elif log_line.namespace.startswith("ya_provider::provider_agent"):
-        event_class = provider_agent_handler.identify_event_class(log_line)
-    elif log_line.namespace.startswith("ya_provider::hardware"):
-        event_class = hardware_handler.identify_event_class(log_line)
-    elif log_line.namespace.startswith("ya_provider::market"):
-        event_class = market_handler.identify_event_class(log_line)
-    elif log_line.namespace.startswith("ya_provider::execution"):
-        event_class = execution_handler.identify_event_class(log_line)
-    elif log_line.namespace.startswith("ya_provider::payments"):
-        event_class = payments_handler.identify_event_class(log_line)
-    elif log_line.namespace.startswith("ya_identity::service::identity"):
-        event_class = identity_handler.identify_event_class(log_line)
-    else:
-        event_class = None
-    # determine the event type based on the log_line
-    return event_class
+    # logic to determine event type and associated data (see event_registry.py)
+    return _event_registry.identify(log_line)
+
+
+def identify_log_record(log_record: str):
+    # the event a raw (complete) log record describes, or None
+    if not may_describe_event(log_record):
+        # most lines (e.g. market chatter) are never parsed
+        return None
+    log_line = parse_log_line(log_record)
+    if log_line.namespace is None:
+        # later handle non conforming messages
+        return None
+    return determine_event_type_and_data(log_line)
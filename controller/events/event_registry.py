@@ -0,0 +1,179 @@
+# events/event_registry.py
+"""the log messages that are events, as a table
+
+each rule maps a namespace and a message to the event class whose from_log_line
+parses it (against a pattern compiled once, at import). a namespace or message
+matches a rule when it starts with the rule's text, or contains it when the
+text is written with a leading "*". a namespace written with a trailing "$"
+matches only that namespace exactly.
+
+rules are grouped by namespace in table order and a namespace is only checked
+against the messages of the first namespace it matches. which messages apply to
+a namespace is worked out once per distinct namespace and kept in a dict, so a
+line whose namespace has no events costs a single dict lookup.
+
+may_describe() prefilters raw lines before they are parsed: it slices out the
+namespace at the end of the header and looks up (in a dict kept the same way)
+the message prefixes of that namespace's rules, which are compared in place. a
+line it rejects cannot describe an event and is never parsed into a LogLine.
+"""
+
+from .log_line import LogLine
+from .log_events import (
+    YagnaServiceStartedEvent,
+    InitializedPaymentAccountEvent,
+    PaymentAccountsEvent,
+    PaymentNetworkEvent,
+    UsingSubnetEvent,
+    HardwareResourcesCapEvent,
+    NewAgreementEvent,
+    NewTaskEvent,
+    NewExeUnitLogsDirEvent,
+    NewExeUnitPidEvent,
+    ExeUnitTerminatedEvent,
+    ExeUnitExitedEvent,
+    NewCostInformationEvent,
+    FinalCostForActivityEvent,
+    IdentityEvent,
+)
+
+# (namespace, message, event class)
+EVENT_RULES = (
+    ("yagna$", "Starting yagna service!", YagnaServiceStartedEvent),
+    ("*::driver::", "Initialised payment account", InitializedPaymentAccountEvent),
+    ("ya_provider::provider_agent", "Payment accounts: [", PaymentAccountsEvent),
+    ("ya_provider::provider_agent", "Using payment network:", PaymentNetworkEvent),
+    ("ya_provider::provider_agent", "Using subnet:", UsingSubnetEvent),
+    ("ya_provider::hardware", "Hardware resources cap:", HardwareResourcesCapEvent),
+    ("ya_provider::market", "Got agreement", NewAgreementEvent),
+    # ("ya_provider::market", "Creating offer for preset", UsageCoeffsEvent) is
+    # left out until the model can store usage coefficients
+    ("ya_provider::execution", "Creating task", NewTaskEvent),
+    ("ya_provider::execution", "Exeunit log directory", NewExeUnitLogsDirEvent),
+    ("ya_provider::execution", "Exeunit process spawned", NewExeUnitPidEvent),
+    (
+        "ya_provider::execution",
+        "ExeUnit for activity terminated",
+        ExeUnitTerminatedEvent,
+    ),
+    (
+        "ya_provider::execution",
+        "ExeUnit process exited with status",
+        ExeUnitExitedEvent,
+    ),
+    ("ya_provider::payments", "Updating cost for activity", NewCostInformationEvent),
+    ("ya_provider::payments", "Final cost for activity", FinalCostForActivityEvent),
+    ("ya_identity::service::identity", "*identity: ", IdentityEvent),
+)
+
+
+def _matcher(text):
+    # (text, whether text is to be contained rather than a prefix)
+    if text.startswith("*"):
+        return text[1:], True
+    return text, False
+
+
+def _namespace_matcher(text):
+    # (text, whether text is to be contained, whether it is the whole namespace)
+    if text.endswith("$"):
+        return text[:-1], False, True
+    return (*_matcher(text), False)
+
+
+def _matches(value, matcher):
+    text, contained, exact = matcher
+    if exact:
+        return value == text
+    return text in value if contained else value.startswith(text)
+
+
+class EventRegistry:
+    """identify the event a log line describes from a table of rules"""
+
+    k_cache_limit = 10000  # distinct namespaces remembered by may_describe
+
+    def __init__(self, rules=EVENT_RULES):
+        """
+        Args:
+            rules: sequence of (namespace, message, event class), see EVENT_RULES
+        """
+        self.rules = tuple(rules)
+        # namespace matcher -> [(text, contained, event class), ...] in table order
+        self._namespaces = dict()
+        for namespace, message, event_class in self.rules:
+            text, contained = _matcher(message)
+            self._namespaces.setdefault(_namespace_matcher(namespace), []).append(
+                (text, contained, event_class)
+            )
+        # namespace -> message rules (a line without a header has no namespace)
+        self._rulesByNamespace = {None: ()}
+        # namespace -> prefixes the message of an event line may start with
+        self._prefixesByNamespace = dict()
+
+    def message_rules(self, namespace):
+        """return the (text, contained, event class) rules that apply to namespace"""
+        rules = self._rulesByNamespace.get(namespace)
+        if rules is None:
+            rules = ()
+            for namespace_matcher, message_rules in self._namespaces.items():
+                if _matches(namespace, namespace_matcher):
+                    rules = tuple(message_rules)
+                    break
+            self._rulesByNamespace[namespace] = rules
+        return rules
+
+    def message_prefixes(self, namespace):
+        """return the prefixes a message in namespace starts with if it is an event
+
+        the empty prefix (which every message starts with) stands for a rule that
+        is not a prefix, or for a namespace that may not be the complete one
+        """
+        if not namespace or namespace.split() != [namespace]:
+            # not a single token (e.g. the header is separated by tabs)
+            prefixes = ("",)
+        else:
+            prefixes = tuple(
+                "" if contained else text
+                for text, contained, _ in self.message_rules(namespace)
+            )
+        if len(self._prefixesByNamespace) > self.k_cache_limit:
+            self._prefixesByNamespace.clear()
+        self._prefixesByNamespace[namespace] = prefixes
+        return prefixes
+
+    def may_describe(self, line: str):
+        """return False when the raw log line cannot describe an event
+
+        a line for which this is True still has to be parsed and identified
+        """
+        # [2023-05-28T08:05:05.879-0700 INFO  ya_provider::market] Got agreement ...
+        header_end = line.find("]")
+        if header_end < 0:
+            return False
+        namespace = line[line.rfind(" ", 0, header_end) + 1 : header_end]
+        prefixes = self._prefixesByNamespace.get(namespace)
+        if prefixes is None:
+            prefixes = self.message_prefixes(namespace)
+        if not prefixes:
+            return False
+        if line.startswith(prefixes, header_end + 2):
+            return True
+        # unless the message does not start right after "] " (see parse_log_line)
+        return (
+            line[header_end + 1 : header_end + 2] != " "
+            or line[header_end + 2 : header_end + 3].isspace()
+        )
+
+    def identify(self, log_line: LogLine):
+        """return the event log_line describes, or None"""
+        rules = self._rulesByNamespace.get(log_line.namespace)
+        if rules is None:
+            rules = self.message_rules(log_line.namespace)
+        if not rules:
+            return None
+        message = log_line.message
+        for text, contained, event_class in rules:
+            if text in message if contained else message.startswith(text):
+                return event_class.from_log_line(log_line)
+        return None
@@ -6,8 +6,19 @@ from ..event import Event
 import re
 from pathlib import Path
 
+_PATTERN = re.compile(
+    r"ExeUnit process exited with status (?P<exit_status_str>\w+) - exit status: (?P<exit_status_code>\d+), agreement \[(?P<agreement_hash>[\w]+)\], activity \[(?P<activity_hash>[\w]+)\]."
+)
+
 
 class ExeUnitExitedEvent(Event):
+    __slots__ = (
+        "exit_status_str",
+        "exit_status_code",
+        "agreement_hash",
+        "activity_hash",
+    )
+
     def __init__(
         self,
         timestamp,
@@ -27,9 +38,8 @@ class ExeUnitExitedEvent(Event):
         """
         [2023-05-29T08:11:51.880-0700 INFO  ya_provider::execution::task_runner] ExeUnit process exited with status Finished - exit status: 0, agreement [db5506e88ff312070eca87147d445dc0ce6084723c3f41158e1f7b9e72ece679], activity [94ffdb99fcd4467ea489218a8ce3cb2a].
         """
-        pattern = r"ExeUnit process exited with status (?P<exit_status_str>\w+) - exit status: (?P<exit_status_code>\d+), agreement \[(?P<agreement_hash>[\w]+)\], activity \[(?P<activity_hash>[\w]+)\]."
 
-        match = re.search(pattern, log_line.message)
+        match = _PATTERN.search(log_line.message)
         if not match:
             return None
 
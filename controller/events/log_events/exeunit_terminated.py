@@ -5,8 +5,12 @@ from ..event import Event
 
 import re
 
+_PATTERN = re.compile(r"ExeUnit for activity terminated: \[(?P<activity_hash>[\w]+)\].")
+
 
 class ExeUnitTerminatedEvent(Event):
+    __slots__ = ("activity_hash",)
+
     def __init__(self, timestamp, activity_hash):
         super().__init__(timestamp)
         self.activity_hash = activity_hash
@@ -17,9 +21,7 @@ class ExeUnitTerminatedEvent(Event):
         [2023-05-29T08:11:51.880-0700 INFO  ya_provider::execution::task_runner] ExeUnit for activity terminated: [94ffdb99fcd4467ea489218a8ce3cb2a].
         """
 
-        pattern = r"ExeUnit for activity terminated: \[(?P<activity_hash>[\w]+)\]."
-
-        match = re.search(pattern, log_line.message)
+        match = _PATTERN.search(log_line.message)
 
         if not match:
             return None
@@ -5,8 +5,14 @@ from ..event import Event
 
 import re
 
+_PATTERN = re.compile(
+    r"Final cost for activity \[(?P<activity_hash>\w+)\]: (?P<final_cost>\d+\.\d+)"
+)
+
 
 class FinalCostForActivityEvent(Event):
+    __slots__ = ("activity_hash", "final_cost")
+
     def __init__(self, timestamp, activity_hash, final_cost):
         super().__init__(timestamp)
         self.activity_hash = activity_hash
@@ -18,8 +24,7 @@ class FinalCostForActivityEvent(Event):
         [2023-05-29T05:03:34.338-0700 INFO  ya_provider::payments::payments] Final cost for activity [404ab06b846645c7ab1141be39bb4182]: 0.000019506929073611.
         """
 
-        pattern = r"Final cost for activity \[(?P<activity_hash>\w+)\]: (?P<final_cost>\d+\.\d+)"
-        match = re.search(pattern, log_line.message)
+        match = _PATTERN.search(log_line.message)
 
         if not match:
             return None
@@ -3,8 +3,14 @@ from ..event import Event
 
 import re
 
+_PATTERN = re.compile(
+    r"cpu_threads:\s(?P<cpu_threads>\d+),\s+mem_gib:\s(?P<mem_gib>[\d.]+),\s+storage_gib:\s(?P<storage_gib>[\d.]+)"
+)
+
 
 class HardwareResourcesCapEvent(Event):
+    __slots__ = ("cpu_threads", "mem_gib", "storage_gib")
+
     def __init__(self, timestamp, cpu_threads, mem_gib, storage_gib):
         super().__init__(timestamp)
         self.cpu_threads = cpu_threads
@@ -16,9 +22,8 @@ class HardwareResourcesCapEvent(Event):
         """
         [2023-06-25T00:04:38.322-0700 INFO  ya_provider::hardware] Hardware resources cap: Resources { cpu_threads: 31, mem_gib: 42.753664404153824, storage_gib: 336.6809295654297 }
         """
-        pattern = r"cpu_threads:\s(?P<cpu_threads>\d+),\s+mem_gib:\s(?P<mem_gib>[\d.]+),\s+storage_gib:\s(?P<storage_gib>[\d.]+)"
 
-        match = re.search(pattern, log_line.message)
+        match = _PATTERN.search(log_line.message)
 
         if not match:
             print("no match")
@@ -3,8 +3,14 @@ from ..event import Event
 
 import re
 
+_PATTERN = re.compile(
+    r"mode=(?P<mode>[^,]+), address=(?P<address>[^,]+), driver=(?P<driver>[^,]+), network=(?P<network>[^,]+), token=(?P<token>[^\s]+)"
+)
+
 
 class InitializedPaymentAccountEvent(Event):
+    __slots__ = ("mode", "address", "driver", "network", "token")
+
     def __init__(self, timestamp, mode, address, driver, network, token):
         super().__init__(timestamp)
         self.mode = mode
@@ -18,11 +24,8 @@ class InitializedPaymentAccountEvent(Event):
         """
         [2023-06-24T21:27:50.616-0700 INFO  ya_erc20_driver::driver::cli] Initialised payment account. mode=RECV, address=0x742a42f763b551a91994d64958e4475a739da2b4, driver=erc20, network=goerli, token=tGLM
         """
-        # Define the regex pattern with named groups
-        pattern = r"mode=(?P<mode>[^,]+), address=(?P<address>[^,]+), driver=(?P<driver>[^,]+), network=(?P<network>[^,]+), token=(?P<token>[^\s]+)"
-
         # Perform the regex search
-        match = re.search(pattern, log_line.message)
+        match = _PATTERN.search(log_line.message)
 
         if not match:
             return None
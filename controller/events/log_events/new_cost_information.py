@@ -7,8 +7,14 @@ from ..event import Event
 import re
 from pathlib import Path
 
+_PATTERN = re.compile(
+    r"Updating cost for activity \[(?P<activity>[\w]+)\]: (?P<cost>[\d.]+), usage \[(?P<usage>[\d., ]+)\]."
+)
+
 
 class NewCostInformationEvent(Event):
+    __slots__ = ("activity_hash", "cost", "usage_vector")
+
     def __init__(self, timestamp, activity_hash, cost, usage_vector):
         super().__init__(timestamp)
         self.activity_hash = activity_hash
@@ -21,9 +27,7 @@ class NewCostInformationEvent(Event):
         [2023-05-29T07:48:27.999-0700 INFO  ya_provider::payments::payments] Updating cost for activity [94ffdb99fcd4467ea489218a8ce3cb2a]: 0.000177839206922222, usage [2.008308, 118.002688984].
         """
 
-        pattern = r"Updating cost for activity \[(?P<activity>[\w]+)\]: (?P<cost>[\d.]+), usage \[(?P<usage>[\d., ]+)\]."
-
-        match = re.search(pattern, log_line.message)
+        match = _PATTERN.search(log_line.message)
 
         if not match:
             return None
@@ -6,8 +6,12 @@ from ..event import Event
 import re
 from pathlib import Path
 
+_PATTERN = re.compile(r"pid: (?P<pid>\d+)")
+
 
 class NewExeUnitPidEvent(Event):
+    __slots__ = ("pid",)
+
     def __init__(self, timestamp, pid):
         super().__init__(timestamp)
         self.pid = pid
@@ -18,8 +22,7 @@ class NewExeUnitPidEvent(Event):
         [2023-05-29T01:21:06.646-0700 INFO  ya_provider::execution::exeunit_instance] Exeunit process spawned, pid: 486619
         """
 
-        pattern = r"pid: (?P<pid>\d+)"
-        match = re.search(pattern, log_line.message)
+        match = _PATTERN.search(log_line.message)
 
         if not match:
             return None
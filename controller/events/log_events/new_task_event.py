@@ -7,8 +7,27 @@ from ..event import Event
 import re
 from pathlib import Path
 
+_PATTERN = re.compile(
+    r"""
+    \[ (?P<agreement_hash> [\w]+) \] \s? , \s?
+    activity \s? \[ (?P<activity_hash> [\w]+) \] \s?
+    in \s directory: \s \[ (?P<directory> [^\]]+) \]
+    """,
+    re.X,
+)
+
 
 class NewTaskEvent(Event):
+    __slots__ = (
+        "agreement_hash",
+        "activity_hash",
+        "path_to_work_dir",
+        "path_to_agreement_dir",
+        "path_to_agreement_json_file",
+        "path_to_activity_dir",
+        "path_to_deployment_json_file",
+    )
+
     def __init__(
         self,
         timestamp,
@@ -36,16 +55,7 @@ class NewTaskEvent(Event):
         [2023-05-29T01:21:06.645-0700 INFO  ya_provider::execution::task_runner] Creating task: agreement [a20c1e8861638bfd9120ba3088b270b6f2b33aae0fd6ad479ba6e81a0fbe9f00], activity [225e48e33e2a4c429af6c836f1a29a8e] in directory: [/home/golem/.local/share/ya-provider/exe-unit/work/a20c1e8861638bfd9120ba3088b270b6f2b33aae0fd6ad479ba6e81a0fbe9f00/225e48e33e2a4c429af6c836f1a29a8e].
         """
 
-        pattern = re.compile(
-            r"""
-            \[ (?P<agreement_hash> [\w]+) \] \s? , \s?
-            activity \s? \[ (?P<activity_hash> [\w]+) \] \s?
-            in \s directory: \s \[ (?P<directory> [^\]]+) \]
-            """,
-            re.X,
-        )
-
-        match = pattern.search(log_line.message)
+        match = _PATTERN.search(log_line.message)
 
         if not match:
             return None
@@ -3,8 +3,14 @@ from ..event import Event
 
 import re
 
+_PATTERN = re.compile(
+    r"address:\s(?P<address>.*?),\s+network:\s(?P<network>.*?),\s+platform:\s\"(?P<platform>.*?)\""
+)
+
 
 class PaymentAccountsEvent(Event):
+    __slots__ = ("accounts",)
+
     def __init__(self, timestamp, accounts):
         super().__init__(timestamp)
         self.accounts = accounts
@@ -36,11 +42,8 @@ class PaymentAccountsEvent(Event):
         ]
         """
 
-        # Define the regular expression pattern
-        pattern = r"address:\s(?P<address>.*?),\s+network:\s(?P<network>.*?),\s+platform:\s\"(?P<platform>.*?)\""
-
         # Find all matches in the string using the regular expression pattern
-        matches = re.findall(pattern, log_line.message)
+        matches = _PATTERN.findall(log_line.message)
 
         if not matches:
             return None
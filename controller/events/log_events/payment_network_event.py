@@ -3,18 +3,22 @@ from ..event import Event
 
 import re
 
+# escape codes
+_ESCAPE_PATTERN = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+# the value after the last colon
+_PATTERN = re.compile(r":\s([^:]+)$")
 
-def strip_escape_codes(string):
-    # Define the regex pattern for escape codes
-    escape_pattern = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
 
+def strip_escape_codes(string):
     # Remove escape codes from the string
-    stripped_string = re.sub(escape_pattern, "", string)
+    stripped_string = _ESCAPE_PATTERN.sub("", string)
 
     return stripped_string
 
 
 class PaymentNetworkEvent(Event):
+    __slots__ = ("payment_network",)
+
     def __init__(self, timestamp, payment_network):
         super().__init__(timestamp)
         self.payment_network = payment_network
@@ -30,7 +34,7 @@ class PaymentNetworkEvent(Event):
         stripped_string = strip_escape_codes(log_line.message)
 
         # Extract the payment network value
-        match = re.search(r":\s([^:]+)$", stripped_string)
+        match = _PATTERN.search(stripped_string)
         if not match:
             return None
 
@@ -5,11 +5,15 @@ import re
 import json
 from collections import namedtuple
 
+_PATTERN = re.compile(r"Usage coeffs:\s+(\{.*?\})")
+
 # Define the named tuple class
 UsageCoeffs = namedtuple("UsageCoeffs", ["cpu_sec", "duration_sec"])
 
 
 class UsageCoeffsEvent(Event):
+    __slots__ = ("usage_coeffs",)
+
     def __init__(self, timestamp, usage_coeffs: UsageCoeffs):
         super().__init__(timestamp)
         self.usage_coeffs = usage_coeffs
@@ -20,8 +24,7 @@ class UsageCoeffsEvent(Event):
         [2023-06-25T00:04:38.326-0700 INFO  ya_provider::market::provider_market] Creating offer for preset [vm] and ExeUnit [vm]. Usage coeffs: {"golem.usage.cpu_sec": 6.944444444444445e-6, "golem.usage.duration_sec": 1.388888888888889e-6}
         """
 
-        pattern = r"Usage coeffs:\s+(\{.*?\})"
-        match = re.search(pattern, string)
+        match = _PATTERN.search(string)
 
         if not match:
             return None
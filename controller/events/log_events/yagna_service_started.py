@@ -4,8 +4,14 @@ from ..event import Event
 
 import re
 
+_PATTERN = re.compile(
+    r"Version: (?P<version>[\d.]+) \((?P<commit>\w+) (?P<build_date>\d{4}-\d{2}-\d{2}) build #(?P<build_number>\d+)\)"
+)
+
 
 class YagnaServiceStartedEvent(Event):
+    __slots__ = ("version", "commit", "build_date", "build_number")
+
     def __init__(self, timestamp, version, commit, build_date, build_number):
         super().__init__(timestamp)
         self.version = version
@@ -19,9 +25,8 @@ class YagnaServiceStartedEvent(Event):
         [2023-06-24T21:27:18.207-0700 INFO  yagna] Starting yagna service! Version: 0.12.2 (8efd8657 2023-06-06 build #296).
         """
         # pattern = r"Starting yagna service! Version: (?P<version>[\d.]+) \((?P<commit>\w+) (?P<build_date>\d{4}-\d{2}-\d{2}) build #(?P<build_number>\d+)\)"
-        pattern = r"Version: (?P<version>[\d.]+) \((?P<commit>\w+) (?P<build_date>\d{4}-\d{2}-\d{2}) build #(?P<build_number>\d+)\)"
 
-        match = re.search(pattern, log_line.message)
+        match = _PATTERN.search(log_line.message)
 
         if not match:
             print(log_line.message)
@@ -1,33 +1,94 @@
 # events/log_line.py
-from dataclasses import dataclass
+import sys
+
+_intern = sys.intern
+_UNREAD = object()  # a field not yet sliced from the line
 
 
 # [2023-05-28T08:05:05.879-0700 INFO  ya_provider::market::provider_market] Got agreement [c6b01ea71e758504139bfe40983618c457d1c76fb6d824d93651c9642293e2bd] from Requestor [0x33a6973df17ceae741b26f4372ee101cc81e82dd] for subscription [vm].
-@dataclass
 class LogLine:
-    raw_contents: str
-    timestamp: str
-    loglevel: str
-    namespace: str
-    message: str
+    """a log line, split into its fields when they are first read
+
+    the header is split on the first access to any field. loglevel and namespace
+    are interned, so the lines of a namespace share one string, while timestamp
+    and message are sliced from the line (at offsets kept) when read. a line
+    without a "[<timestamp> <loglevel> <namespace>]" header has None for these.
+    """
+
+    __slots__ = (
+        "raw_contents",
+        "_message_start",  # negative until the header is split
+        "_header_end",
+        "_timestamp",
+        "_loglevel",
+        "_namespace",
+        "_message",
+    )
+
+    def __init__(self, raw_contents: str):
+        self.raw_contents = raw_contents
+        self._message_start = -1
+        self._timestamp = _UNREAD
+        self._message = _UNREAD
+
+    def __repr__(self):
+        return (
+            f"LogLine(timestamp={self.timestamp!r}, loglevel={self.loglevel!r}, "
+            f"namespace={self.namespace!r}, message={self.message!r})"
+        )
+
+    def _split_header(self):
+        log_line = self.raw_contents
+        close_bracket_index = log_line.find("]")
+        if close_bracket_index < 0:
+            fields = ()
+        else:
+            fields = log_line[1:close_bracket_index].split()
+        if len(fields) != 3:
+            self._timestamp = None
+            self._loglevel = None
+            self._namespace = None
+            self._message_start = close_bracket_index + 1
+            return
+        _, loglevel, namespace = fields
+        self._loglevel = _intern(loglevel)
+        self._namespace = _intern(namespace)
+        self._header_end = close_bracket_index
+        self._message_start = log_line.find("] ", close_bracket_index) + 1
+
+    @property
+    def timestamp(self):
+        timestamp = self._timestamp
+        if timestamp is _UNREAD:
+            if self._message_start < 0:
+                self._split_header()
+                return self.timestamp
+            header = self.raw_contents[1 : self._header_end]
+            timestamp = self._timestamp = header.split(None, 1)[0]
+        return timestamp
+
+    @property
+    def loglevel(self):
+        if self._message_start < 0:
+            self._split_header()
+        return self._loglevel
+
+    @property
+    def namespace(self):
+        if self._message_start < 0:
+            self._split_header()
+        return self._namespace
+
+    @property
+    def message(self):
+        message = self._message
+        if message is _UNREAD:
+            if self._message_start < 0:
+                self._split_header()
+            message = self._message = self.raw_contents[self._message_start :].strip()
+        return message
 
 
 def parse_log_line(log_line: str) -> LogLine:
-    try:
-        close_bracket_index = log_line.index("]")
-        header = log_line[0:close_bracket_index]
-        timestamp, loglevel, namespace = header[1:].split()
-        timestamp = timestamp.strip()
-        loglevel = loglevel.strip()
-        namespace = namespace.strip()
-
-        message_start_index = log_line.find("] ", close_bracket_index) + 1
-        message = log_line[message_start_index:].strip()
-
-    except ValueError:
-        timestamp = None
-        loglevel = None
-        namespace = None
-        message = log_line[log_line.find("]") + 1 :].strip()
-
-    return LogLine(log_line, timestamp, loglevel, namespace, message)
+    # the header is split and the fields sliced only when they are read
+    return LogLine(log_line)
@@ -0,0 +1,106 @@
+# ./controller
+# multi line log messages
+"""join the lines of a multi line log message into one record
+
+golemsp pretty prints some values over several lines, e.g.
+
+[2023-06-25T00:04:36.872-0700 INFO  ya_provider::provider_agent] Payment accounts: [
+    AccountView {
+        address: 0x742a42f763b551a91994d64958e4475a739da2b4,
+        network: Mumbai,
+        platform: "erc20-mumbai-tglm",
+    },
+]
+
+MultiLineAssembler is fed lines as they are read and passes on complete records:
+a line not ending with "[" as it is, and a line that does together with the lines
+after it up to the one closing its bracket. the lines of a record are buffered
+and it is never waited on: a record is also passed on incomplete when a line with
+a timestamped header arrives (which starts the next record) or, on
+flush_expired(), once it has been open for timeout seconds.
+"""
+
+import re
+import time
+
+# [2023-05-28T08:05:05.879-0700 INFO  ...
+_HEADER_PATTERN = re.compile(r"\[\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
+_OPENING_ENDS = ("[", "[\n", "[\r\n")
+
+
+class MultiLineAssembler:
+    """state machine joining the lines of multi line log messages into records"""
+
+    k_default_timeout = 0.5  # seconds
+    k_max_record_lines = 10000  # beyond this a record is passed on regardless
+
+    def __init__(self, on_record, timeout=k_default_timeout):
+        """
+        Args:
+            on_record: called with each complete record (a line, or the lines of a
+                multi line message joined as they were read)
+            timeout: seconds after which flush_expired() passes on an open record
+        """
+        self.on_record = on_record
+        self.timeout = timeout
+        self._lines = None  # the lines of the open record
+        self._depth = 0  # brackets the open record has yet to close
+        self._openTime = None
+
+    @property
+    def pending_line_count(self):
+        """how many lines the open record (if any) has buffered"""
+        return 0 if self._lines is None else len(self._lines)
+
+    def add_line(self, line):
+        """pass on the records line completes"""
+        if self._lines is not None:
+            if _HEADER_PATTERN.match(line) is None:
+                self._continue(line)
+                return
+            # the next log message began before the open one was closed
+            self.flush()
+        if line.endswith(_OPENING_ENDS):
+            self._lines = [line]
+            self._depth = 1
+            self._openTime = time.monotonic()
+        else:
+            self.on_record(line)
+
+    def add_lines(self, lines):
+        """pass on the records lines complete"""
+        on_record = self.on_record
+        for line in lines:
+            if self._lines is None and not line.endswith(_OPENING_ENDS):
+                on_record(line)
+            else:
+                self.add_line(line)
+
+    def _continue(self, line):
+        self._lines.append(line)
+        stripped = line.strip()
+        if stripped.startswith("]"):
+            self._depth -= 1
+        if stripped.endswith("["):
+            self._depth += 1
+        if self._depth <= 0 or len(self._lines) >= self.k_max_record_lines:
+            self.flush()
+
+    def flush_expired(self, now=None):
+        """pass on the open record if it has been open for timeout seconds"""
+        if self._lines is None:
+            return
+        if now is None:
+            now = time.monotonic()
+        if now - self._openTime >= self.timeout:
+            self.flush()
+
+    def flush(self):
+        """pass on the open record, complete or not"""
+        lines = self._lines
+        if lines is None:
+            return
+        self._lines = None
+        self._depth = 0
+        self._openTime = None
+        self.on_record(lines[0] if len(lines) == 1 else "".join(lines))
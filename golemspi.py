@@ -10,57 +10,223 @@
 # them as defined events
 # these events trigger signals to the model (and view)
 
+# usage
+#   golemspi.py run [--archive PATH] [golemsp run arguments...]
+#       launch and supervise golemsp run, reading its output directly
+#   golemspi.py [--checkpoint PATH] <logfile>
+#       tail a log file that golemsp output is being written to, following
+#       rotation and, with --checkpoint, resuming where the last run stopped
+#   golemsp run 2>&1 | golemspi.py -
+#       read golemsp output piped to stdin (the display reads keys from /dev/tty)
+#   golemspi.py listen [--socket PATH]
+#       serve a unix socket that any number of providers stream their output to
+#       e.g. (echo "#source node1"; golemsp run 2>&1) | nc -U /tmp/golemspi.sock
+#   golemspi.py --exeunit-logs <logfile>
+#       tail the log merged with the logs of each exe unit as it starts
+#   golemspi.py --replay SPEED <logfile>
+#       replay a recorded log at SPEED times its original pace (or "max")
+#   golemspi.py --history-db PATH ...
+#       keep the model's history in a database file and continue it on the next start
+
+import os
 import sys
+import sqlite3
+import argparse
 
 # from pathlib import Path
 
 from controller import Controller
 from view import View
-from processqueue import FileQueue
+from processqueue import (
+    FileQueue,
+    MergedLogQueue,
+    ProcessQueue,
+    ReplayQueue,
+    StdinQueue,
+)
+from processqueue.processqueue import ProcessTerminated
 
 # from utils.colors import Colors
 from model import Model
+from model.database import create_connection
 
 from utils.mylogger import file_logger
 import signal
 
+k_supervise_mode = "run"
+k_stdin_mode = "-"
+k_listen_mode = "listen"
+k_default_socket_path = "/tmp/golemspi.sock"
+k_default_metric_retention_days = 30
+
+
+def parse_arguments(argv):
+    # options golemspi does not know are passed through to golemsp run
+    parser = argparse.ArgumentParser(
+        prog="golemspi",
+        description="overlay for summary of live golem provider console output",
+        epilog="any further arguments in run mode are passed on to golemsp run",
+        allow_abbrev=False,  # never claim a golemsp option by its prefix
+    )
+    parser.add_argument(
+        "source",
+        help=f"'{k_supervise_mode}' to launch and supervise golemsp run,"
+        f" '{k_stdin_mode}' to read golemsp output piped to stdin,"
+        f" '{k_listen_mode}' to serve a unix socket for many providers,"
+        " otherwise the path of a golemsp log file to tail",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="PATH",
+        help="in run mode, also append golemsp's output to PATH in the background",
+    )
+    parser.add_argument(
+        "--socket",
+        default=k_default_socket_path,
+        metavar="PATH",
+        help=f"in listen mode, the unix socket to create (default: {k_default_socket_path})",
+    )
+    parser.add_argument(
+        "--golemsp",
+        default="golemsp",
+        metavar="EXECUTABLE",
+        help="golemsp executable to run (default: golemsp on the PATH)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help="when tailing a log file, record in PATH how far it was processed"
+        " and resume from there on the next start",
+    )
+    parser.add_argument(
+        "--exeunit-logs",
+        action="store_true",
+        help="when tailing a log file, merge in the logs of each exe unit (by"
+        " timestamp, each line tagged with its source)",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="SPEED",
+        help="replay the log file at SPEED times the pace of its timestamps"
+        " (e.g. 1, 10 or max) instead of tailing it",
+    )
+    parser.add_argument(
+        "--history-db",
+        metavar="PATH",
+        help="keep the agreements, activities, costs and exits in the database PATH"
+        " and continue that history on the next start; a log file tailed is"
+        " checkpointed (by default in PATH.checkpoint) so it is not parsed twice",
+    )
+    parser.add_argument(
+        "--metric-retention",
+        type=float,
+        default=k_default_metric_retention_days,
+        metavar="DAYS",
+        help="with --history-db, roll up the cost updates of an activity older than"
+        f" DAYS into its latest one (default: {k_default_metric_retention_days})",
+    )
+    return parser.parse_known_args(argv)
+
+
+def create_log_queue(arguments, golemsp_arguments):
+    if arguments.source == k_supervise_mode:
+        return ProcessQueue(
+            [arguments.golemsp, "run", *golemsp_arguments],
+            archive_path=arguments.archive,
+            strip_ansi=True,
+        )
+    if golemsp_arguments:
+        raise SystemExit(
+            f"unrecognized arguments: {' '.join(golemsp_arguments)}"
+            f" (only '{k_supervise_mode}' mode passes arguments to golemsp)"
+        )
+    if arguments.source == k_listen_mode:
+        if os.name != "posix":
+            raise SystemExit("listen mode requires unix sockets")
+        from processqueue import UnixSocketQueue
+
+        try:
+            return UnixSocketQueue(arguments.socket, strip_ansi=True)
+        except FileExistsError as e:
+            raise SystemExit(str(e))
+    if arguments.source == k_stdin_mode:
+        try:
+            return StdinQueue(reattach_tty=True, strip_ansi=True)
+        except OSError as e:
+            raise SystemExit(f"cannot read piped input without a terminal: {e}")
+    if arguments.replay is not None:
+        try:
+            return ReplayQueue(arguments.source, speed=arguments.replay)
+        except ValueError:
+            raise SystemExit(f"invalid replay speed: {arguments.replay}")
+        except FileNotFoundError:
+            raise SystemExit(f"no such log file: {arguments.source}")
+    if arguments.exeunit_logs:
+        return MergedLogQueue(arguments.source)
+    checkpoint_path = arguments.checkpoint
+    if checkpoint_path is None and arguments.history_db is not None:
+        # the history holds what was parsed up to the checkpoint
+        checkpoint_path = f"{arguments.history_db}.checkpoint"
+    return FileQueue(arguments.source, checkpoint_path=checkpoint_path)
+
+
+def create_model(arguments):
+    if arguments.history_db is None:
+        return Model()
+    try:
+        connection = create_connection(arguments.history_db)
+    except sqlite3.DatabaseError as e:
+        raise SystemExit(f"cannot open history database {arguments.history_db}: {e}")
+    return Model(
+        connection=connection, metric_retention=arguments.metric_retention * 86400
+    )
+
+
+def shutdown_golemsp():
+    # forward the interrupt to a supervised golemsp as the shell script's cleanup did
+    if isinstance(log_queue, ProcessQueue):
+        print("waiting for golemsp to shut down...", flush=True)
+        log_queue.terminate()
+
 
 def handle_keyboard_interrupt(signal, _):
     try:
         view.shutdown()
     except:
         pass
+    shutdown_golemsp()
     sys.exit(signal)
 
 
+arguments, golemsp_arguments = parse_arguments(sys.argv[1:])
+model = create_model(arguments)
+log_queue = create_log_queue(arguments, golemsp_arguments)
+
 # Register the signal handler for Ctrl+C
 signal.signal(signal.SIGINT, handle_keyboard_interrupt)
 
 file_logger.debug("logging started")
 
-if len(sys.argv) == 2:
-    cmdline_argument = sys.argv[1]
-    str_path_to_log_file = cmdline_argument
-    log_queue = FileQueue(str_path_to_log_file)
-else:
-    raise Exception(
-        "golemspi currently does not support piping, please use the included shell script,"
-        " which creates an temporary log file that golemspi will parse"
-    )
-
 try:
     view = View()
-    model = Model()
     controller = Controller(model=model, view=view, log_queue=log_queue)
     # Colors.print_color(f"Reading {str_path_to_log_file}", color=Colors.BLUE_BG)
     # console_logger.debug("hello world")
     controller()
+except ProcessTerminated:
+    try:
+        view.shutdown()
+    except:
+        pass
+    print("golemsp has exited")
 except Exception as e:
     try:
         view.shutdown()  # Assuming that view.shutdown() calls endwin()
     except:
         pass
     file_logger.exception("An exception occurred: %s", e)
+    shutdown_golemsp()
 except:  # Catch everything else
     file_logger.error(f"Unexpected error: {sys.exc_info()[0]}")
     file_logger.error("Traceback: ", exc_info=True)
+    shutdown_golemsp()
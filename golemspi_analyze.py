@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# golemspi headless analyzer
+
+# summary
+# runs archived golemsp logs through the same pipeline as golemspi
+# (parse_log_line -> determine_event_type_and_data -> Model) without the
+# curses view, sleeps or polling, then prints a summary of the history:
+# agreements, activities, exit codes, final costs and earnings per requestor
+
+# usage
+#   golemspi_analyze.py [--json] [--since TIME] [--until TIME] LOGFILE [LOGFILE ...]
+#       with --since or --until only the records logged in that time range are
+#       read, seeking to it through a sparse index cached beside each log
+#   golemspi_analyze.py --jobs N LOGFILE
+#       parses each (uncompressed) log in N worker processes, in chunks split
+#       where a log message begins, and applies the events found in log order
+# logs compressed with gzip, xz or bzip2 are decompressed as they are read
+
+import argparse
+import collections
+from datetime import datetime
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from controller import Controller, MultiLineAssembler
+from controller.events import identify_log_record
+from model import Model
+from processqueue import MappedLogReader
+from processqueue.decompress import (
+    detect_compression,
+    iter_blocks_in_thread,
+    iter_lines,
+    open_binary,
+)
+from processqueue.logtimestamp import LogTimestampReader
+
+from utils.mylogger import file_logger
+
+_READ_BUFFER_SIZE = 1 << 20
+_ANSI_ESCAPE_PATTERN = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+# a line beginning a log message: [2023-05-28T08:05:05.879-0700 INFO  ...
+_RECORD_START_PATTERN = re.compile(rb"\n\[\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
+_MAX_CHUNK_SIZE = 16 << 20
+_MIN_CHUNK_SIZE = 1 << 20
+
+
+def iter_records(lines):
+    # yield log records, joining the lines of a multi line log message (see
+    # controller.MultiLineAssembler)
+    records = []
+    assembler = MultiLineAssembler(records.append)
+    add_line = assembler.add_line
+    for line in lines:
+        line = line.rstrip("\n")
+        if "\x1b" in line:
+            line = _ANSI_ESCAPE_PATTERN.sub("", line)
+        add_line(line)
+        if records:
+            yield from records
+            records.clear()
+    assembler.flush()
+    yield from records
+
+
+def iter_lines_in_time_range(lines, since=None, until=None):
+    # yield the lines logged between since and until (datetimes) inclusive, with a
+    # line without a timestamp going where the line before it went
+    timestamp_of = LogTimestampReader()
+    since = since.timestamp() if since is not None else None
+    until = until.timestamp() if until is not None else None
+    in_range = since is None
+    for line in lines:
+        timestamp = timestamp_of(line)
+        if timestamp is not None:
+            if until is not None and timestamp > until:
+                break
+            in_range = since is None or timestamp >= since
+        if in_range:
+            yield line
+
+
+def split_into_chunks(path, chunk_count_hint):
+    """return (start, end) byte ranges covering the log, each starting where a log
+    message does (so no multi line message is split between two of them)"""
+    size = os.path.getsize(path)
+    chunk_size = min(
+        _MAX_CHUNK_SIZE, max(_MIN_CHUNK_SIZE, size // max(1, chunk_count_hint))
+    )
+    boundaries = [0]
+    with open(path, "rb") as binary_file:
+        while boundaries[-1] + chunk_size < size:
+            # a message may begin right at the candidate, after the newline before it
+            block_start = boundaries[-1] + chunk_size - 1
+            boundary = size
+            while True:
+                binary_file.seek(block_start)
+                block = binary_file.read(_READ_BUFFER_SIZE)
+                match = _RECORD_START_PATTERN.search(block)
+                if match is not None:
+                    boundary = block_start + match.start() + 1
+                    break
+                if len(block) < _READ_BUFFER_SIZE:
+                    break
+                # the last bytes again, a match may straddle two reads
+                block_start += len(block) - 32
+            boundaries.append(boundary)
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def identify_events_in_chunk(task):
+    """worker: identify the events in a byte range of a log
+
+    Returns:
+        (record count, [(event class, field values) or (None, (error name, message))
+        for each record describing an event or failing to be identified, in order])
+    """
+    path, start, end = task
+    with open(path, "rb") as binary_file:
+        binary_file.seek(start)
+        data = binary_file.read(end - start)
+    # as the log would be read in text mode (universal newlines)
+    lines = io.StringIO(data.decode("utf-8", errors="replace"), newline=None)
+    record_count = 0
+    results = []
+    for record in iter_records(lines):
+        record_count += 1
+        try:
+            log_event = identify_log_record(record)
+        except Exception as e:
+            results.append((None, (type(e).__name__, f"{e} for {record}")))
+            continue
+        if log_event is not None:
+            results.append(
+                (
+                    type(log_event),
+                    tuple(getattr(log_event, field) for field in log_event._fields),
+                )
+            )
+    return record_count, results
+
+
+class Analyzer:
+    """apply log files to a fresh model and summarize the result"""
+
+    def __init__(self):
+        self.model = Model()
+        self.controller = Controller(model=self.model, view=None, log_queue=None)
+        self.line_count = 0
+        self.errors = collections.Counter()  # exception name -> occurrences
+
+    def analyze_file(self, path, since=None, until=None, jobs=1):
+        if detect_compression(path) is not None:
+            # decompressed in a worker thread and split into lines block by block
+            with open_binary(path) as binary_file:
+                lines = iter_lines(iter_blocks_in_thread(binary_file))
+                if since is not None or until is not None:
+                    lines = iter_lines_in_time_range(lines, since, until)
+                self.analyze_records(iter_records(lines))
+            return
+        if since is not None or until is not None:
+            with MappedLogReader(path) as reader:
+                self.analyze_records(iter_records(reader.lines(since, until)))
+            return
+        if jobs > 1:
+            self.analyze_file_in_parallel(path, jobs)
+            return
+        with open(
+            path, "r", encoding="utf-8", errors="replace", buffering=_READ_BUFFER_SIZE
+        ) as log_file:
+            self.analyze_records(iter_records(log_file))
+
+    def analyze_records(self, records):
+        handle_log_record = self.controller.handle_log_record
+        with self.model.transaction():
+            for record in records:
+                self.line_count += 1
+                try:
+                    handle_log_record(record)
+                except Exception as e:
+                    # e.g. an activity whose agreement began before the log or
+                    # whose agreement.json no longer exists
+                    self.errors[type(e).__name__] += 1
+                    file_logger.debug(f"{type(e).__name__}: {e} for {record}")
+
+    def analyze_file_in_parallel(self, path, jobs):
+        # parse chunks of the log in worker processes, apply their events in order
+        process_log_event = self.controller.process_log_event
+        tasks = [(path, start, end) for start, end in split_into_chunks(path, jobs * 4)]
+        with multiprocessing.Pool(jobs) as pool, self.model.transaction():
+            for record_count, results in pool.imap(identify_events_in_chunk, tasks):
+                self.line_count += record_count
+                for event_class, values in results:
+                    if event_class is None:
+                        name, message = values
+                        self.errors[name] += 1
+                        file_logger.debug(f"{name}: {message}")
+                        continue
+                    try:
+                        process_log_event(event_class(*values))
+                    except Exception as e:
+                        self.errors[type(e).__name__] += 1
+                        file_logger.debug(f"{type(e).__name__}: {e} for {values}")
+
+    def summary(self):
+        retrievals = self.model.retrievals
+        agreements, activities = retrievals.get_history_counts()
+        final_cost_count, final_cost_total = retrievals.get_final_cost_totals()
+        return {
+            "lines": self.line_count,
+            "agreements": agreements,
+            "activities": activities,
+            "exit_statuses": [
+                {"status": status, "code": code, "count": count}
+                for status, code, count in retrievals.get_exit_status_counts()
+            ],
+            "final_costs": {"count": final_cost_count, "total": str(final_cost_total)},
+            "earnings_by_requestor": [
+                {"requestor": address, "activities": count, "earnings": str(total)}
+                for address, count, total in retrievals.get_earnings_by_requestor()
+            ],
+            # events of an agreement or activity not in the log, and rows of
+            # buffered inserts that failed when written
+            "errors": dict(
+                self.errors
+                + self.controller.skipped_events
+                + self.model.write_buffer.errors
+            ),
+        }
+
+
+def print_summary(summary, out=sys.stdout):
+    print(f"lines:       {summary['lines']}", file=out)
+    print(f"agreements:  {summary['agreements']}", file=out)
+    print(f"activities:  {summary['activities']}", file=out)
+    print("exit statuses:", file=out)
+    for row in summary["exit_statuses"]:
+        print(f"  {row['status']} ({row['code']}): {row['count']}", file=out)
+    final_costs = summary["final_costs"]
+    print(
+        f"final costs: {final_costs['total']} over {final_costs['count']} activities",
+        file=out,
+    )
+    print("earnings by requestor:", file=out)
+    for row in summary["earnings_by_requestor"]:
+        print(
+            f"  {row['requestor']}  {row['earnings']}  ({row['activities']} activities)",
+            file=out,
+        )
+    if summary["errors"]:
+        print("records that could not be applied:", file=out)
+        for name, count in summary["errors"].items():
+            print(f"  {name}: {count}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="golemspi_analyze",
+        description="summarize archived golemsp logs without the interactive display",
+    )
+    parser.add_argument("logfiles", nargs="+", metavar="LOGFILE")
+    parser.add_argument("--json", action="store_true", help="print the summary as json")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        metavar="TIME",
+        help="only records logged at or after TIME (iso format, e.g. 2023-05-29T01:00"
+        " or 2023-05-29T01:00-07:00; local time without an offset)",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        metavar="TIME",
+        help="only records logged at or before TIME (iso format)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="parse each log in N worker processes (0: one per cpu); compressed logs"
+        " and time ranges are read by a single process",
+    )
+    arguments = parser.parse_args(argv)
+    jobs = arguments.jobs if arguments.jobs > 0 else os.cpu_count() or 1
+
+    analyzer = Analyzer()
+    start_time = time.perf_counter()
+    for path in arguments.logfiles:
+        analyzer.analyze_file(path, arguments.since, arguments.until, jobs)
+    elapsed = time.perf_counter() - start_time
+
+    summary = analyzer.summary()
+    if arguments.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        print_summary(summary)
+    print(
+        f"analyzed {analyzer.line_count} records in {elapsed:.2f}s"
+        f" ({analyzer.line_count / max(elapsed, 1e-9):,.0f} records/sec)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,3 @@
 # golemspi's database
 from .model import Model
+from .errors import MissingParentError
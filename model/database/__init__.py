@@ -1,15 +1,27 @@
 import sqlite3
 from .database_types import register_database_types
+from .tables import create_tables
+from .migrations import SCHEMA_VERSION, migrate_schema
 
 register_database_types()
 
 
-# Create an in-memory SQLite database connection
-connection = sqlite3.connect(":memory:")
-connection.isolation_level = None
+def create_connection(path=":memory:"):
+    """open the database at path (by default a new one in memory), creating its
+    tables and bringing its schema up to date
 
-from .tables import create_tables
+    a database in a file keeps the history across restarts. it is opened in WAL
+    mode with synchronous=NORMAL: a commit appends to the write ahead log without
+    waiting for the disk, and only a power loss may undo the last commits.
+    """
+    connection = sqlite3.connect(path)
+    connection.isolation_level = None
+    if path != ":memory:":
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+    create_tables(connection)
+    migrate_schema(connection)
+    return connection
 
-create_tables()
 
-# __all__ = ["connection"]
+# __all__ = ["create_connection"]
@@ -0,0 +1,83 @@
+import sqlite3
+
+# the statements bringing the schema from each version to the next: the tables
+# created by create_tables() are version 0, migration n brings version n - 1 to n.
+# the version a database is at is kept in its user_version.
+MIGRATIONS = [
+    # 1: indexes for the lookups of the mutators and of the view's retrievals
+    [
+        "CREATE UNIQUE INDEX IF NOT EXISTS activity_activity_hash_index"
+        " ON activity (activity_hash)",
+        "CREATE INDEX IF NOT EXISTS task_agreementId_index ON task (agreementId)",
+        "CREATE INDEX IF NOT EXISTS activity_termination_activityId_index"
+        " ON activity_termination (activityId)",
+        "CREATE INDEX IF NOT EXISTS initialized_payment_accounts_network_index"
+        " ON initialized_payment_accounts (network)",
+    ],
+    # 2: indexes for rolling up the activity metrics past the retention period
+    [
+        "CREATE INDEX IF NOT EXISTS activity_metric_timestamp_index"
+        " ON activity_metric (timestamp)",
+        "CREATE INDEX IF NOT EXISTS activity_metric_activityId_index"
+        " ON activity_metric (activityId)",
+    ],
+    # 3: one row per activity (per timestamp for its metrics), so lines parsed
+    # again (e.g. a log replayed into the history) are not recorded twice. the
+    # duplicates a history already holds are removed, keeping the first.
+    [
+        "DELETE FROM activity_logs_directory WHERE logsdirId NOT IN"
+        " (SELECT MIN(logsdirId) FROM activity_logs_directory"
+        " GROUP BY activityId)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS activity_logs_directory_activityId_index"
+        " ON activity_logs_directory (activityId)",
+        "DELETE FROM activity_pid WHERE activityPidId NOT IN"
+        " (SELECT MIN(activityPidId) FROM activity_pid GROUP BY activityId)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS activity_pid_activityId_index"
+        " ON activity_pid (activityId)",
+        "DELETE FROM activity_metric WHERE metric_id NOT IN"
+        " (SELECT MIN(metric_id) FROM activity_metric GROUP BY activityId, timestamp)",
+        "DROP INDEX IF EXISTS activity_metric_activityId_index",
+        "CREATE UNIQUE INDEX IF NOT EXISTS activity_metric_activityId_timestamp_index"
+        " ON activity_metric (activityId, timestamp)",
+        "DELETE FROM activity_termination WHERE terminationId NOT IN"
+        " (SELECT MIN(terminationId) FROM activity_termination GROUP BY activityId)",
+        "DROP INDEX IF EXISTS activity_termination_activityId_index",
+        "CREATE UNIQUE INDEX IF NOT EXISTS activity_termination_activityId_index"
+        " ON activity_termination (activityId)",
+        "DELETE FROM activity_exit WHERE activityExitId NOT IN"
+        " (SELECT MIN(activityExitId) FROM activity_exit GROUP BY activityId)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS activity_exit_activityId_index"
+        " ON activity_exit (activityId)",
+        "DELETE FROM activity_final_cost WHERE finalCostId NOT IN"
+        " (SELECT MIN(finalCostId) FROM activity_final_cost GROUP BY activityId)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS activity_final_cost_activityId_index"
+        " ON activity_final_cost (activityId)",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(connection):
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_schema(connection):
+    """apply the migrations the database has yet to, each in a transaction"""
+    version = get_schema_version(connection)
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"the database is at schema version {version}, newer than"
+            f" {SCHEMA_VERSION} which this version of golemspi knows"
+        )
+    for version, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        connection.execute("BEGIN")
+        try:
+            for statement in statements:
+                connection.execute(statement)
+            # PRAGMA does not take parameters
+            connection.execute(f"PRAGMA user_version = {version:d}")
+        except:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
@@ -1,7 +1,4 @@
-from . import connection
-
-
-def create_tables():
+def create_tables(connection):
     connection.execute(
         """
         CREATE TABLE IF NOT EXISTS agreement (
@@ -68,7 +65,7 @@ def create_tables():
 
     connection.execute(
         """
-        CREATE TABLE activity_metric (
+        CREATE TABLE IF NOT EXISTS activity_metric (
             metric_id INTEGER PRIMARY KEY AUTOINCREMENT,
             activityId INTEGER NOT NULL,
             timestamp INTEGER NOT NULL,
@@ -0,0 +1,9 @@
+# /model/errors.py
+
+
+class MissingParentError(LookupError):
+    """the agreement or activity a mutation refers to is not in the model
+
+    e.g. it began before the part of the log that was read (a log resumed from
+    a checkpoint without the history holding it, or a rotated away beginning).
+    """
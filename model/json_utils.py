@@ -1,5 +1,7 @@
+import collections
 import decimal
 import json
+import os
 
 
 def decimal_decoder(obj):
@@ -15,3 +17,43 @@ def json_loads(s):
 def json_loadf(file):
     with open(file, "r") as f:
         return json.load(f, parse_float=decimal.Decimal, object_hook=decimal_decoder)
+
+
+class JsonFileCache:
+    """json files loaded with json_loadf, kept parsed until they change
+
+    a file is reparsed only when its modification time or size differ from when
+    it was parsed. beyond max_entries files the least recently loaded is dropped.
+    the data returned is shared between loads and must not be modified.
+    """
+
+    k_default_max_entries = 256
+
+    def __init__(self, max_entries=k_default_max_entries):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()  # path -> (mtime, size), data
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, file):
+        try:
+            stat = os.stat(file)
+        except OSError:
+            self._entries.pop(file, None)
+            raise
+        version = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(file)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(file)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        data = json_loadf(file)
+        self._entries[file] = (version, data)
+        self._entries.move_to_end(file)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return data
+
+    def clear(self):
+        self._entries.clear()
@@ -1,17 +1,35 @@
 # ./model.py
+import contextlib
+import time
+
 from .model_additions import ModelAdditions
 from .model_retrievals import ModelRetrievals
 from .model_updates import ModelUpdates
-from model.database import connection
+from .write_buffer import WriteBehindBuffer
+from model.database import create_connection
 from model.flags.view_update_flags import view_update_flags
 
 # from .objects.version_info import VersionInfo, HardwareResourceInfo
 
 
 class Model:
-    def __init__(self):
+    k_retention_interval = 60  # seconds between roll ups of old activity metrics
+
+    def __init__(self, connection=None, metric_retention=None):
+        """
+        Args:
+            connection: the database (see model.database.create_connection) holding
+                any history to continue, by default a new one in memory
+            metric_retention: seconds after which the activity metrics of an
+                activity are rolled up into its latest one, or None to keep them
+        """
+        if connection is None:
+            connection = create_connection()
         self.connection = connection
         self.view_update_flags = view_update_flags
+        # rows inserted by mutators that nothing reads back right away
+        self.write_buffer = WriteBehindBuffer(connection)
+        self._transaction_depth = 0
         self.additions = ModelAdditions(self)
         self.retrievals = ModelRetrievals(self)
         self.updates = ModelUpdates(self)
@@ -19,6 +37,60 @@ class Model:
         self.hardware_resource_cap_info = None
         self.payment_networks = []
         self.subnet = None
+        self.metric_retention = metric_retention
+        self._retention_time = None
+        if self.retrievals.get_history_counts()[1]:
+            # continuing a history: show the exe unit it left running, if any
+            self.view_update_flags["pid"] = True
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """apply the mutations made within as one transaction
+
+        transactions nest: only the outermost begins and commits one. pending
+        buffered rows are written before it commits. as when every statement was
+        committed on its own, what was applied before an exception is kept.
+        """
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+            return
+        self.connection.execute("BEGIN")
+        self._transaction_depth = 1
+        try:
+            yield
+        finally:
+            self._transaction_depth = 0
+            self.write_buffer.flush()
+            self.connection.execute("COMMIT")
+
+    def flush_writes(self):
+        # write the buffered rows before reading the tables they go to
+        self.write_buffer.flush()
+
+    def apply_retention(self, now=None):
+        """roll up the activity metrics older than metric_retention, at most once
+        every k_retention_interval seconds
+
+        Returns:
+            the number of activity metrics removed
+        """
+        if self.metric_retention is None:
+            return 0
+        monotonic_time = time.monotonic()
+        if (
+            self._retention_time is not None
+            and monotonic_time - self._retention_time < self.k_retention_interval
+        ):
+            return 0
+        self._retention_time = monotonic_time
+        if now is None:
+            now = time.time()
+        with self.transaction():
+            return self.updates.roll_up_activity_metrics(now - self.metric_retention)
 
     def get_active_flags(self):
         # Return the update flags that are set to True
@@ -1,5 +1,6 @@
 # /model/model_additions.py
 
+from .errors import MissingParentError
 from .time_utils import convert_to_unix_time
 from .objects import VersionInfo, HardwareResourceInfo
 
@@ -28,9 +29,10 @@ class ModelAdditions:
     def add_agreement(self, timestamp, agreement_hash, requestor_address, subscription):
         # Update model on new agreement
         unixtimestamp = convert_to_unix_time(timestamp)
-        # Insert a new row into the agreement table
+        # Insert a new row into the agreement table, unless a history continued
+        # (see --history-db) already holds the agreement, e.g. a log read again
         query = """
-            INSERT INTO agreement (timestamp, hash, address, subscription) VALUES (?, ?, ?, ?)
+            INSERT OR IGNORE INTO agreement (timestamp, hash, address, subscription) VALUES (?, ?, ?, ?)
         """
         values = (unixtimestamp, agreement_hash, requestor_address, subscription)
         self.model.connection.execute(query, values)
@@ -59,21 +61,23 @@ class ModelAdditions:
         result = cursor.fetchone()
 
         if result is None:
-            raise Exception("agreement with the given hash not found")
+            raise MissingParentError("agreement with the given hash not found")
 
         agreement_id = result[0]
 
         # Insert a new row into the activity table
-        self.conn.execute(
+        cursor = self.conn.execute(
             """
-            INSERT INTO activity (agreementId, activity_hash) VALUES (?, ?)
+            INSERT OR IGNORE INTO activity (agreementId, activity_hash) VALUES (?, ?)
             """,
             (agreement_id, activity_hash),
         )
+        if cursor.rowcount == 0:
+            # the history already holds the activity and its task
+            return
 
-        # Retrieve the activityId of the inserted row
-        cursor = self.conn.execute("SELECT last_insert_rowid()")
-        activity_id = cursor.fetchone()[0]
+        # the activityId of the inserted row
+        activity_id = cursor.lastrowid
 
         # Insert a new row into the task table
         self.conn.execute(
@@ -106,21 +110,15 @@ class ModelAdditions:
     def add_exeunit_logs_dir(self, timestamp, path_to_logs_dir, activity_hash):
         unixtimestamp = convert_to_unix_time(timestamp)
         # Lookup the activityId based on the activity hash
-        cursor = self.model.connection.execute(
-            "SELECT activityId FROM activity WHERE activity_hash = ?",
-            (activity_hash,),
-        )
-        result = cursor.fetchone()
-
-        if result is None:
-            raise Exception("Activity with the given hash not found")
+        activity_id = self.model.retrievals.get_activity_id(activity_hash)
 
-        activity_id = result[0]
+        if activity_id is None:
+            raise MissingParentError("Activity with the given hash not found")
 
         # Insert a new row into the activity_logs_directory table
-        self.model.connection.execute(
+        self.model.write_buffer.insert(
             """
-            INSERT INTO activity_logs_directory (timestamp, activityId, logs_directory) VALUES (?, ?, ?)
+            INSERT OR IGNORE INTO activity_logs_directory (timestamp, activityId, logs_directory) VALUES (?, ?, ?)
             """,
             (unixtimestamp, activity_id, path_to_logs_dir),
         )
@@ -138,20 +136,16 @@ class ModelAdditions:
         dt = datetime.fromtimestamp(unixtimestamp)
 
         # Retrieve the last inserted activityId
-        cursor = self.model.connection.execute(
-            "SELECT activityId FROM activity ORDER BY activityId DESC LIMIT 1"
-        )
-        result = cursor.fetchone()
-
-        if result is None:
-            raise Exception("No activities found")
+        cursor = self.model.connection.execute("SELECT MAX(activityId) FROM activity")
+        activity_id = cursor.fetchone()[0]
 
-        activity_id = result[0]
+        if activity_id is None:
+            raise MissingParentError("No activities found")
 
         # Insert a new row into the activity_pid table
-        self.model.connection.execute(
+        self.model.write_buffer.insert(
             """
-            INSERT INTO activity_pid (timestamp, activityId, pid) VALUES (?, ?, ?)
+            INSERT OR IGNORE INTO activity_pid (timestamp, activityId, pid) VALUES (?, ?, ?)
             """,
             (unixtimestamp, activity_id, pid),
         )
@@ -173,26 +167,27 @@ class ModelAdditions:
         """
         values = (unixtimestamp, mode, address, driver, network, token)
         file_logger.debug(f"{values}")
-        self.conn.execute(query, values)
+        self.model.write_buffer.insert(query, values)
 
     def add_payment_accounts(self, timestamp, accounts):
         # Convert the timestamp to UNIX timestamp
         unix_timestamp = convert_to_unix_time(timestamp)
-        # Iterate over the accounts list
-        for account in accounts:
-            # Extract the account details
-            address = account["address"]
-            network = account["network"]
-            platform = account["platform"]
-
-            # Insert the account details into the payment_account table
-            self.conn.execute(
-                """
-                INSERT INTO payment_account (timestamp, address, network, platform)
-                VALUES (?, ?, ?, ?)
-                """,
-                (unix_timestamp, address, network, platform),
-            )
+        # Insert the details of every account into the payment_account table
+        self.model.write_buffer.insert_many(
+            """
+            INSERT INTO payment_account (timestamp, address, network, platform)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (
+                    unix_timestamp,
+                    account["address"],
+                    account["network"],
+                    account["platform"],
+                )
+                for account in accounts
+            ],
+        )
 
     def add_payment_network(self, timestamp, payment_network):
         self.model.payment_networks.append(payment_network)
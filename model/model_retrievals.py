@@ -1,16 +1,42 @@
 # /model/model_retrievals.py
 
 import json
-from .json_utils import json_loadf
+from .errors import MissingParentError
+from .json_utils import JsonFileCache
 from collections import OrderedDict
+from decimal import Decimal
 
 from utils.mylogger import console_logger, file_logger
 
 
 class ModelRetrievals:
+    k_cache_limit = 10000
+
     def __init__(self, model):
         self.model = model
         self.conn = model.connection
+        self._activity_ids = dict()  # activity hash -> activityId
+        # read on every cost update and by the view every frame an exe unit runs
+        self.agreement_cache = JsonFileCache()
+
+    def get_activity_id(self, activity_hash):
+        """return the activityId of the activity with the hash, or None if there is
+        none (yet)
+
+        activities are never changed once added, so the ids found are remembered.
+        """
+        activity_id = self._activity_ids.get(activity_hash)
+        if activity_id is None:
+            result = self.conn.execute(
+                "SELECT activityId FROM activity WHERE activity_hash = ?",
+                (activity_hash,),
+            ).fetchone()
+            if result is None:
+                return None
+            if len(self._activity_ids) > self.k_cache_limit:
+                self._activity_ids.clear()
+            activity_id = self._activity_ids[activity_hash] = result[0]
+        return activity_id
 
     def get_agreement_json_by_activity_hash(self, activity_hash):
         cursor = self.conn.execute(
@@ -25,12 +51,12 @@ class ModelRetrievals:
         result = cursor.fetchone()
 
         if result is None:
-            raise Exception("Activity not found")
+            raise MissingParentError("Activity not found")
 
         agreement_json_file = result[0]
 
-        # Load the JSON file
-        agreement_data = json_loadf(agreement_json_file)
+        # Load the JSON file (parsed again only once it changed)
+        agreement_data = self.agreement_cache.load(agreement_json_file)
 
         return agreement_data
 
@@ -71,8 +97,12 @@ class ModelRetrievals:
 
     def get_current_exeunit_info(self):
         """find the unterminated pid and lookup the start time and url then return timestamp, task_package, and pid"""
+        self.model.flush_writes()
         cursor = self.model.connection.execute(
-            "SELECT timestamp, activityId, pid FROM activity_pid ORDER BY activityPidId DESC LIMIT 1"
+            """
+            SELECT timestamp, activityId, pid FROM activity_pid
+            WHERE activityPidId = (SELECT MAX(activityPidId) FROM activity_pid)
+            """
         )
         result = cursor.fetchone()
 
@@ -127,6 +157,7 @@ class ModelRetrievals:
         return payment_network
 
     def get_payment_account_address_info_on_network(self, networks):
+        self.model.flush_writes()
         # Convert the list of networks to a tuple, which can be used in a SQL query
         networks_tuple = tuple(networks)
 
@@ -157,3 +188,53 @@ class ModelRetrievals:
 
         # Return the address and token as a tuple
         return address, token
+
+    def get_history_counts(self):
+        """return the number of agreements and activities recorded"""
+        agreements = self.conn.execute("SELECT COUNT(*) FROM agreement").fetchone()[0]
+        activities = self.conn.execute("SELECT COUNT(*) FROM activity").fetchone()[0]
+        return agreements, activities
+
+    def get_exit_status_counts(self):
+        """return a list of (exit_status_str, exit_status_code, count) most frequent first"""
+        self.model.flush_writes()
+        cursor = self.conn.execute(
+            """
+            SELECT exit_status_str, exit_status_code, COUNT(*) AS occurrences
+            FROM activity_exit
+            GROUP BY exit_status_str, exit_status_code
+            ORDER BY occurrences DESC
+            """
+        )
+        return cursor.fetchall()
+
+    def get_final_cost_totals(self):
+        """return (number of activities with a final cost, sum of final costs as Decimal)"""
+        self.model.flush_writes()
+        cursor = self.conn.execute("SELECT final_cost FROM activity_final_cost")
+        costs = [Decimal(str(row[0])) for row in cursor]
+        return len(costs), sum(costs, Decimal(0))
+
+    def get_earnings_by_requestor(self):
+        """return a list of (requestor address, activities, Decimal earnings) highest first
+
+        earnings are the sum of the final costs of the requestor's activities
+        """
+        self.model.flush_writes()
+        cursor = self.conn.execute(
+            """
+            SELECT agreement.address, activity_final_cost.final_cost
+            FROM activity_final_cost
+            JOIN activity ON activity.activityId = activity_final_cost.activityId
+            JOIN agreement ON agreement.agreementId = activity.agreementId
+            """
+        )
+        earnings = OrderedDict()
+        for address, final_cost in cursor:
+            count, total = earnings.get(address, (0, Decimal(0)))
+            earnings[address] = (count + 1, total + Decimal(str(final_cost)))
+        return sorted(
+            ((address, count, total) for address, (count, total) in earnings.items()),
+            key=lambda row: row[2],
+            reverse=True,
+        )
@@ -21,28 +21,30 @@ class ModelUpdates:
         duration_sec = usages["golem.usage.duration_sec"]
         cpu_sec = usages["golem.usage.cpu_sec"]
 
+        activity_id = self.model.retrievals.get_activity_id(activity_hash)
+        if activity_id is None:
+            return
+
         # Insert a new row into the activity_metric table
-        self.conn.execute(
+        self.model.write_buffer.insert(
             """
-            INSERT INTO activity_metric (timestamp, activityId, duration_sec, cpu_sec)
-            SELECT ?, activityId, ?, ?
-            FROM activity
-            WHERE activity_hash = ?
+            INSERT OR IGNORE INTO activity_metric (timestamp, activityId, duration_sec, cpu_sec)
+            VALUES (?, ?, ?, ?)
             """,
-            (timestamp, duration_sec, cpu_sec, activity_hash),
+            (timestamp, activity_id, duration_sec, cpu_sec),
         )
 
     def update_exeunit_termination(self, timestamp, activity_hash):
         # Update the model with the termination of an exeunit/activity
-
-        # Insert a new row into the activity_termination table
-        self.conn.execute(
-            """
-            INSERT INTO activity_termination (activityId, timestamp)
-            SELECT activityId, ? FROM activity WHERE activity_hash = ?
-            """,
-            (timestamp, activity_hash),
-        )
+        activity_id = self.model.retrievals.get_activity_id(activity_hash)
+        if activity_id is not None:
+            # Insert a new row into the activity_termination table
+            self.model.write_buffer.insert(
+                """
+                INSERT OR IGNORE INTO activity_termination (activityId, timestamp) VALUES (?, ?)
+                """,
+                (activity_id, timestamp),
+            )
         self.model.view_update_flags["exeunit terminated"] = True
 
     def update_exeunit_exit(
@@ -55,16 +57,17 @@ class ModelUpdates:
     ):
         # Update the model with the exit status of an exeunit/activity
         timestamp = convert_to_unix_time(timestamp)
+        activity_id = self.model.retrievals.get_activity_id(activity_hash)
+        if activity_id is None:
+            return
 
         # Insert a new row into the activity_exit table
-        self.conn.execute(
+        self.model.write_buffer.insert(
             """
-            INSERT INTO activity_exit (activityId, timestamp, exit_status_str, exit_status_code)
-            SELECT activityId, ?, ?, ?
-            FROM activity
-            WHERE activity_hash = ?
+            INSERT OR IGNORE INTO activity_exit (activityId, timestamp, exit_status_str, exit_status_code)
+            VALUES (?, ?, ?, ?)
             """,
-            (timestamp, exit_status_str, exit_status_code, activity_hash),
+            (activity_id, timestamp, exit_status_str, exit_status_code),
         )
 
     def update_final_cost_for_activity_information(
@@ -72,11 +75,34 @@ class ModelUpdates:
     ):
         # Update the model with the final cost information for an activity
         timestamp = convert_to_unix_time(timestamp)
+        activity_id = self.model.retrievals.get_activity_id(activity_hash)
+        if activity_id is None:
+            return
+
+        self.model.write_buffer.insert(
+            """
+            INSERT OR IGNORE INTO activity_final_cost (activityId, timestamp, final_cost)
+            VALUES (?, ?, ?)
+            """,
+            (activity_id, timestamp, final_cost),
+        )
+
+    def roll_up_activity_metrics(self, before):
+        """remove the activity metrics recorded before unix time before, except
+        for the latest of each activity
 
-        self.conn.execute(
+        the usage an activity's cost is updated with is cumulative, so its latest
+        metric holds the totals of those removed. returns how many were removed.
+        """
+        self.model.flush_writes()
+        cursor = self.conn.execute(
             """
-            INSERT INTO activity_final_cost (activityId, timestamp, final_cost)
-            SELECT activityId, ?, ? FROM activity WHERE activity_hash = ?
+            DELETE FROM activity_metric
+            WHERE timestamp < ? AND metric_id < (
+                SELECT MAX(latest.metric_id) FROM activity_metric AS latest
+                WHERE latest.activityId = activity_metric.activityId
+            )
             """,
-            (timestamp, final_cost, activity_hash),
+            (before,),
         )
+        return cursor.rowcount
@@ -1,8 +1,16 @@
 from utils.mylogger import console_logger, file_logger
+from utils.timestamps import OFFSET_TEXT, SECOND_TEXT, unix_time_of_second
 from datetime import datetime, timezone
+import re
 
+# 2023-05-28T08:05:05.879-0700 (the timestamp of a golemsp log line)
+# (strptime's %f takes at most 6 digits: any other layout is left to strptime)
+_TIMESTAMP_PATTERN = re.compile(
+    SECOND_TEXT + r"\.\d{1,6}" + OFFSET_TEXT + r"\Z", re.ASCII
+)
 
-def convert_to_unix_time(timestamp):
+
+def _convert_with_strptime(timestamp):
     try:
         # Parse the datetime string into a datetime object
         dt = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%f%z")
@@ -15,3 +23,46 @@ def convert_to_unix_time(timestamp):
         unix_time = 0
 
     return unix_time
+
+
+def _convert_match(timestamp, match):
+    second, offset = match.groups()
+    unix_time = unix_time_of_second(second, offset)
+    if unix_time is None:
+        # e.g. an invalid date, reported by strptime
+        return _convert_with_strptime(timestamp)
+    return unix_time
+
+
+def convert_to_unix_time(timestamp):
+    """return the unix time (whole seconds) of a timestamp like
+    2023-05-28T08:05:05.879-0700, or 0 if it cannot be parsed
+
+    the unix time of each second is computed once (see utils.timestamps) and
+    remembered. a timestamp written in any other way (e.g. without a fraction of
+    a second) is parsed with strptime.
+    """
+    if isinstance(timestamp, str):
+        match = _TIMESTAMP_PATTERN.match(timestamp)
+    else:
+        match = None
+    if match is None:
+        return _convert_with_strptime(timestamp)
+    return _convert_match(timestamp, match)
+
+
+def convert_to_unix_times(timestamps):
+    """return the unix times of a sequence of timestamps (see convert_to_unix_time)"""
+    match_timestamp = _TIMESTAMP_PATTERN.match
+    unix_times = []
+    append = unix_times.append
+    for timestamp in timestamps:
+        if not isinstance(timestamp, str):
+            append(_convert_with_strptime(timestamp))
+            continue
+        match = match_timestamp(timestamp)
+        if match is None:
+            append(_convert_with_strptime(timestamp))
+            continue
+        append(_convert_match(timestamp, match))
+    return unix_times
@@ -0,0 +1,82 @@
+# /model/write_buffer.py
+"""defer inserts nothing reads back right away and write them with executemany
+
+the rows of each INSERT statement are collected in the order they were added and
+written, statement by statement, once max_rows rows are pending or on flush().
+Model.transaction() flushes the buffer before it commits, so rows never outlive
+the transaction they were added in; outside of one, call Model.flush_writes().
+whatever reads the tables the rows go to (or depends on rows not yet inserted)
+flushes the buffer first.
+"""
+
+import collections
+import sqlite3
+
+from utils.mylogger import console_logger, file_logger
+
+
+class WriteBehindBuffer:
+    """pending INSERT rows, grouped by statement, written with executemany"""
+
+    k_default_max_rows = 1000
+
+    def __init__(self, connection, max_rows=k_default_max_rows):
+        self.connection = connection
+        self.max_rows = max_rows
+        self._rows = dict()  # statement -> parameters of its pending rows
+        self._row_count = 0
+        self.errors = collections.Counter()  # exception name -> rows not written
+
+    @property
+    def pending_row_count(self):
+        return self._row_count
+
+    def insert(self, statement, parameters):
+        """add a row to be inserted by statement (an INSERT with placeholders)"""
+        rows = self._rows.get(statement)
+        if rows is None:
+            rows = self._rows[statement] = []
+        rows.append(parameters)
+        self._added(1)
+
+    def insert_many(self, statement, parameter_rows):
+        """add rows to be inserted by statement"""
+        rows = self._rows.get(statement)
+        if rows is None:
+            rows = self._rows[statement] = []
+        count = len(rows)
+        rows.extend(parameter_rows)
+        self._added(len(rows) - count)
+
+    def _added(self, count):
+        self._row_count += count
+        if self._row_count >= self.max_rows:
+            self.flush()
+
+    def flush(self):
+        """write every pending row"""
+        if not self._row_count:
+            return
+        pending = self._rows
+        self._rows = dict()
+        self._row_count = 0
+        for statement, rows in pending.items():
+            self._write(statement, rows)
+
+    def _write(self, statement, rows):
+        # a row failing to insert would stop executemany part way through: undo it
+        # and insert the rows one at a time, so only the failing rows are lost
+        connection = self.connection
+        connection.execute("SAVEPOINT write_behind")
+        try:
+            connection.executemany(statement, rows)
+        except sqlite3.Error:
+            connection.execute("ROLLBACK TO write_behind")
+            for parameters in rows:
+                try:
+                    connection.execute(statement, parameters)
+                except sqlite3.Error as e:
+                    self.errors[type(e).__name__] += 1
+                    file_logger.debug(f"{type(e).__name__}: {e} for {parameters}")
+        finally:
+            connection.execute("RELEASE write_behind")
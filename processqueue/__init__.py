@@ -3,5 +3,10 @@ import os
 from .processqueue import ProcessQueue
 from .filequeue import FileQueue
 from .stdinqueue import StdinQueue
+from .replayqueue import ReplayQueue
+from .mappedlog import MappedLogReader
+from .mergedqueue import MergedLogQueue
+from .transport import BatchQueue, create_transport
+from .ringbuffer import RingBufferQueue
 if os.name == "posix":
     from .unixsocketqueue import UnixSocketQueue
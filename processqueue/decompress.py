@@ -0,0 +1,127 @@
+# decompress.py
+"""read compressed (gzip, xz, bzip2) logs as a stream
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+the compression of a log is detected from its first bytes, not its name, and it
+is decompressed incrementally: only a few blocks are in memory at any time and
+nothing is written to disk.
+
+iter_blocks_in_thread() runs the decompression in a worker thread (zlib, lzma and
+bz2 release the GIL while decompressing) and iter_lines() splits the blocks into
+lines in bulk.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import queue
+import threading
+
+GZIP = "gzip"
+XZ = "xz"
+BZIP2 = "bz2"
+
+_MAGIC_NUMBERS = (
+    (b"\x1f\x8b", GZIP),
+    (b"\xfd7zXZ\x00", XZ),
+    (b"BZh", BZIP2),
+)
+_MAGIC_LENGTH = max(len(magic) for magic, _ in _MAGIC_NUMBERS)
+_OPENERS = {GZIP: gzip.open, XZ: lzma.open, BZIP2: bz2.open}
+
+_BLOCK_SIZE = 1 << 20
+
+
+def detect_compression(path_to_file):
+    """return GZIP, XZ or BZIP2 according to the file's magic number, else None
+
+    a fifo or other non regular file is never considered compressed (its first
+    bytes cannot be peeked at without consuming them)
+    """
+    if not os.path.isfile(path_to_file):
+        return None
+    with open(path_to_file, "rb") as f:
+        head = f.read(_MAGIC_LENGTH)
+    for magic, compression in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def wrap_decompressor(binary_file, compression):
+    """return a binary file object reading the decompressed content of binary_file"""
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=binary_file, mode="rb")
+    if compression == XZ:
+        return lzma.LZMAFile(binary_file)
+    return bz2.BZ2File(binary_file)
+
+
+def open_binary(path_to_file):
+    """open a log for binary reading, decompressing it if it is compressed"""
+    compression = detect_compression(path_to_file)
+    if compression is None:
+        return open(path_to_file, "rb")
+    return _OPENERS[compression](path_to_file, "rb")
+
+
+def iter_blocks_in_thread(binary_file, block_size=_BLOCK_SIZE, depth=4):
+    """yield the content of binary_file in blocks read ahead by a worker thread
+
+    Args:
+        binary_file: a binary file object, e.g. from open_binary
+        block_size: bytes per read
+        depth: how many blocks the worker may read ahead
+    """
+    blocks = queue.Queue(maxsize=depth)
+    stop_event = threading.Event()
+
+    def read_blocks():
+        try:
+            while not stop_event.is_set():
+                block = binary_file.read(block_size)
+                blocks.put(block)
+                if not block:
+                    break
+        except Exception as e:
+            blocks.put(e)
+
+    thread = threading.Thread(target=read_blocks, daemon=True)
+    thread.start()
+    try:
+        while True:
+            block = blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            if not block:
+                break
+            yield block
+    finally:
+        # on an early exit let the worker finish its pending put and stop
+        stop_event.set()
+        while thread.is_alive():
+            try:
+                blocks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def iter_lines(blocks, errors="replace"):
+    """yield the utf-8 lines (with their newline) of an iterable of byte blocks"""
+    partial = b""
+    for block in blocks:
+        if partial:
+            block = partial + block
+        # a newline byte never occurs inside a multibyte utf-8 sequence
+        end_of_lines = block.rfind(b"\n") + 1
+        partial = block[end_of_lines:]
+        if end_of_lines:
+            lines = block[:end_of_lines].decode("utf-8", errors=errors).split("\n")
+            lines.pop()
+            for line in lines:
+                yield line + "\n"
+    if partial:
+        yield partial.decode("utf-8", errors=errors)
@@ -1,74 +1,362 @@
 # filequeue.py
-"""tail a file in a separate thread to read line by line into a shared queue
+"""tail a file in a separate process to read line by line into a shared queue
 
-exports FileQueue that wraps a python Queue object exposing get_nowait()
+exports FileQueue that wraps a BatchQueue exposing get_nowait() and get_batch()
 the queue is filled by all lines in the file which is monitored for additional data
 
+the tail sleeps on an inotify watch of the file (see filewatch.py) and, once woken,
+reads everything new in large chunks which are split into lines in bulk. the
+lines of each chunk are stripped of ansi codes and cross to the consumer as one batch.
+
+a rotated or truncated file is followed, and with a checkpoint_path FileQueue
+persists the byte offset of the last processed line so a restart resumes there.
+a gzip, xz or bzip2 compressed file (detected by its magic number) is read as an
+archive: the tail decompresses it as a stream.
+
 author: krunch3r (KJM github.com/krunch3r76)
 license: General Poetic License (GPL3)
 
 """
 
 from pathlib import Path
+import collections
+import json
 import multiprocessing
 import io
+import os
+import re
 import time
 
 from utils.mylogger import console_logger, file_logger
+from .decompress import detect_compression, wrap_decompressor
+from .filewatch import create_file_watcher, PollingWatcher, IN_CREATE, IN_MOVED_TO
+from .transport import create_transport
+
+_READ_CHUNK_SIZE = 1 << 16
+
+
+_ANSI_ESCAPE_PATTERN = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
 
 
 def _strip_ansi(text):
     # strip ansi codes from text and return
     # credit. chat.openai.com
-    import re
-
-    stripped_text = re.sub(r"\x1B\[[0-?]*[ -/]*[@-~]", "", text)
-    return stripped_text
+    return _ANSI_ESCAPE_PATTERN.sub("", text)
 
 
 class ReadLineBuffer:
-    def __init__(self, target_text_file, on_complete_line):
-        self.target_text_file = target_text_file
-        self.on_complete_line = on_complete_line
+    """functor that tails a binary file and hands the complete lines of each chunk to a callback
+
+    sleeps on a file watcher while at EOF; when woken drains the file in chunks
+    of _READ_CHUNK_SIZE bytes. a fifo is simply read as it blocks by itself.
+
+    at EOF the path is checked against the open file: when the path names a new
+    file (rotation) the old file is finished and the new one read from its start,
+    and when the file became shorter than what was read (truncation) it is read
+    again from its start.
+    """
+
+    def __init__(
+        self,
+        target_binary_file,
+        path_to_file,
+        on_complete_lines,
+        bytes_read=None,
+        backlog_loaded=None,
+        checkpoint_marks=None,
+        raw_file=None,
+    ):
+        """
+        Args:
+            target_binary_file: the file opened in binary mode
+            path_to_file: pathlib.Path of the file
+            on_complete_lines: callback receiving the list of lines of each chunk
+            bytes_read: optional multiprocessing.Value counting the bytes read
+            backlog_loaded: optional multiprocessing.Event set on first reaching EOF
+            checkpoint_marks: optional multiprocessing.SimpleQueue receiving, after
+                each batch, (lines queued so far, (device, inode), byte offset of the
+                end of the batch's last line)
+            raw_file: when target_binary_file decompresses, the compressed file
+                underneath (its position measures bytes_read; it is not followed)
+        """
+        self.target_binary_file = target_binary_file
+        self.path_to_file = path_to_file
+        self.on_complete_lines = on_complete_lines
+        self.bytes_read = bytes_read
+        self.backlog_loaded = backlog_loaded
+        self.checkpoint_marks = checkpoint_marks
+        self.raw_file = raw_file
+        self._linesQueued = 0
+        self._set_file(target_binary_file)
+
+    def _set_file(self, binary_file):
+        self.target_binary_file = binary_file
+        stat = os.fstat(binary_file.fileno())
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._position = binary_file.tell()
+        self._partial = b""  # bytes of the incomplete last line
+
+    def _queue_lines(self, data):
+        # split data (ending on a newline but for a final incomplete line) into lines and queue them
+        lines = data.decode("utf-8", errors="replace").split("\n")
+        if lines[-1] == "":
+            lines.pop()
+            lines = [line + "\n" for line in lines]
+        else:
+            lines = [line + "\n" for line in lines[:-1]] + lines[-1:]
+        lines = [_strip_ansi(line) if line.strip() else "" for line in lines]
+        self.on_complete_lines(lines)
+        if self.checkpoint_marks is not None:
+            self._linesQueued += len(lines)
+            self.checkpoint_marks.put(
+                (
+                    self._linesQueued,
+                    self._identity,
+                    self._position - len(self._partial),
+                )
+            )
+
+    def read_available(self, max_chunks=None):
+        """read and queue lines until EOF (or max_chunks chunks)
+
+        Returns:
+            True if anything was read
+        """
+        read_any = False
+        chunk_count = 0
+        while max_chunks is None or chunk_count < max_chunks:
+            chunk_count += 1
+            chunk = self.target_binary_file.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                return read_any
+            read_any = True
+            self._position += len(chunk)
+            if self.bytes_read is not None:
+                if self.raw_file is not None:
+                    self.bytes_read.value = self.raw_file.tell()
+                else:
+                    self.bytes_read.value += len(chunk)
+            data = self._partial + chunk if self._partial else chunk
+            # a newline byte never occurs inside a multibyte utf-8 sequence
+            end_of_lines = data.rfind(b"\n") + 1
+            self._partial = data[end_of_lines:]
+            if end_of_lines:
+                self._queue_lines(data[:end_of_lines])
+        return read_any
+
+    def reopen_if_replaced(self):
+        """at EOF, follow a rotated or truncated file
+
+        Returns:
+            True if reading restarts at the beginning of a file
+        """
+        try:
+            stat = os.stat(self.path_to_file)
+        except FileNotFoundError:
+            return False  # rotated away, the new file is yet to be created
+        if (stat.st_dev, stat.st_ino) != self._identity:
+            if self._partial:
+                # the old file is finished, its incomplete last line will not be
+                partial, self._partial = self._partial, b""
+                self._queue_lines(partial)
+            try:
+                binary_file = self.path_to_file.open(mode="rb", buffering=0)
+            except FileNotFoundError:
+                return False
+            self.target_binary_file.close()
+            self._set_file(binary_file)
+            file_logger.info(f"{self.path_to_file} was rotated, reading the new file")
+            return True
+        if os.fstat(self.target_binary_file.fileno()).st_size < self._position:
+            # discard the incomplete line, the data it belonged to is gone
+            self.target_binary_file.seek(0)
+            self._set_file(self.target_binary_file)
+            file_logger.info(f"{self.path_to_file} was truncated, reading from its start")
+            return True
+        return False
+
+    def create_watcher(self):
+        """a watcher woken when the file grows or is replaced by a new file"""
+        watcher = create_file_watcher(self.path_to_file)
+        if hasattr(watcher, "add_watch"):
+            try:
+                # wake up when a rotated log is replaced by a new file
+                watcher.add_watch(self.path_to_file.parent, IN_CREATE | IN_MOVED_TO)
+            except OSError:
+                pass
+        return watcher
 
     def __call__(self):
+        if self.path_to_file.is_fifo():
+            watcher = PollingWatcher()  # reads block, only wait on writer hangup
+            follow_replacement = False
+        elif self.raw_file is not None:
+            # a compressed archive is complete, only idle once it is read
+            watcher = PollingWatcher(min_interval=1.0, max_interval=1.0)
+            follow_replacement = False
+        else:
+            watcher = self.create_watcher()
+            follow_replacement = True
         while True:
-            time.sleep(0.01)
-            line = self.target_text_file.readline()
-            if line:
-                if not line.strip():
-                    line = ""
-                self.on_complete_line(line)
+            if self.read_available():
+                watcher.reset()
+            elif self.backlog_loaded is not None and not self.backlog_loaded.is_set():
+                self.backlog_loaded.set()
+            elif follow_replacement and self.reopen_if_replaced():
+                watcher.close()
+                watcher = self.create_watcher()
+            else:
+                # the timeout guards against a missed notification
+                watcher.wait(timeout=1.0)
+
+
+def _read_checkpoint(path_to_checkpoint):
+    # return the (device, inode, offset) recorded in a checkpoint file, if any
+    try:
+        with open(path_to_checkpoint, "r") as f:
+            checkpoint = json.load(f)
+        return (checkpoint["device"], checkpoint["inode"]), int(checkpoint["offset"])
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError) as e:
+        file_logger.warning(f"ignoring unreadable checkpoint {path_to_checkpoint}: {e}")
+        return None
+
+
+def _write_checkpoint(path_to_checkpoint, path_to_file, identity, offset):
+    # replace the checkpoint file atomically so a crash never leaves it half written
+    temporary_path = f"{path_to_checkpoint}.tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(
+            {
+                "path": str(path_to_file),
+                "device": identity[0],
+                "inode": identity[1],
+                "offset": offset,
+            },
+            f,
+        )
+    os.replace(temporary_path, path_to_checkpoint)
 
 
 class FileQueue:
     # open a file and queue lines as they become available (tail)
 
-    def __init__(self, path_to_file):
+    def __init__(self, path_to_file, transport="queue", checkpoint_path=None):
         """
         Args:
             path_to_file: a path as input to a python pathlib.Path object
+            transport: "queue", "ringbuffer" or a transport instance (see
+                transport.create_transport)
+            checkpoint_path: optional file recording the byte offset up to which
+                lines were processed (see checkpoint). when it refers to the file
+                being opened, reading resumes at that offset
         """
         self._pathFile = Path(path_to_file)
-        self._queueShared = multiprocessing.Queue()
-        self._fileOpen = self._pathFile.open(mode="r")
+        self._queueShared = create_transport(transport)
+        compression = detect_compression(self._pathFile)
+        self._fileOpen = self._pathFile.open(mode="rb", buffering=0)
+        stat = os.fstat(self._fileOpen.fileno())
+        self._rawFile = None
+        if compression is not None:
+            # an archive: decompressed by the tail as it reads
+            self._rawFile = self._fileOpen
+            self._fileOpen = wrap_decompressor(self._rawFile, compression)
+            if checkpoint_path is not None:
+                file_logger.info(
+                    f"{self._pathFile} is {compression} compressed, not checkpointing it"
+                )
+                checkpoint_path = None
+        self._checkpointPath = checkpoint_path
+        self._checkpointMarks = None
+        if checkpoint_path is not None:
+            self._checkpointMarks = multiprocessing.SimpleQueue()
+            self._pendingMarks = collections.deque()
+            self._linesConsumed = 0
+            self._checkpointOffset = None
+            checkpoint = _read_checkpoint(checkpoint_path)
+            if checkpoint is not None:
+                identity, offset = checkpoint
+                if identity == (stat.st_dev, stat.st_ino) and offset <= stat.st_size:
+                    self._fileOpen.seek(offset)
+                    self._checkpointOffset = offset
+                else:
+                    file_logger.info(
+                        f"{checkpoint_path} refers to another file, reading {self._pathFile} from its start"
+                    )
+        # what the file already holds is the backlog (see backlog_progress)
+        self._backlogSize = stat.st_size - (self._rawFile or self._fileOpen).tell()
+        self._bytesRead = multiprocessing.Value("q", 0)
+        self._backlogLoaded = multiprocessing.Event()
         self._readLineBuffer = ReadLineBuffer(
-            self._fileOpen, lambda line: self._queueShared.put_nowait(line)
+            self._fileOpen,
+            self._pathFile,
+            self._queueShared.put_lines,
+            self._bytesRead,
+            self._backlogLoaded,
+            self._checkpointMarks,
+            self._rawFile,
         )
         self._multiprocess = multiprocessing.Process(
             target=self._readLineBuffer, daemon=True
         )
         self._multiprocess.start()
 
+    @property
+    def backlog_size(self):
+        """the size in bytes of the file (past any checkpoint) when it was opened"""
+        return self._backlogSize
+
+    @property
+    def backlog_loaded(self):
+        """true once the tail has read (and queued) everything up to the first EOF"""
+        return self._backlogLoaded.is_set()
+
+    def backlog_progress(self):
+        """fraction of the backlog read by the tail so far (0.0 to 1.0)"""
+        if self._backlogLoaded.is_set() or self._backlogSize == 0:
+            return 1.0
+        return min(1.0, self._bytesRead.value / self._backlogSize)
+
+    def checkpoint(self, unprocessed=0):
+        """record the offset of the last processed line in the checkpoint file
+
+        Args:
+            unprocessed: how many of the lines already returned are yet to be processed
+
+        Returns:
+            the byte offset recorded, or None without a checkpoint_path
+        """
+        if self._checkpointMarks is None:
+            return None
+        while not self._checkpointMarks.empty():
+            self._pendingMarks.append(self._checkpointMarks.get())
+        processed = self._linesConsumed - unprocessed
+        mark = None
+        while self._pendingMarks and self._pendingMarks[0][0] <= processed:
+            mark = self._pendingMarks.popleft()
+        if mark is not None and mark[2] != self._checkpointOffset:
+            _, identity, offset = mark
+            _write_checkpoint(self._checkpointPath, self._pathFile, identity, offset)
+            self._checkpointOffset = offset
+        return self._checkpointOffset
+
     def get_nowait(self):
         """call get_nowait on wrapped Queue
         Raises:
             queue.Empty on an empty queue
         """
-        next_line = self._queueShared.get_nowait()
-        if next_line is not None:
-            next_line = _strip_ansi(next_line)
-        return next_line
+        line = self._queueShared.get_nowait()
+        if self._checkpointMarks is not None:
+            self._linesConsumed += 1
+        return line
+
+    def get_batch(self, max_lines=10000, max_wait=0.0):
+        """return up to max_lines queued lines (see BatchQueue.get_batch)"""
+        lines = self._queueShared.get_batch(max_lines, max_wait)
+        if self._checkpointMarks is not None:
+            self._linesConsumed += len(lines)
+        return lines
 
 
 if __name__ == "__main__":
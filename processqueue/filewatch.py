@@ -0,0 +1,140 @@
+# filewatch.py
+"""sleep until a tailed file may have new data
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+exports create_file_watcher() which returns an object implementing wait(timeout)
+and reset(). on linux the watcher blocks on an inotify descriptor (bound through
+ctypes, no third party dependency) so an idle tail costs no cpu. elsewhere, or when
+inotify cannot be initialized, a polling watcher sleeps with an exponential backoff
+that is reset whenever the reader finds new data (a regular file offers no
+descriptor to block on, see PollingWatcher).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+
+_DEFAULT_FILE_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+
+class InotifyWatcher:
+    """block on a linux inotify descriptor until a watched path changes"""
+
+    def __init__(self, path, mask=_DEFAULT_FILE_MASK):
+        """
+        Args:
+            path: the file (or directory) to watch
+            mask: inotify event mask
+
+        Raises:
+            OSError: inotify is unavailable or the watch could not be added
+        """
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify not supported")
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._mask = mask
+        self.add_watch(path)
+
+    def add_watch(self, path, mask=None):
+        # watch an additional path (e.g. the parent directory) on the same descriptor
+        if mask is None:
+            mask = self._mask
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(str(path)), ctypes.c_uint32(mask)
+        )
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return wd
+
+    def remove_watch(self, wd):
+        # stop watching a path added with add_watch (already gone if it was deleted)
+        self._libc.inotify_rm_watch(self._fd, ctypes.c_int(wd))
+
+    def wait(self, timeout=None):
+        """block until an event arrives or timeout seconds elapse
+
+        Returns:
+            True if at least one event was read, False on timeout
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        # events are only used as a wake up signal, discard their contents
+        while True:
+            try:
+                if not os.read(self._fd, 4096):
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def reset(self):
+        pass
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """sleep with exponential backoff where no change notification is available
+
+    a deliberate stand in for blocking on the descriptor: a read of a regular
+    file at EOF returns at once and select() always reports it readable, so
+    without inotify there is nothing to block on. (a fifo is read with blocking
+    reads and only waits here once its writer hung up, when it too stays
+    readable.) the backoff keeps an idle tail near zero cpu while new data
+    found after a wait is read in bulk at once.
+    """
+
+    def __init__(self, min_interval=0.01, max_interval=0.25):
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._interval = min_interval
+
+    def wait(self, timeout=None):
+        interval = self._interval
+        if timeout is not None:
+            interval = min(interval, timeout)
+        time.sleep(interval)
+        self._interval = min(self._interval * 2, self._max_interval)
+        return False
+
+    def reset(self):
+        # call when data was found so the next wait is short again
+        self._interval = self._min_interval
+
+    def close(self):
+        pass
+
+
+def create_file_watcher(path, mask=_DEFAULT_FILE_MASK):
+    """return an InotifyWatcher for path if possible otherwise a PollingWatcher"""
+    try:
+        return InotifyWatcher(path, mask)
+    except (OSError, AttributeError):
+        return PollingWatcher()
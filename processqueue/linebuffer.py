@@ -0,0 +1,45 @@
+# linebuffer.py
+"""split a stream of text chunks into lines in bulk
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+LineBuffer keeps the trailing incomplete line of the last chunk and prepends it
+to the next, so each chunk costs one concatenation and one str.split regardless
+of how many lines it holds.
+"""
+
+
+class LineBuffer:
+    """accumulate text chunks and return complete lines"""
+
+    def __init__(self, keepends=False):
+        """
+        Args:
+            keepends: when true each returned line retains its newline
+        """
+        self._partial = ""
+        self._keepends = keepends
+
+    def feed(self, text):
+        """add a chunk of text and return the list of lines it completed"""
+        if not text:
+            return []
+        if self._partial:
+            text = self._partial + text
+        lines = text.split("\n")
+        self._partial = lines.pop()
+        if self._keepends:
+            lines = [line + "\n" for line in lines]
+        return lines
+
+    def flush(self):
+        """return the incomplete line (if any) as a final list and clear it"""
+        partial = self._partial
+        self._partial = ""
+        return [partial] if partial else []
+
+    @property
+    def pending(self):
+        # the text buffered while waiting for a newline
+        return self._partial
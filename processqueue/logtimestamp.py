@@ -0,0 +1,45 @@
+# logtimestamp.py
+"""read the timestamp heading a golemsp log line as epoch seconds
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+a golemsp log line starts with e.g. "[2023-05-28T08:05:05.879-0700 INFO  ..."
+LogTimestampReader converts such a header to epoch seconds, parsing each distinct
+second only once. the variants written by exe units and runtimes (a "Z" or
+"+00:00" offset, no or a longer fraction of a second) are understood as well, as
+by the model (see utils.timestamps).
+"""
+
+import re
+
+from utils.timestamps import TIMESTAMP_TEXT, unix_time_of_second
+
+# [2023-05-28T08:05:05.879-0700 INFO  ...
+# [2023-05-29T08:21:07Z INFO  ya_runtime_vm] ...
+TIMESTAMP_PATTERN = re.compile(r"\[" + TIMESTAMP_TEXT + " ")
+TIMESTAMP_HEADER_LENGTH = 42  # len("[2023-05-28T08:05:05.879123456+00:00 ") and a margin
+
+
+class LogTimestampReader:
+    """callable converting the timestamp heading a log line to epoch seconds"""
+
+    def __call__(self, line):
+        """
+        Args:
+            line: a log line (str, or bytes of which only the header is decoded)
+
+        Returns:
+            epoch seconds as a float, or None when the line has no (valid)
+            timestamp header
+        """
+        if isinstance(line, (bytes, bytearray, memoryview)):
+            line = bytes(line[:TIMESTAMP_HEADER_LENGTH]).decode("ascii", "replace")
+        match = TIMESTAMP_PATTERN.match(line)
+        if match is None:
+            return None
+        second, fraction, offset = match.groups()
+        epoch = unix_time_of_second(second, offset)
+        if epoch is None or fraction is None:
+            return epoch
+        return epoch + int(fraction) / 10 ** len(fraction)
@@ -0,0 +1,282 @@
+# mappedlog.py
+"""read a time range of a large golemsp log through mmap and a sparse index
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+exports MappedLogReader which maps a log file into memory and samples it every
+sample_interval bytes, recording the timestamp and byte offset of the first log
+header at or after each sample point. a time is then located by bisecting the
+samples and scanning at most one sample interval of lines, so reading the last
+hour of a multi gigabyte log only touches the pages of that hour.
+
+the samples are cached in a sidecar file (by default the log's path + ".idx")
+together with the log's inode and a checksum of its head. reopening an unchanged
+log loads the samples instead of sampling again, and a log that grew since only
+has its new part sampled.
+
+golemsp timestamps are assumed to not decrease along the log.
+"""
+
+import array
+import bisect
+from datetime import datetime
+import mmap
+import os
+import struct
+import zlib
+
+from utils.mylogger import file_logger
+from .logtimestamp import LogTimestampReader, TIMESTAMP_HEADER_LENGTH
+
+_DEFAULT_SAMPLE_INTERVAL = 64 * 1024
+_READ_BLOCK_SIZE = 1 << 20
+_HEAD_CHECKSUM_SIZE = 4096
+
+# magic, sample interval, device, inode, head checksum, bytes sampled, sample count
+_INDEX_HEADER = struct.Struct("<8sQQQIQQ")
+_INDEX_MAGIC = b"GSPIDX01"
+
+
+def _as_epoch(when):
+    # accept epoch seconds or a datetime (naive datetimes are local time)
+    if when is None or isinstance(when, (int, float)):
+        return when
+    if isinstance(when, datetime):
+        return when.timestamp()
+    raise TypeError(f"expected epoch seconds or a datetime, not {type(when).__name__}")
+
+
+class MappedLogReader:
+    """memory mapped log file with a sparse timestamp to byte offset index"""
+
+    def __init__(
+        self, path_to_file, sample_interval=_DEFAULT_SAMPLE_INTERVAL, index_path=None
+    ):
+        """
+        Args:
+            path_to_file: path of the log file
+            sample_interval: bytes between index samples
+            index_path: sidecar file caching the index (default: path_to_file + ".idx"),
+                False to neither load nor store it
+
+        Raises:
+            OSError: the log could not be opened or mapped
+        """
+        self._pathFile = os.fspath(path_to_file)
+        self._sampleInterval = sample_interval
+        if index_path is None:
+            index_path = self._pathFile + ".idx"
+        self._indexPath = index_path
+        self._timestamp_of = LogTimestampReader()
+        self._file = open(self._pathFile, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._size = stat.st_size
+        self._mmap = None
+        if self._size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._headChecksum = zlib.crc32(self._head())
+        self._timestamps = array.array("d")
+        self._offsets = array.array("q")
+        self._bytesSampled = 0
+        if self._indexPath:
+            self._load_index()
+        if self._bytesSampled < self._size:
+            self._sample(self._bytesSampled)
+            if self._indexPath:
+                self._store_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    @property
+    def size(self):
+        """the size in bytes of the log when it was mapped"""
+        return self._size
+
+    @property
+    def sample_count(self):
+        return len(self._offsets)
+
+    def _head(self):
+        if self._mmap is None:
+            return b""
+        return self._mmap[:_HEAD_CHECKSUM_SIZE]
+
+    # index
+    def _header_at_or_after(self, offset, limit):
+        """return (timestamp, offset) of the first log header starting in [offset, limit)
+
+        offset must be the start of a line
+        """
+        mm = self._mmap
+        while offset < limit:
+            if mm[offset : offset + 1] == b"[":
+                header = mm[offset : offset + TIMESTAMP_HEADER_LENGTH]
+                timestamp = self._timestamp_of(header)
+                if timestamp is not None:
+                    return timestamp, offset
+            end_of_line = mm.find(b"\n", offset, limit)
+            if end_of_line < 0:
+                break
+            offset = end_of_line + 1
+        return None, limit
+
+    def _sample(self, start):
+        # add samples covering [start, size)
+        mm = self._mmap
+        offset = start
+        while offset < self._size:
+            if offset and mm[offset - 1 : offset] != b"\n":
+                end_of_line = mm.find(b"\n", offset)
+                if end_of_line < 0:
+                    break
+                offset = end_of_line + 1
+            timestamp, header_offset = self._header_at_or_after(
+                offset, min(self._size, offset + self._sampleInterval)
+            )
+            if timestamp is not None and (
+                not self._offsets or header_offset > self._offsets[-1]
+            ):
+                self._timestamps.append(timestamp)
+                self._offsets.append(header_offset)
+            offset += self._sampleInterval
+        self._bytesSampled = self._size
+
+    def _load_index(self):
+        try:
+            with open(self._indexPath, "rb") as f:
+                header = f.read(_INDEX_HEADER.size)
+                if len(header) < _INDEX_HEADER.size:
+                    return
+                (
+                    magic,
+                    sample_interval,
+                    device,
+                    inode,
+                    head_checksum,
+                    bytes_sampled,
+                    count,
+                ) = _INDEX_HEADER.unpack(header)
+                if (
+                    magic != _INDEX_MAGIC
+                    or sample_interval != self._sampleInterval
+                    or (device, inode) != self._identity
+                    or bytes_sampled > self._size
+                    or bytes_sampled < _HEAD_CHECKSUM_SIZE  # sampling again is cheap
+                    or head_checksum != self._headChecksum
+                ):
+                    return  # another file, or this one was truncated or rewritten
+                timestamps = array.array("d")
+                offsets = array.array("q")
+                timestamps.fromfile(f, count)
+                offsets.fromfile(f, count)
+        except FileNotFoundError:
+            return
+        except (OSError, EOFError) as e:
+            file_logger.warning(f"ignoring unreadable index {self._indexPath}: {e}")
+            return
+        self._timestamps = timestamps
+        self._offsets = offsets
+        self._bytesSampled = bytes_sampled
+
+    def _store_index(self):
+        # write to a temporary file and rename so a reader never sees half an index
+        temporary_path = f"{self._indexPath}.tmp"
+        try:
+            with open(temporary_path, "wb") as f:
+                f.write(
+                    _INDEX_HEADER.pack(
+                        _INDEX_MAGIC,
+                        self._sampleInterval,
+                        *self._identity,
+                        self._headChecksum,
+                        self._bytesSampled,
+                        len(self._offsets),
+                    )
+                )
+                self._timestamps.tofile(f)
+                self._offsets.tofile(f)
+            os.replace(temporary_path, self._indexPath)
+        except OSError as e:
+            # e.g. a read only archive directory: the index is only a cache
+            file_logger.info(f"could not store index {self._indexPath}: {e}")
+
+    # seeking
+    def offset_of(self, when, after=False):
+        """return the byte offset of the first log line timestamped at or after when
+
+        Args:
+            when: epoch seconds or a datetime
+            after: find the first line timestamped strictly after when instead
+
+        Returns:
+            a byte offset, the size of the log when no line qualifies
+        """
+        when = _as_epoch(when)
+        if self._mmap is None:
+            return 0
+        if after:
+            i = bisect.bisect_right(self._timestamps, when)
+        else:
+            i = bisect.bisect_left(self._timestamps, when)
+        # every sample before i precedes when, so start scanning at the last of them
+        offset = self._offsets[i - 1] if i > 0 else 0
+        limit = self._offsets[i] if i < len(self._offsets) else self._size
+        while offset < limit:
+            timestamp, offset = self._header_at_or_after(offset, limit)
+            if timestamp is None:
+                break
+            if timestamp > when or (not after and timestamp == when):
+                return offset
+            offset = self._mmap.find(b"\n", offset, limit) + 1 or limit
+        return limit
+
+    def lines(self, since=None, until=None):
+        """yield the lines (with their newline) logged between since and until inclusive
+
+        Args:
+            since: epoch seconds or a datetime, None for the start of the log
+            until: epoch seconds or a datetime, None for the end of the log
+        """
+        if self._mmap is None:
+            return
+        start = 0 if since is None else self.offset_of(since)
+        end = self._size if until is None else self.offset_of(until, after=True)
+        mm = self._mmap
+        while start < end:
+            block_end = min(end, start + _READ_BLOCK_SIZE)
+            if block_end < end:
+                # end the block on a line boundary
+                newline = mm.rfind(b"\n", start, block_end)
+                if newline >= 0:
+                    block_end = newline + 1
+                else:
+                    block_end = mm.find(b"\n", block_end, end) + 1 or end
+            lines = mm[start:block_end].decode("utf-8", errors="replace").split("\n")
+            last = lines.pop()
+            for line in lines:
+                yield line + "\n"
+            if last:
+                yield last  # the incomplete last line of the log
+            start = block_end
+
+
+if __name__ == "__main__":
+    import sys
+
+    with MappedLogReader(sys.argv[1]) as reader:
+        since = datetime.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+        until = datetime.fromisoformat(sys.argv[3]) if len(sys.argv) > 3 else None
+        for line in reader.lines(since, until):
+            print(line, end="")
@@ -0,0 +1,343 @@
+# mergedqueue.py
+"""tail the golemsp log together with exe unit logs, merged by timestamp
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+exports MergedLogQueue, a FileQueue for the main golemsp log that can be told
+to follow further log files and whole directories of them (e.g. the log
+directory of each exe unit). a separate process tails every source and merges
+their lines on a heap keyed by timestamp.
+
+lines are held back for a bounded reorder window: a line is released once a line
+logged window seconds later was read from any source, or once it was held window
+seconds, whichever comes first. a line arriving later than that is released at
+once, out of order. a line without a timestamp (e.g. the continuation of a multi
+line message) stays with the line before it from the same source.
+
+every line is a TaggedLine whose source names the log it came from.
+"""
+
+from pathlib import Path
+import heapq
+import itertools
+import multiprocessing
+import os
+import time
+
+from utils.mylogger import file_logger
+from .filequeue import ReadLineBuffer
+from .filewatch import IN_CREATE, IN_MODIFY, IN_MOVED_TO
+from .logtimestamp import LogTimestampReader
+from .transport import TaggedLine, create_transport
+
+PRIMARY_SOURCE = "golemsp"
+
+_DEFAULT_REORDER_WINDOW = 0.5  # seconds
+_MAX_HELD_LINES = 100000  # beyond this the oldest lines are released regardless
+_MAX_CHUNKS_PER_READ = 16  # per source and pass, so no source starves the others
+_SOURCE_IDLE_TIMEOUT = 300.0  # seconds after which a quiet directory is dropped
+_DIRECTORY_MASK = IN_CREATE | IN_MOVED_TO | IN_MODIFY
+
+
+class _MergeSource:
+    # one tailed log file and the lines read from it but not yet merged
+
+    def __init__(self, name, binary_file, path_to_file, bytes_read=None):
+        self.name = name
+        self.lines = []
+        self.reader = ReadLineBuffer(
+            binary_file, path_to_file, self.lines.extend, bytes_read
+        )
+        self.last_timestamp = None
+        self.open_group = None  # the held group continuation lines are added to
+        self.reopened = False
+
+    def read(self):
+        if self.reader.read_available(_MAX_CHUNKS_PER_READ):
+            return True
+        # at EOF: follow a rotated or truncated log
+        self.reopened = self.reader.reopen_if_replaced()
+        return self.reopened
+
+    def close(self):
+        self.reader.target_binary_file.close()
+
+
+class _MergeDirectory:
+    # a directory whose log files (present and future) are merged
+
+    def __init__(self, name, path_to_directory):
+        self.name = name
+        self.path = Path(path_to_directory)
+        self.sources = dict()  # file name -> _MergeSource
+        self.watch = None  # the directory's watch descriptor once it is watched
+        self.last_data_time = time.monotonic()
+
+    def scan(self):
+        # start following files that appeared since the last scan
+        try:
+            entries = list(os.scandir(self.path))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name in self.sources or not entry.is_file():
+                continue
+            try:
+                binary_file = open(entry.path, "rb", buffering=0)
+            except OSError:
+                continue
+            self.sources[entry.name] = _MergeSource(
+                f"{self.name}:{Path(entry.name).stem}", binary_file, Path(entry.path)
+            )
+
+    def close(self):
+        for source in self.sources.values():
+            source.close()
+
+
+class _Merger:
+    """functor run in a separate process to tail and merge the sources"""
+
+    def __init__(
+        self,
+        binary_file,
+        path_to_file,
+        shared_queue,
+        commands,
+        bytes_read,
+        backlog_loaded,
+        reorder_window,
+    ):
+        self.shared_queue = shared_queue
+        self.commands = commands
+        self.backlog_loaded = backlog_loaded
+        self.reorder_window = reorder_window
+        self._primary = _MergeSource(
+            PRIMARY_SOURCE, binary_file, Path(path_to_file), bytes_read
+        )
+        self._files = []  # _MergeSource added one by one
+        self._directories = []
+        self._heap = []  # (timestamp, sequence, source, lines, arrival time)
+        self._heldLineCount = 0
+        self._sequence = itertools.count()
+        self._newestTimestamp = float("-inf")
+        self._timestamp_of = LogTimestampReader()
+        self._watcher = None
+
+    def _watch(self, path, mask=None):
+        # return the watch descriptor of path, -1 under a polling watcher and
+        # None if path could not be watched
+        if not hasattr(self._watcher, "add_watch"):
+            return -1
+        try:
+            if mask is None:
+                return self._watcher.add_watch(path)
+            return self._watcher.add_watch(path, mask)
+        except OSError:
+            return None
+
+    def _unwatch(self, wd):
+        if wd is not None and wd >= 0:
+            self._watcher.remove_watch(wd)
+
+    def _apply_commands(self):
+        while not self.commands.empty():
+            kind, path, name = self.commands.get()
+            if kind == "directory":
+                self._directories.append(_MergeDirectory(name, path))
+                continue
+            try:
+                binary_file = open(path, "rb", buffering=0)
+            except OSError as e:
+                file_logger.info(f"not merging {path}: {e}")
+                continue
+            self._files.append(_MergeSource(name, binary_file, Path(path)))
+            self._watch(path)
+
+    def _hold(self, source, now):
+        # move the lines read from source onto the heap, grouped by log message
+        for line in source.lines:
+            timestamp = self._timestamp_of(line)
+            if timestamp is None:
+                if source.open_group is not None:
+                    source.open_group.append(line)
+                    self._heldLineCount += 1
+                    continue
+                timestamp = source.last_timestamp
+                if timestamp is None:
+                    timestamp = self._newestTimestamp
+            else:
+                source.last_timestamp = timestamp
+                if timestamp > self._newestTimestamp:
+                    self._newestTimestamp = timestamp
+            group = [line]
+            source.open_group = group
+            heapq.heappush(
+                self._heap, (timestamp, next(self._sequence), source, group, now)
+            )
+            self._heldLineCount += 1
+        source.lines.clear()
+
+    def _release(self, release_all=False):
+        """queue the lines due, returning the seconds until the next one is due"""
+        now = time.monotonic()
+        watermark = self._newestTimestamp - self.reorder_window
+        batch = []
+        while self._heap:
+            timestamp, _, source, group, arrival = self._heap[0]
+            if not (
+                release_all
+                or timestamp <= watermark
+                or now - arrival >= self.reorder_window
+                or self._heldLineCount > _MAX_HELD_LINES
+            ):
+                break
+            heapq.heappop(self._heap)
+            if source.open_group is group:
+                source.open_group = None
+            self._heldLineCount -= len(group)
+            name = source.name
+            batch.extend(TaggedLine(line, name) for line in group)
+        if batch:
+            self.shared_queue.put_lines(batch)
+        if self._heap:
+            return max(0.01, self._heap[0][4] + self.reorder_window - now)
+        return None
+
+    def _read_directories(self, now):
+        read_any = False
+        for directory in list(self._directories):
+            if directory.watch is None and directory.path.is_dir():
+                directory.watch = self._watch(directory.path, _DIRECTORY_MASK)
+            directory.scan()
+            for source in directory.sources.values():
+                if source.read():
+                    read_any = True
+                    directory.last_data_time = now
+                    self._hold(source, now)
+            if now - directory.last_data_time > _SOURCE_IDLE_TIMEOUT:
+                # the exe unit is long gone
+                self._unwatch(directory.watch)
+                directory.close()
+                self._directories.remove(directory)
+        return read_any
+
+    def __call__(self):
+        self._watcher = self._primary.reader.create_watcher()
+        while True:
+            self._apply_commands()
+            now = time.monotonic()
+            primary_read = self._primary.read()
+            if self._primary.reopened:
+                self._watch(self._primary.reader.path_to_file)
+            if primary_read:
+                self._hold(self._primary, now)
+            read_any = primary_read
+            for source in self._files:
+                if source.read():
+                    read_any = True
+                    self._hold(source, now)
+            if self._read_directories(now):
+                read_any = True
+            if not primary_read and not self.backlog_loaded.is_set():
+                # everything the log held is read, do not hold back its last lines
+                self._release(release_all=True)
+                self.backlog_loaded.set()
+            timeout = self._release()
+            if not read_any:
+                self._watcher.wait(timeout=1.0 if timeout is None else min(timeout, 1.0))
+
+
+class MergedLogQueue:
+    """tail a golemsp log and further logs, merged by timestamp into one queue"""
+
+    def __init__(
+        self,
+        path_to_file,
+        reorder_window=_DEFAULT_REORDER_WINDOW,
+        transport="queue",
+    ):
+        """
+        Args:
+            path_to_file: the main golemsp log (its lines are tagged PRIMARY_SOURCE)
+            reorder_window: seconds a line may be held back to merge it in order
+            transport: "queue", "ringbuffer" or a transport instance (see
+                transport.create_transport)
+        """
+        self._pathFile = Path(path_to_file)
+        self._queueShared = create_transport(transport)
+        self._commands = multiprocessing.SimpleQueue()
+        fileOpen = self._pathFile.open(mode="rb", buffering=0)
+        self._backlogSize = os.fstat(fileOpen.fileno()).st_size
+        self._bytesRead = multiprocessing.Value("q", 0)
+        self._backlogLoaded = multiprocessing.Event()
+        self._multiprocess = multiprocessing.Process(
+            target=_Merger(
+                fileOpen,
+                self._pathFile,
+                self._queueShared,
+                self._commands,
+                self._bytesRead,
+                self._backlogLoaded,
+                reorder_window,
+            ),
+            daemon=True,
+        )
+        self._multiprocess.start()
+        fileOpen.close()  # the merging process has its own copy
+
+    def add_source_file(self, path, name):
+        """merge the lines of another log file, tagged name, from its start"""
+        self._commands.put(("file", str(path), name))
+
+    def add_source_directory(self, path, name):
+        """merge every log file in a directory (including files created later)
+
+        lines are tagged "<name>:<file name without extension>". a directory that
+        has had no new data for a while is dropped.
+        """
+        self._commands.put(("directory", str(path), name))
+
+    def from_primary(self, line):
+        """whether line was read from the main golemsp log"""
+        return getattr(line, "source", PRIMARY_SOURCE) == PRIMARY_SOURCE
+
+    @property
+    def backlog_size(self):
+        """the size in bytes of the main log when it was opened"""
+        return self._backlogSize
+
+    @property
+    def backlog_loaded(self):
+        """true once the main log was read (and queued) up to its first EOF"""
+        return self._backlogLoaded.is_set()
+
+    def backlog_progress(self):
+        """fraction of the main log's backlog read so far (0.0 to 1.0)"""
+        if self._backlogLoaded.is_set() or self._backlogSize == 0:
+            return 1.0
+        return min(1.0, self._bytesRead.value / self._backlogSize)
+
+    def get_nowait(self):
+        """call get_nowait on wrapped Queue
+        Raises:
+            queue.Empty on an empty queue
+        """
+        return self._queueShared.get_nowait()
+
+    def get_batch(self, max_lines=10000, max_wait=0.0):
+        """return up to max_lines queued lines (see BatchQueue.get_batch)"""
+        return self._queueShared.get_batch(max_lines, max_wait)
+
+
+if __name__ == "__main__":
+    import sys
+
+    mergedQueue = MergedLogQueue(sys.argv[1])
+    for path in sys.argv[2:]:
+        mergedQueue.add_source_directory(path, Path(path).name)
+
+    while True:
+        for line in mergedQueue.get_batch(max_wait=0.1):
+            print(f"{line.source}| {line}", end="")
@@ -4,30 +4,46 @@
 author: krunch3r (KJM github.com/krunch3r76)
 license: General Poetic License (GPL3)
 
-ProcessQueue utilizes a multiprocess.Queue as a shared data structure that
-is written to from a subprocess instantiated in the multiprocess thread.
-The module implements a custom ProtocolFactory (via the asyncio subprocess
-routines) to intercept data output by the subprocess into a line buffer
-which is emptied unto the shared queue whenever a newline is encountered.
+ProcessQueue utilizes a BatchQueue (a multiprocess.Queue of line lists) as a
+shared data structure that is written to from a subprocess instantiated in the
+multiprocess thread. The module implements a custom ProtocolFactory (via the
+asyncio subprocess routines) to intercept data output by the subprocess into a
+line buffer; the complete lines of each chunk of output are put unto the shared
+queue as one batch.
 
 ProcessQueue is instantiated with the command line that will execute
 in the multiprocess-subprocess enclave immediately and indepedently
 of any additional interaction. The queue can be de-queued or popped
 to retrieve the lines currently queued at any given time via the
-ProcessQueue.get_nowait() method. Consumers must handle two kinds of
+ProcessQueue.get_nowait() method, or drained in bulk via
+ProcessQueue.get_batch(). Consumers must handle two kinds of
 exceptions: the standard queue.Empty exception indicating that presently
 there is nothing to read from the queue and the processqueue.ProcessTerminated
 exception indicating that not only is the queue empty but the process has
 been terminated.
+
+Optionally the raw output is also appended to an archive file from the
+multiprocess enclave, and ProcessQueue.terminate() forwards an interrupt to the
+command (and the children it spawned) before resorting to a kill.
 """
 
 
 import asyncio
+import codecs
+import os
+import re
+import signal
 import subprocess
 import io
 import queue  # except queue.Empty
 import multiprocessing
 
+from .linebuffer import LineBuffer
+from .transport import create_transport
+
+
+_ANSI_ESCAPE_PATTERN = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+
 
 class ProcessTerminated(Exception):
     """indicate that an empty queue is no longer readable as it will never be filled further"""
@@ -41,26 +57,46 @@ class _MySubprocessProtocol(asyncio.SubprocessProtocol):
 
     parses data into lines whilst buffering incomplete lines
 
-    Currently the file descriptor is treated indiscimrinately so that stderr and stdout
-    are considered part of the same output. Assumes no interleaving before complete
-    outputs! REVIEW pipe_data_received
+    Each file descriptor (stdout, stderr) has its own incremental utf-8 decoder and
+    line buffer so output interleaved between them is never stitched into one line
+    and a multi-byte character split across reads is decoded intact.
     """
 
-    def __init__(self, *args, shared_queue, **kwargs):
-        """initializes to reference the shared queue and a fresh linebuffer memory stream
+    def __init__(
+        self, *args, shared_queue, archive_file=None, strip_ansi=False, **kwargs
+    ):
+        """initializes to reference the shared queue and an empty set of per fd line buffers
 
         Args:
-            shared_queue: the interprocess python queue
+            shared_queue: the interprocess BatchQueue
+            archive_file: optional binary file to which raw output is appended
+            strip_ansi: flag to strip ansi escape codes before queueing lines
         """
         self._queue = shared_queue
-        self._linebuffer = io.StringIO()
+        self._linebuffers = dict()  # fd -> (incremental decoder, LineBuffer)
+        self._archive_file = archive_file
+        self._strip_ansi = strip_ansi
+        self.finished = asyncio.get_event_loop().create_future()
         super().__init__(*args, **kwargs)
 
+    def _put_lines(self, lines):
+        if self._strip_ansi:
+            lines = [_ANSI_ESCAPE_PATTERN.sub("", line) for line in lines]
+        self._queue.put_lines(lines)
+
+    def _linebuffer_for(self, fd):
+        try:
+            return self._linebuffers[fd]
+        except KeyError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            self._linebuffers[fd] = (decoder, LineBuffer())
+            return self._linebuffers[fd]
+
     def pipe_data_received(self, fd, data):
         """buffer incomplete and queue lines from process's output(s)
 
-        reads each byte from the data into a memory buffer and flushing complete lines
-        into the class's shared queue
+        decodes the whole chunk and splits it into lines in bulk, flushing the complete
+        lines into the class's shared queue as one batch per call
 
         Args:
             fd: the file descriptor providing the data from the transport (e.g. 1, 2)
@@ -72,26 +108,40 @@ class _MySubprocessProtocol(asyncio.SubprocessProtocol):
         Raises:
             None
         """
-        for byte in data:
-            char = chr(byte)
-            if char != "\n":
-                self._linebuffer.write(char)
-            else:
-                self._queue.put_nowait(self._linebuffer.getvalue())
-                self._linebuffer.close()
-                self._linebuffer = io.StringIO()
+        if self._archive_file is not None:
+            self._archive_file.write(data)
+        decoder, linebuffer = self._linebuffer_for(fd)
+        self._put_lines(linebuffer.feed(decoder.decode(data)))
 
         super().pipe_data_received(fd, data)  # follow internal paths
 
+    def pipe_connection_lost(self, fd, exc):
+        # queue whatever incomplete line remains once a pipe closes
+        if fd in self._linebuffers:
+            decoder, linebuffer = self._linebuffers.pop(fd)
+            linebuffer.feed(decoder.decode(b"", final=True))
+            self._put_lines(linebuffer.flush())
+        super().pipe_connection_lost(fd, exc)
+
+    def connection_lost(self, exc):
+        # the process has exited and all of its pipes are drained
+        if not self.finished.done():
+            self.finished.set_result(True)
+
 
-async def _tail_subprocess(shared_queue, cmdline):
+async def _tail_subprocess(
+    shared_queue, cmdline, shared_pid=None, archive_path=None, strip_ansi=False
+):
     """launches a command line in a subprocess
 
-    Launches then loops until the subprocess has terminated.
+    Launches then waits until the subprocess has terminated and its output is drained.
 
     Args:
         shared_queue: the shared queue with the main thread
         cmdline: the list of strings representing the full command to be run
+        shared_pid: optional multiprocessing.Value to publish the subprocess's pid
+        archive_path: optional path to which raw output is appended
+        strip_ansi: flag to strip ansi escape codes before queueing lines
 
     Returns:
         None
@@ -105,32 +155,63 @@ async def _tail_subprocess(shared_queue, cmdline):
     # )
     loop = asyncio.get_event_loop()
 
-    transport, _ = await loop.subprocess_exec(
-        lambda: _MySubprocessProtocol(shared_queue=shared_queue),
+    archive_file = None
+    if archive_path is not None:
+        # unbuffered: one write per chunk of output, nothing lost if killed
+        archive_file = open(archive_path, "ab", buffering=0)
+
+    popen_kwargs = dict()
+    if os.name == "posix":
+        # own process group so signals reach the command's children as well
+        popen_kwargs["start_new_session"] = True
+
+    transport, protocol = await loop.subprocess_exec(
+        lambda: _MySubprocessProtocol(
+            shared_queue=shared_queue,
+            archive_file=archive_file,
+            strip_ansi=strip_ansi,
+        ),
         *cmdline,
+        stdin=subprocess.DEVNULL,
+        **popen_kwargs,
     )
 
-    subproc = transport.get_extra_info("subprocess")  # popen instance
+    if shared_pid is not None:
+        shared_pid.value = transport.get_pid()
 
-    # loop
-    while subproc.poll() is None:
-        await asyncio.sleep(0.1)
+    try:
+        await protocol.finished
+    finally:
+        transport.close()
+        if archive_file is not None:
+            archive_file.close()
 
     # process has ended
 
 
-def _run_tail_subprocess_asynchronously(sharedQueue, cmdline):
+def _run_tail_subprocess_asynchronously(
+    sharedQueue, cmdline, sharedPid=None, archive_path=None, strip_ansi=False
+):
     """callback for multiprocessing.Process to launch run _tail_subprocess asynchronously
 
     Args:
         sharedQueue: the shared queue to which lines are added
         cmdline: the command line to run as by popen
+        sharedPid: multiprocessing.Value receiving the pid of the command
+        archive_path: optional path to which raw output is appended
+        strip_ansi: flag to strip ansi escape codes before queueing lines
 
     For windows compatibility, the callback needs to be defined for multiprocessing module
     to run a function asynchronously outside of an asynchronous context.
     """
 
-    asyncio.run(_tail_subprocess(sharedQueue, cmdline))
+    if os.name == "posix":
+        # the parent decides when the command is interrupted (see terminate). a
+        # handler rather than SIG_IGN so the command does not inherit the disposition
+        signal.signal(signal.SIGINT, lambda signum, frame: None)
+    asyncio.run(
+        _tail_subprocess(sharedQueue, cmdline, sharedPid, archive_path, strip_ansi)
+    )
 
 
 class ProcessQueue:
@@ -149,6 +230,9 @@ class ProcessQueue:
     def __init__(
         self,
         cmdline,
+        transport="queue",
+        archive_path=None,
+        strip_ansi=False,
     ):
         """inits ProcessQueue with a shared queue and invoked the function to launch the command
 
@@ -158,24 +242,73 @@ class ProcessQueue:
         Args:
             cmdline: a sequence (e.g. list) of text commands representing the full command line
                 to execute
+            transport: "queue", "ringbuffer" or a transport instance (see
+                transport.create_transport)
+            archive_path: optional path to which the raw output is appended in the
+                background
+            strip_ansi: flag to strip ansi escape codes before lines are queued
         """
 
-        self._queue = multiprocessing.Queue()
+        self._queue = create_transport(transport)
+        self._pid = multiprocessing.Value("i", 0)
 
         self._process = multiprocessing.Process(
             target=_run_tail_subprocess_asynchronously,
             args=(
                 self._queue,
                 cmdline,
+                self._pid,
+                archive_path,
+                strip_ansi,
             ),
             daemon=True,
         )
         self._process.start()
 
+    @property
+    def pid(self):
+        """the pid of the command once launched, otherwise None"""
+        return self._pid.value or None
+
+    def _signal_command(self, signum):
+        # signal the command's process group (posix) or the command itself
+        pid = self.pid
+        if pid is None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(pid, signum)
+            else:
+                os.kill(pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def terminate(self, timeout=10.0):
+        """interrupt the command and its children, killing them after timeout seconds
+
+        mirrors the shell script's cleanup: SIGINT is sent to the command's process
+        group, which is given up to timeout seconds to exit before SIGKILL.
+
+        Returns:
+            True if the command exited on the interrupt, False if it had to be killed
+        """
+        if not self._process.is_alive():
+            return True
+        interrupt = signal.SIGINT if os.name == "posix" else signal.SIGTERM
+        self._signal_command(interrupt)
+        self._process.join(timeout)
+        if self._process.is_alive():
+            if os.name == "posix":
+                self._signal_command(signal.SIGKILL)
+            self._process.kill()
+            self._process.join()
+            return False
+        return True
+
     def get_nowait(self):
         """returns a line from a queue or throws one of two exceptions
 
-        invokes multiprocessing.Queue.get_nowait() to get an available line element
+        invokes BatchQueue.get_nowait() to get an available line element
         from the queue but abstracts a thrown queue.Empty exception to throw a
         ProcessTerminated exception if appropriate in lieu.
 
@@ -196,6 +329,23 @@ class ProcessQueue:
         else:
             return line
 
+    def get_batch(self, max_lines=10000, max_wait=0.0):
+        """returns a list of up to max_lines lines or throws ProcessTerminated
+
+        see BatchQueue.get_batch for the waiting semantics.
+
+        Returns:
+            a (possibly empty) list of lines
+
+        Raises:
+            ProcessTerminated: the queue is empty and the process has terminated.
+        """
+        lines = self._queue.get_batch(max_lines, max_wait)
+        if not lines and self._process.exitcode is not None:
+            if self._queue.empty():
+                raise ProcessTerminated
+        return lines
+
 
 # example usage
 if __name__ == "__main__":
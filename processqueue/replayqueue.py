@@ -0,0 +1,170 @@
+# replayqueue.py
+"""replay a recorded log into a queue at the pace of its timestamps
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+exports ReplayQueue, a stand in for FileQueue (same lines, same get_nowait() and
+get_batch()) that reads a recorded golemsp log in a separate process and emits
+each line when its embedded timestamp comes due, scaled by a speed multiplier:
+1 replays in real time, 10 ten times faster and "max" as fast as possible. lines
+without a timestamp (e.g. the continuation lines of a multi line message) are
+emitted with the line before them. a gzip, xz or bzip2 compressed log is
+decompressed as it is replayed.
+
+ReplayQueue.lag(line) tells how late a consumer handles a replayed line compared
+to when it was due, to measure end to end lag under a reproducible load.
+"""
+
+from pathlib import Path
+import math
+import multiprocessing
+import re
+import time
+
+from .decompress import open_binary, iter_lines
+from .logtimestamp import LogTimestampReader
+from .transport import create_transport
+
+SPEED_MAX = "max"
+
+_READ_CHUNK_SIZE = 1 << 16
+_MAX_SLEEP = 0.25  # seconds, so a stop is noticed while waiting on a distant line
+_ANSI_ESCAPE_PATTERN = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+
+
+class _Replayer:
+    """functor run in a separate process to emit a log's lines on schedule"""
+
+    def __init__(
+        self, path_to_file, shared_queue, speed, start_wall, first_timestamp, finished
+    ):
+        self.path_to_file = path_to_file
+        self.shared_queue = shared_queue
+        self.speed = speed
+        self.start_wall = start_wall  # multiprocessing.Value
+        self.first_timestamp = first_timestamp  # multiprocessing.Value, nan until read
+        self.finished = finished  # multiprocessing.Event
+        self._timestamp_of = LogTimestampReader()
+
+    def _lines(self):
+        # a compressed log is decompressed as it is read
+        with open_binary(self.path_to_file) as f:
+            yield from iter_lines(iter(lambda: f.read(_READ_CHUNK_SIZE), b""))
+
+    def __call__(self):
+        first_timestamp = None
+        self.start_wall.value = time.time()
+        batch = []
+        for line in self._lines():
+            line = _ANSI_ESCAPE_PATTERN.sub("", line) if line.strip() else ""
+            if self.speed != SPEED_MAX:
+                timestamp = self._timestamp_of(line)
+                if timestamp is not None:
+                    if first_timestamp is None:
+                        first_timestamp = timestamp
+                        # published before the line is, for ReplayQueue.lag
+                        self.first_timestamp.value = timestamp
+                    due = (
+                        self.start_wall.value
+                        + (timestamp - first_timestamp) / self.speed
+                    )
+                    wait = due - time.time()
+                    if wait > 0:
+                        # everything before this line is due: emit it, then wait
+                        self.shared_queue.put_lines(batch)
+                        batch = []
+                        while wait > 0:
+                            time.sleep(min(wait, _MAX_SLEEP))
+                            wait = due - time.time()
+            batch.append(line)
+            if len(batch) >= 5000:
+                self.shared_queue.put_lines(batch)
+                batch = []
+        self.shared_queue.put_lines(batch)
+        self.finished.set()
+
+
+class ReplayQueue:
+    """emit the lines of a recorded log according to their timestamps"""
+
+    def __init__(self, path_to_file, speed=1.0, transport="queue"):
+        """
+        Args:
+            path_to_file: a path as input to a python pathlib.Path object
+            speed: replay speed multiplier (e.g. 1, 10) or "max" for no pacing
+            transport: "queue", "ringbuffer" or a transport instance (see
+                transport.create_transport)
+
+        Raises:
+            ValueError: speed is neither positive nor "max"
+            FileNotFoundError: the log does not exist
+        """
+        if speed != SPEED_MAX:
+            speed = float(speed)
+            if speed <= 0:
+                raise ValueError(f"speed must be positive or {SPEED_MAX!r}")
+        self._pathFile = Path(path_to_file)
+        if not self._pathFile.is_file():
+            raise FileNotFoundError(str(self._pathFile))
+        self._speed = speed
+        self._queueShared = create_transport(transport)
+        self._startWall = multiprocessing.Value("d", 0.0)
+        # the timestamp of the log's first timestamped line, the replay's origin
+        self._firstTimestamp = multiprocessing.Value("d", math.nan)
+        self._finished = multiprocessing.Event()
+        self._timestamp_of = LogTimestampReader()
+        self._multiprocess = multiprocessing.Process(
+            target=_Replayer(
+                self._pathFile,
+                self._queueShared,
+                speed,
+                self._startWall,
+                self._firstTimestamp,
+                self._finished,
+            ),
+            daemon=True,
+        )
+        self._multiprocess.start()
+
+    @property
+    def finished(self):
+        """true once every line of the log has been emitted and read"""
+        return self._finished.is_set() and self._queueShared.empty()
+
+    def lag(self, line):
+        """seconds between when a replayed line was due and now
+
+        Returns:
+            the lag in seconds, or None for lines without a timestamp and at "max" speed
+        """
+        if self._speed == SPEED_MAX:
+            return None
+        timestamp = self._timestamp_of(line)
+        first_timestamp = self._firstTimestamp.value
+        if timestamp is None or math.isnan(first_timestamp):
+            return None
+        due = self._startWall.value + (timestamp - first_timestamp) / self._speed
+        return time.time() - due
+
+    def get_nowait(self):
+        """call get_nowait on wrapped Queue
+        Raises:
+            queue.Empty on an empty queue
+        """
+        return self._queueShared.get_nowait()
+
+    def get_batch(self, max_lines=10000, max_wait=0.0):
+        """return up to max_lines queued lines (see BatchQueue.get_batch)"""
+        return self._queueShared.get_batch(max_lines, max_wait)
+
+
+if __name__ == "__main__":
+    import sys
+    import queue
+
+    replayQueue = ReplayQueue(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else 1.0)
+
+    while not replayQueue.finished:
+        for line in replayQueue.get_batch(max_wait=0.1):
+            print(line, end="")
@@ -0,0 +1,333 @@
+# ringbuffer.py
+"""single producer, single consumer ring buffer of lines in shared memory
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+RingBufferQueue is a drop-in alternative to BatchQueue (see transport.py) that
+avoids pickling and the feeder thread of a multiprocessing.Queue. lines are
+stored as length prefixed utf-8 records in a multiprocessing.shared_memory block:
+
+    [ write_pos | read_pos | dropped | reserved ... ][ data (capacity bytes) ... ]
+
+a record is a 4 byte length followed by the utf-8 text. when the high bit of the
+length is set the text is preceded by a 2 byte length and the utf-8 source id of
+a TaggedLine.
+
+write_pos and read_pos count bytes since creation and only ever grow, so the
+buffer is empty when they are equal and holds write_pos - read_pos bytes
+otherwise. the producer alone advances write_pos and the consumer alone advances
+read_pos, except under the "drop-oldest" policy where both sides serialize on a
+lock because the producer discards records from the consumer's end. a waiting
+consumer (for lines) or producer (for room, under "block") sleeps on an event
+the other side sets after writing or reading records.
+
+overflow policies, applied when a record does not fit:
+    "block": the producer waits for the consumer to make room
+    "drop-oldest": the oldest records are discarded to make room
+    "count-and-drop": the new record is discarded
+dropped records are counted in shared memory (see dropped_count).
+"""
+
+import collections
+import multiprocessing
+from multiprocessing import shared_memory
+import queue  # queue.Empty
+import struct
+import time
+import weakref
+
+from .transport import TaggedLine
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop-oldest"
+OVERFLOW_COUNT_AND_DROP = "count-and-drop"
+_OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_COUNT_AND_DROP)
+
+_HEADER = struct.Struct("<QQQ")  # write_pos, read_pos, dropped
+_HEADER_SIZE = 64  # keep the data region cache line aligned
+_WRITE_POS_OFFSET = 0
+_READ_POS_OFFSET = 8
+_DROPPED_OFFSET = 16
+_POSITION = struct.Struct("<Q")
+_RECORD_LENGTH = struct.Struct("<I")
+_TAG_LENGTH = struct.Struct("<H")
+_TAGGED_FLAG = 0x80000000
+
+_DEFAULT_CAPACITY = 1 << 24  # 16 MiB
+
+
+def _unlink_segment(shm):
+    # finalizer for the creating side
+    try:
+        shm.close()
+        shm.unlink()
+    except (FileNotFoundError, BufferError):
+        pass
+
+
+def _encode_record(line):
+    payload = line.encode("utf-8", errors="replace")
+    source = getattr(line, "source", None)
+    if source is None:
+        return _RECORD_LENGTH.pack(len(payload)) + payload
+    tag = str(source).encode("utf-8", errors="replace")[:0xFFFF]
+    body = _TAG_LENGTH.pack(len(tag)) + tag + payload
+    return _RECORD_LENGTH.pack(len(body) | _TAGGED_FLAG) + body
+
+
+def _decode_tagged_record(data, start, end):
+    (tag_length,) = _TAG_LENGTH.unpack_from(data, start)
+    text_start = start + _TAG_LENGTH.size + tag_length
+    source = data[start + _TAG_LENGTH.size : text_start].decode("utf-8")
+    return TaggedLine(data[text_start:end].decode("utf-8"), source)
+
+
+class RingBufferQueue:
+    """length prefixed utf-8 records in a shared memory ring exposing the BatchQueue api"""
+
+    def __init__(self, capacity=_DEFAULT_CAPACITY, overflow=OVERFLOW_BLOCK):
+        """
+        Args:
+            capacity: size in bytes of the data region
+            overflow: one of "block", "drop-oldest", "count-and-drop"
+
+        Raises:
+            ValueError: on an unknown overflow policy
+        """
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy {overflow!r}")
+        self._capacity = capacity
+        self._overflow = overflow
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=_HEADER_SIZE + capacity
+        )
+        _HEADER.pack_into(self._shm.buf, 0, 0, 0, 0)
+        self._lock = (
+            multiprocessing.Lock() if overflow == OVERFLOW_DROP_OLDEST else None
+        )
+        # set by the producer after writing records and by the consumer after
+        # reading them, to wake the other side
+        self._written = multiprocessing.Event()
+        self._read = multiprocessing.Event()
+        self._pending = collections.deque()
+        self._finalizer = weakref.finalize(self, _unlink_segment, self._shm)
+
+    # pickling for spawned processes: attach to the existing segment by name
+    def __getstate__(self):
+        return (
+            self._shm.name,
+            self._capacity,
+            self._overflow,
+            self._lock,
+            self._written,
+            self._read,
+        )
+
+    def __setstate__(self, state):
+        (
+            name,
+            self._capacity,
+            self._overflow,
+            self._lock,
+            self._written,
+            self._read,
+        ) = state
+        self._shm = shared_memory.SharedMemory(name=name)
+        try:
+            # only the creator owns (and unlinks) the segment
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+        self._pending = collections.deque()
+        self._finalizer = None
+
+    # shared header fields
+    def _load(self, offset):
+        return _POSITION.unpack_from(self._shm.buf, offset)[0]
+
+    def _store(self, offset, value):
+        _POSITION.pack_into(self._shm.buf, offset, value)
+
+    @property
+    def dropped_count(self):
+        """the number of records discarded by the overflow policy"""
+        return self._load(_DROPPED_OFFSET)
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    # raw data region access, wrapping at capacity
+    def _copy_in(self, position, data):
+        buf = self._shm.buf
+        offset = position % self._capacity
+        first = min(len(data), self._capacity - offset)
+        buf[_HEADER_SIZE + offset : _HEADER_SIZE + offset + first] = data[:first]
+        if first < len(data):
+            buf[_HEADER_SIZE : _HEADER_SIZE + len(data) - first] = data[first:]
+
+    def _copy_out(self, position, length):
+        buf = self._shm.buf
+        offset = position % self._capacity
+        first = min(length, self._capacity - offset)
+        data = bytes(buf[_HEADER_SIZE + offset : _HEADER_SIZE + offset + first])
+        if first < length:
+            data += bytes(buf[_HEADER_SIZE : _HEADER_SIZE + length - first])
+        return data
+
+    # producer side
+    def _discard_oldest(self, needed, write_pos):
+        # advance read_pos over whole records until needed bytes are free (lock held)
+        read_pos = self._load(_READ_POS_OFFSET)
+        dropped = 0
+        while self._capacity - (write_pos - read_pos) < needed:
+            (length,) = _RECORD_LENGTH.unpack(
+                self._copy_out(read_pos, _RECORD_LENGTH.size)
+            )
+            read_pos += _RECORD_LENGTH.size + (length & ~_TAGGED_FLAG)
+            dropped += 1
+        self._store(_READ_POS_OFFSET, read_pos)
+        self._store(_DROPPED_OFFSET, self._load(_DROPPED_OFFSET) + dropped)
+
+    def _write_records(self, chunk):
+        write_pos = self._load(_WRITE_POS_OFFSET)
+        self._copy_in(write_pos, chunk)
+        self._store(_WRITE_POS_OFFSET, write_pos + len(chunk))
+        self._written.set()
+
+    def _put_record(self, record):
+        # place a single record that did not fit, applying the overflow policy
+        if len(record) > self._capacity:
+            self._store(_DROPPED_OFFSET, self._load(_DROPPED_OFFSET) + 1)
+            return
+        if self._overflow == OVERFLOW_BLOCK:
+            while True:
+                # clear before looking, so room made meanwhile is not missed
+                self._read.clear()
+                if self._free() >= len(record):
+                    break
+                self._read.wait()
+        elif self._overflow == OVERFLOW_COUNT_AND_DROP:
+            if self._free() < len(record):
+                self._store(_DROPPED_OFFSET, self._load(_DROPPED_OFFSET) + 1)
+                return
+        else:
+            with self._lock:
+                write_pos = self._load(_WRITE_POS_OFFSET)
+                self._discard_oldest(len(record), write_pos)
+                self._write_records(record)
+            return
+        self._write_records(record)
+
+    def _free(self):
+        return self._capacity - (
+            self._load(_WRITE_POS_OFFSET) - self._load(_READ_POS_OFFSET)
+        )
+
+    def put_lines(self, lines):
+        """append lines as records, copying as many as fit in one go"""
+        chunk = bytearray()
+        free = self._free()
+        for line in lines:
+            record = _encode_record(line)
+            if len(chunk) + len(record) <= free:
+                chunk += record
+                continue
+            if chunk:
+                self._locked_write(chunk)
+                chunk = bytearray()
+            self._put_record(record)
+            free = self._free()
+        if chunk:
+            self._locked_write(chunk)
+
+    def _locked_write(self, chunk):
+        if self._lock is not None:
+            with self._lock:
+                self._write_records(chunk)
+        else:
+            self._write_records(chunk)
+
+    def put_nowait(self, line):
+        self.put_lines([line])
+
+    # consumer side
+    def _read_available(self, max_lines):
+        # move up to max_lines records from the ring into the local pending deque
+        read_pos = self._load(_READ_POS_OFFSET)
+        available = self._load(_WRITE_POS_OFFSET) - read_pos
+        if available == 0:
+            return
+        data = self._copy_out(read_pos, available)
+        offset = 0
+        count = 0
+        unpack_from = _RECORD_LENGTH.unpack_from
+        while offset < available and count < max_lines:
+            (length,) = unpack_from(data, offset)
+            start = offset + _RECORD_LENGTH.size
+            if length & _TAGGED_FLAG:
+                offset = start + (length & ~_TAGGED_FLAG)
+                self._pending.append(_decode_tagged_record(data, start, offset))
+            else:
+                offset = start + length
+                self._pending.append(data[start:offset].decode("utf-8"))
+            count += 1
+        self._store(_READ_POS_OFFSET, read_pos + offset)
+        self._read.set()
+
+    def _refill(self, max_lines):
+        if self._lock is not None:
+            with self._lock:
+                self._read_available(max_lines)
+        else:
+            self._read_available(max_lines)
+
+    def get_nowait(self):
+        """return the next line
+
+        Raises:
+            queue.Empty: there is currently no line to read
+        """
+        if not self._pending:
+            self._refill(10000)
+            if not self._pending:
+                raise queue.Empty
+        return self._pending.popleft()
+
+    def get_batch(self, max_lines=10000, max_wait=0.0):
+        """return up to max_lines lines, waiting at most max_wait seconds for the first"""
+        deadline = time.monotonic() + max_wait
+        if len(self._pending) < max_lines:
+            self._refill(max_lines - len(self._pending))
+        while not self._pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # clear before looking, so records written meanwhile are not missed
+            self._written.clear()
+            self._refill(max_lines)
+            if not self._pending:
+                self._written.wait(remaining)
+                self._refill(max_lines)
+        take = min(max_lines, len(self._pending))
+        if take == len(self._pending):
+            lines = list(self._pending)
+            self._pending.clear()
+        else:
+            lines = [self._pending.popleft() for _ in range(take)]
+        return lines
+
+    def empty(self):
+        return not self._pending and self._load(_WRITE_POS_OFFSET) == self._load(
+            _READ_POS_OFFSET
+        )
+
+    def close(self):
+        """release this process's mapping (the creator also unlinks the segment)"""
+        if self._finalizer is not None:
+            self._finalizer()
+        else:
+            self._shm.close()
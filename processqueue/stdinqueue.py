@@ -1,12 +1,32 @@
-import multiprocessing
+# stdinqueue.py
+"""read text piped to stdin into a queue line by line
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+a thread reads stdin in large chunks as they become available, decodes them
+incrementally and splits them into lines in bulk onto a shared BatchQueue.
+
+so that an interactive (curses) interface can still run while stdin is a pipe,
+StdinQueue can move the pipe to a private descriptor and reattach descriptor 0
+to the controlling terminal (/dev/tty).
+"""
+
+import codecs
+import os
 import queue
-import io
+import re
 import sys
 import select
 import threading
 import time
 
 from utils.mylogger import console_logger, file_logger
+from .linebuffer import LineBuffer
+from .transport import BatchQueue
+
+_READ_CHUNK_SIZE = 1 << 16
+_ANSI_ESCAPE_PATTERN = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
 
 
 class _StdinListener:
@@ -14,58 +34,90 @@ class _StdinListener:
     a shared queue
     """
 
-    def __init__(self, shared_queue: multiprocessing.Queue, stop_event):
+    def __init__(self, shared_queue: BatchQueue, stop_event, fd, strip_ansi=False):
         """
         Args:
             shared_queue: asynchronous shared queue
+            stop_event: threading.Event to end reading
+            fd: the file descriptor of the pipe to read
+            strip_ansi: flag to strip ansi escape codes before queueing lines
         """
         self.shared_queue = shared_queue
-        self.buffer = io.StringIO()
         self.stop_event = stop_event
+        self.fd = fd
+        self.strip_ansi = strip_ansi
+        self.eof = threading.Event()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._lineBuffer = LineBuffer()
 
-    def _parse_buffer(self):
-        # split lines but preserve incomplete line
-        # future proofed in case stdin is not line buffered
-        self.buffer.seek(0)
-        current_line = self.buffer.readline()
-        while current_line.endswith("\n"):
-            self.shared_queue.put_nowait(current_line[:-1])
-            current_line = self.buffer.readline()
-        self.buffer.close()
-        self.buffer = io.StringIO()
-        self.buffer.write(current_line)  # put partial line back into new buffer
-
-    def read_stdin_line(self):
-        line = ""
-        while True:
-            # Non-blocking read from stdin
-            if sys.stdin in select.select([sys.stdin], [], [], 0.01)[0]:
-                chunk = sys.stdin.read(1)
-                if not chunk:
-                    break  # No more data to read
-                line += chunk
-                if chunk == "\n":
-                    self.buffer.write(line)
-                    self._parse_buffer()
-                    line = ""  # Reset the line for the next input
+    def _put_lines(self, lines):
+        if self.strip_ansi:
+            lines = [_ANSI_ESCAPE_PATTERN.sub("", line) for line in lines]
+        self.shared_queue.put_lines(lines)
+
+    def read_stdin_chunk(self):
+        # read whatever is available (up to a chunk) and queue the completed lines
+        chunk = os.read(self.fd, _READ_CHUNK_SIZE)
+        if not chunk:
+            # end of input: queue the incomplete line, if any
+            self._lineBuffer.feed(self._decoder.decode(b"", final=True))
+            self._put_lines(self._lineBuffer.flush())
+            self.eof.set()
+            return
+        self._put_lines(self._lineBuffer.feed(self._decoder.decode(chunk)))
 
     def __call__(self):
-        while True:
-            if self.stop_event.is_set():
-                break
-            # if ready:
-            self.read_stdin_line()
+        while not self.stop_event.is_set() and not self.eof.is_set():
+            # wait with a timeout so a stop request is noticed
+            if select.select([self.fd], [], [], 0.1)[0]:
+                self.read_stdin_chunk()
+
+
+def _reattach_stdin_to_tty():
+    """move the piped stdin to a new descriptor and put the terminal on descriptor 0
+
+    Returns:
+        the descriptor now referring to the original stdin pipe
+    """
+    pipe_fd = os.dup(0)
+    try:
+        tty_fd = os.open("/dev/tty", os.O_RDWR)
+    except OSError:
+        os.close(pipe_fd)
+        raise
+    os.dup2(tty_fd, 0)
+    os.close(tty_fd)
+    return pipe_fd
 
 
 class StdinQueue:
-    def __init__(self):
+    def __init__(self, reattach_tty=False, strip_ansi=False):
+        """
+        Args:
+            reattach_tty: when stdin is not a terminal, read the pipe from a private
+                descriptor and reattach stdin to /dev/tty (for curses)
+            strip_ansi: flag to strip ansi escape codes before adding a line to the queue
+
+        Raises:
+            OSError: reattach_tty was requested but there is no controlling terminal
+        """
         self.stop_event = threading.Event()
-        self._data = multiprocessing.Queue()
-        self._stdinListener = _StdinListener(self._data, self.stop_event)
-        self._thread = threading.Thread(target=self._stdinListener)
+        self._data = BatchQueue()
+        fd = sys.stdin.fileno()
+        if reattach_tty and not os.isatty(fd):
+            fd = _reattach_stdin_to_tty()
+        self._stdinListener = _StdinListener(
+            self._data, self.stop_event, fd, strip_ansi
+        )
+        self._thread = threading.Thread(target=self._stdinListener, daemon=True)
         # self._thread = ExceptableThread(target=self._stdinListener)
         self._thread.start()
 
+    @property
+    def closed(self):
+        """true once stdin reached end of file and every line has been read"""
+        return self._stdinListener.eof.is_set() and self._data.empty()
+
     def get_nowait(self):
         try:
             line = self._data.get_nowait()
@@ -74,6 +126,9 @@ class StdinQueue:
         else:
             return line
 
+    def get_batch(self, max_lines=10000, max_wait=0.0):
+        return self._data.get_batch(max_lines, max_wait)
+
 
 if __name__ == "__main__":
     stdinQueue = StdinQueue()
@@ -82,7 +137,8 @@ if __name__ == "__main__":
             time.sleep(0.01)
             next_line = stdinQueue.get_nowait()
         except queue.Empty:
-            pass
+            if stdinQueue.closed:
+                break
         except KeyboardInterrupt:
             stdinQueue.stop_event.set()
             print("joining", flush=True)
@@ -0,0 +1,127 @@
+# transport.py
+"""carry lines from a reading process to the consumer in batches
+
+author: krunch3r (KJM github.com/krunch3r76)
+license: General Poetic License (GPL3)
+
+BatchQueue wraps a multiprocessing.Queue whose items are lists of lines rather
+than single lines. a producer hands over everything it parsed from one read with
+a single put_lines() (one lock acquisition, one pickle, one pipe write) and the
+consumer drains thousands of lines per transport read with get_batch(). the
+line-at-a-time get_nowait() of a python Queue remains available and is served
+from a local buffer of the last batch received.
+
+lines are plain str, or TaggedLine (a str that also names its source) where a
+reader merges several sources into one queue.
+"""
+
+import collections
+import multiprocessing
+import queue  # queue.Empty
+import time
+
+
+class TaggedLine(str):
+    """a line of text that carries the id of the source it was read from"""
+
+    def __new__(cls, text, source):
+        line = super().__new__(cls, text)
+        line.source = source
+        return line
+
+    def __reduce__(self):
+        return (TaggedLine, (str(self), self.source))
+
+
+class BatchQueue:
+    """a multiprocessing.Queue of line batches exposing line and batch getters"""
+
+    def __init__(self, maxsize=0):
+        """
+        Args:
+            maxsize: maximum number of batches in flight (0 for unbounded)
+        """
+        self._queue = multiprocessing.Queue(maxsize)
+        self._pending = collections.deque()  # consumer side remainder of a batch
+
+    # producer side
+    def put_lines(self, lines):
+        """enqueue a sequence of lines as one batch (empty sequences are ignored)"""
+        if lines:
+            self._queue.put(list(lines))
+
+    def put_nowait(self, line):
+        # single line compatibility with multiprocessing.Queue
+        self._queue.put_nowait([line])
+
+    # consumer side
+    def get_nowait(self):
+        """return the next line
+
+        Raises:
+            queue.Empty: there is currently no line to read
+        """
+        if not self._pending:
+            self._pending.extend(self._queue.get_nowait())
+        return self._pending.popleft()
+
+    def get_batch(self, max_lines=10000, max_wait=0.0):
+        """return up to max_lines lines, waiting at most max_wait seconds for the first
+
+        once anything is available only batches already in the queue are drained,
+        so the call never waits on a partially filled result.
+
+        Returns:
+            a (possibly empty) list of lines
+        """
+        lines = []
+        deadline = time.monotonic() + max_wait
+        while len(lines) < max_lines:
+            if self._pending:
+                take = min(max_lines - len(lines), len(self._pending))
+                if take == len(self._pending):
+                    lines.extend(self._pending)
+                    self._pending.clear()
+                else:
+                    lines.extend(self._pending.popleft() for _ in range(take))
+                continue
+            try:
+                remaining = deadline - time.monotonic()
+                if lines or remaining <= 0:
+                    batch = self._queue.get_nowait()
+                else:
+                    batch = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            self._pending.extend(batch)
+        return lines
+
+    def empty(self):
+        return not self._pending and self._queue.empty()
+
+
+TRANSPORT_QUEUE = "queue"
+TRANSPORT_RING_BUFFER = "ringbuffer"
+
+
+def create_transport(transport=TRANSPORT_QUEUE, **options):
+    """return the line transport selected by name
+
+    Args:
+        transport: "queue" for a BatchQueue, "ringbuffer" for a shared memory
+            RingBufferQueue, or an already constructed transport which is returned as is
+        options: keyword arguments for the transport's constructor (e.g. capacity
+            and overflow for the ring buffer)
+
+    Raises:
+        ValueError: on an unknown transport name
+    """
+    if not isinstance(transport, str):
+        return transport
+    if transport == TRANSPORT_QUEUE:
+        return BatchQueue(**options)
+    if transport == TRANSPORT_RING_BUFFER:
+        from .ringbuffer import RingBufferQueue
+
+        return RingBufferQueue(**options)
+    raise ValueError(f"unknown transport {transport!r}")
@@ -8,21 +8,33 @@
     functor 
         creates a unix socket for listening or connect to existing
         manages a multiprocess that continuously reads from the unix socket
+            as a server, multiplexes any number of client connections with a selector
+                tags each line with the id of the client (source) it came from
             reads chunk
             parses lines
                 adds parsed lines into a multiprocess.queue
                 preserves incomplete line in buffer
+
+    a client may name itself by sending a first line of the form
+        #source <name>
+    so that its lines keep the same source id across reconnects; otherwise
+    connections are numbered client1, client2, ... in order of arrival.
 """
 
 #############################################
 #               imports                     #
 #############################################
+import codecs
 import multiprocessing
 import os, io
 from pathlib import Path
+import selectors
 import socket
 import queue  # queue.empty
 
+from .linebuffer import LineBuffer
+from .transport import BatchQueue, TaggedLine, create_transport
+
 # /imports #
 
 #############################################
@@ -59,14 +71,41 @@ def _strip_ansi(text):
 
 # /private functions
 
+_SOURCE_ANNOUNCEMENT = "#source "
+_RECV_SIZE = 1 << 16
+
 
 # private classes
+class _ClientConnection:
+    # per connection decoding and line buffering for the server
+
+    def __init__(self, source):
+        self.source = source
+        self.announced = False
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.linebuffer = LineBuffer()
+
+    def parse(self, data, final=False):
+        # return the complete lines in data, consuming a leading source announcement
+        text = self.decoder.decode(data, final=final)
+        lines = self.linebuffer.feed(text)
+        if final:
+            lines.extend(self.linebuffer.flush())
+        if lines and not self.announced:
+            self.announced = True
+            if lines[0].startswith(_SOURCE_ANNOUNCEMENT):
+                name = lines.pop(0)[len(_SOURCE_ANNOUNCEMENT) :].strip()
+                if name:
+                    self.source = name
+        return lines
+
+
 class _SocketListener:
     # functor that reads socket data into a buffer and parses lines into a (shared) queue
 
     def __init__(
         self,
-        shared_queue: multiprocessing.Queue,
+        shared_queue: BatchQueue,
         socket,
         addr,
         whether_server,
@@ -91,28 +130,66 @@ class _SocketListener:
     def _parse_buffer(self):
         # split lines but preserve incomplete line
         self.buffer.seek(0)
+        lines = []
         current_line = self.buffer.readline()
         while current_line.endswith("\n"):
             if not self.strip_ansi:
-                self.shared_queue.put_nowait(current_line[:-1])
+                lines.append(current_line[:-1])
             else:
-                self.shared_queue.put_nowait(_strip_ansi(current_line[:-1]))
+                lines.append(_strip_ansi(current_line[:-1]))
             current_line = self.buffer.readline()
+        self.shared_queue.put_lines(lines)
         self.buffer.close()  # delete buffer
         self.buffer = io.StringIO()
         self.buffer.write(current_line)  # put partial line into new buffer
 
+    def _queue_tagged(self, client, lines):
+        if self.strip_ansi:
+            lines = [_strip_ansi(line) for line in lines]
+        self.shared_queue.put_lines([TaggedLine(line, client.source) for line in lines])
+
+    def _serve(self):
+        # accept any number of clients and read from whichever is ready
+        self.socket.bind(str(self.addr))
+        if self.addr.is_socket():
+            logger.log(logging.DEBUG, f"socket created: {self.addr}")
+        self.socket.listen(16)
+        self.socket.setblocking(False)
+        selector = selectors.DefaultSelector()
+        selector.register(self.socket, selectors.EVENT_READ, data=None)
+        connection_count = 0
+        while True:
+            for key, _ in selector.select():
+                if key.data is None:  # listening socket: a new client
+                    conn, _ = self.socket.accept()
+                    conn.setblocking(False)
+                    connection_count += 1
+                    client = _ClientConnection(f"client{connection_count}")
+                    selector.register(conn, selectors.EVENT_READ, data=client)
+                    logger.log(logging.DEBUG, f"accepted {client.source}")
+                    continue
+                conn, client = key.fileobj, key.data
+                try:
+                    data_received = conn.recv(_RECV_SIZE)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    data_received = b""
+                if data_received:
+                    self._queue_tagged(client, client.parse(data_received))
+                else:  # client hung up, keep serving the others
+                    self._queue_tagged(client, client.parse(b"", final=True))
+                    selector.unregister(conn)
+                    conn.close()
+                    logger.log(logging.DEBUG, f"closed {client.source}")
+
     def __call__(self):
         # wait for connection then read next available into parser
         if self.whether_server:
-            self.socket.bind(str(self.addr))
-            if self.addr.is_socket():
-                logger.log(logging.DEBUG, f"socket created: {self.addr}")
-            self.socket.listen(1)
-            conn, accept = self.socket.accept()
-        else:
-            self.socket.connect(str(self.addr))
-            conn = self.socket
+            self._serve()
+            return
+        self.socket.connect(str(self.addr))
+        conn = self.socket
         while True:
             data_received = conn.recv(4096)
             if len(data_received) == 0:
@@ -139,7 +216,10 @@ class _SocketListener:
 #########################################
 class UnixSocketQueue:
     """
-    create a socket that accepts a connection then reads lines into a shared queue
+    create a socket that accepts connections then reads lines into a shared queue
+
+    as a server any number of clients may connect (and reconnect) concurrently;
+    their lines are queued as TaggedLine objects whose source names the client.
 
     Raises:
         FileExistsError for when the socket address already exists
@@ -148,12 +228,17 @@ class UnixSocketQueue:
         implements get_nowait() functionality of a python Queue
     """
 
-    def __init__(self, socket_filepath, whether_server=True, strip_ansi=False):
+    def __init__(
+        self, socket_filepath, whether_server=True, strip_ansi=False, transport="queue"
+    ):
         """
         Args:
             socket_filepath: stringable object where the socket shall be created
-            whether_server: if true the unix socket is managed as a server and deleted on exit
+            whether_server: if true the unix socket is managed as a server (accepting
+                many clients) and deleted on exit
             strip_ansi: flag to strip ansi before adding a line to the queue
+            transport: "queue", "ringbuffer" or a transport instance (see
+                transport.create_transport)
 
         """
         self.strip_ansi = strip_ansi
@@ -167,16 +252,19 @@ class UnixSocketQueue:
 
         self.socket_obj = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
 
-        self.data = multiprocessing.Queue()
+        self.data = create_transport(transport)
 
-        socketListener = _SocketListener(
+        # keep a reference: the listener unlinks the socket when it is deleted
+        self._socketListener = _SocketListener(
             self.data,
             self.socket_obj,
             self.socket_filepath_obj,
             whether_server,
             strip_ansi,
         )
-        self.process = multiprocessing.Process(target=socketListener, daemon=True)
+        self.process = multiprocessing.Process(
+            target=self._socketListener, daemon=True
+        )
         self.process.start()
 
     def get_nowait(self):
@@ -196,6 +284,10 @@ class UnixSocketQueue:
         else:
             return line
 
+    def get_batch(self, max_lines=10000, max_wait=0.0):
+        # drain up to max_lines lines from the wrapped BatchQueue
+        return self.data.get_batch(max_lines, max_wait)
+
 
 #####################################
 #           example logic           #
@@ -205,6 +297,8 @@ if __name__ == "__main__":
     after running this main logic, create a unix socket that receives the stdout of
     a program by combining linux executables tee and ncat ("nc") like so:
     $ golemsp run --payment-network testnet 2>&1 | tee  >(nc -U /tmp/golemsp.sock)
+    any number of providers may connect, optionally naming themselves:
+    $ (echo "#source node2"; golemsp run 2>&1) | nc -U /tmp/golemsp.sock
     """
     unixSocketQueue = UnixSocketQueue("/tmp/golemsp.sock")
 
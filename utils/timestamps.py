@@ -0,0 +1,83 @@
+# utils/timestamps.py
+"""the timestamps heading golemsp log lines, shared by every parser of them
+
+e.g. 2023-05-28T08:05:05.879-0700, or as exe units and runtimes write them with a
+"Z" or "+00:00" offset and no or a longer (up to 9 digit) fraction of a second.
+processqueue.logtimestamp (the headers of raw lines) matches TIMESTAMP_TEXT and
+model.time_utils (the timestamps of events) the golemsp layout built from the same
+SECOND_TEXT and OFFSET_TEXT. both convert each distinct second with
+unix_time_of_second.
+"""
+
+from datetime import datetime, timezone
+
+# the groups of the timestamp to the second and of its utc offset
+SECOND_TEXT = r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})"
+OFFSET_TEXT = r"(Z|[+-]\d{2}:?\d{2})"
+# groups: the timestamp to the second, the digits of its fraction (None if it has
+# none) and its utc offset
+TIMESTAMP_TEXT = SECOND_TEXT + r"(?:\.(\d{1,9}))?" + OFFSET_TEXT
+
+_CACHE_LIMIT = 10000
+_EPOCH_DATE = datetime(1970, 1, 1).date()
+_MAX_UNIX_TIME = int(datetime.max.replace(tzinfo=timezone.utc).timestamp())
+
+_unix_time_by_second = dict()  # second + offset as written -> unix time
+_unix_time_by_date = dict()  # date -> unix time of its midnight in UTC
+_utc_offsets = dict()  # offset as written -> seconds east of UTC
+
+
+def _compute_unix_time_of_second(second, offset):
+    date = second[:10]
+    unix_time = _unix_time_by_date.get(date)
+    if unix_time is None:
+        try:
+            days = (datetime.strptime(date, "%Y-%m-%d").date() - _EPOCH_DATE).days
+        except ValueError:
+            return None
+        if len(_unix_time_by_date) > _CACHE_LIMIT:
+            _unix_time_by_date.clear()
+        unix_time = _unix_time_by_date[date] = days * 86400
+    utc_offset = _utc_offsets.get(offset)
+    if utc_offset is None:
+        try:
+            utc_offset = datetime.strptime(offset, "%z").utcoffset()
+        except ValueError:
+            return None
+        utc_offset = _utc_offsets[offset] = int(utc_offset.total_seconds())
+    hours = int(second[11:13])
+    minutes = int(second[14:16])
+    seconds = int(second[17:19])
+    if hours > 23 or minutes > 59 or seconds > 59:
+        return None
+    unix_time += hours * 3600 + minutes * 60 + seconds - utc_offset
+    if unix_time < 0 or unix_time > _MAX_UNIX_TIME:
+        # before the epoch or beyond datetime's range in UTC
+        return None
+    return unix_time
+
+
+def unix_time_of_second(second, offset):
+    """return the unix time of e.g. "2023-05-28T08:05:05" at offset "-0700", or
+    None when it is not a valid time
+
+    the unix time of each second is computed once (from the cached midnight of
+    its date and its cached utc offset) and remembered.
+    """
+    key = second + offset
+    unix_time = _unix_time_by_second.get(key)
+    if unix_time is None:
+        unix_time = _compute_unix_time_of_second(second, offset)
+        if unix_time is None:
+            return None
+        if len(_unix_time_by_second) > _CACHE_LIMIT:
+            _unix_time_by_second.clear()
+        _unix_time_by_second[key] = unix_time
+    return unix_time
+
+
+def clear_caches():
+    """forget the seconds, dates and offsets converted so far"""
+    _unix_time_by_second.clear()
+    _unix_time_by_date.clear()
+    _utc_offsets.clear()
@@ -243,6 +243,16 @@ class View:
             #     )
             # curses.napms(50)
 
+    def update_catch_up_progress(self, fraction, lines_per_second=None):
+        # show progress through a log's backlog on the last status line, None clears
+        if fraction is None:
+            text = ""
+        else:
+            text = f"catching up on log: {fraction:6.1%}"
+            if lines_per_second is not None:
+                text += f"  {lines_per_second:,.0f} lines/sec"
+        self._status_scr.set_lines_to_display([None, None, text])
+
     def update_payment_network(self, payment_network, payment_address, token):
         file_logger.debug(f"{payment_network} {payment_address} {token}")
 